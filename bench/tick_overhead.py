@@ -0,0 +1,103 @@
+"""Microbenchmark of the event manager's per-tick overhead.
+
+Runs _event_tick for a set of events whose rules call in-process fake resources that
+answer immediately, so the time measured is the event manager's own work per tick
+(rule evaluation, resource lookups, payload handling, caching and bookkeeping).
+
+    python bench/tick_overhead.py [--events 20] [--ticks 2000]
+
+To compare two versions, run it on each (for example on two git commits).
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from viam.components.camera import Camera
+from viam.components.generic import Generic as GenericComponent
+from viam.services.vision import VisionClient
+
+from src.eventManager import eventManager
+from src.events import Event
+
+
+class FakeImage():
+    data = b"\x00" * 64
+
+
+class FakeDetection():
+    def __init__(self, class_name: str, confidence: float):
+        self.class_name = class_name
+        self.confidence = confidence
+
+
+class FakeCamera():
+    async def get_image(self, extra: Any = None) -> FakeImage:
+        return FakeImage()
+
+
+class FakeDetector():
+    async def get_detections(self, image: Any, extra: Any = None) -> list:
+        return [FakeDetection("cat", 0.9), FakeDetection("dog", 0.2)]
+
+
+class FakePlug():
+    async def do_command(self, command: Any = None) -> Dict[str, Any]:
+        return {"status": {"power": "off", "watts": 3}}
+
+
+def build(events: int) -> eventManager:
+    manager = eventManager("bench")
+    manager.logger = logging.getLogger("bench")
+    manager.logger.setLevel(logging.WARNING)
+    manager.mode = "active"
+    manager.robot_resources = {"resources": {"plug": {"type": "component", "subtype": "generic"}}}
+    # every tick does its own work rather than reusing another event's result
+    manager.frame_cache.max_age_ms = 0
+    manager.inference_cache.max_age_ms = 0
+    manager.frame_results.size_per_camera = 0
+    manager.rule_graph.max_age_ms = 0
+    manager.deps = {
+        Camera.get_resource_name("cam1"): FakeCamera(),
+        VisionClient.get_resource_name("det"): FakeDetector(),
+        GenericComponent.get_resource_name("plug"): FakePlug(),
+    }
+    manager.event_states = [Event(name=f"event {i}", modes=["active"], rule_logic_type="OR", rules=[
+        {"type": "detection", "camera": "cam1", "detector": "det", "class_regex": f"person|vehicle{i}", "confidence_pct": 0.5},
+        {"type": "call", "resource": "plug", "method": "do_command", "payload": "{'get_status': true}",
+         "result_path": "status.power", "result_operator": "eq", "result_value": f"on{i}"}
+    ]) for i in range(events)]
+    manager.rule_graph.compile(manager.event_states)
+    return manager
+
+
+async def run(events: int, ticks: int) -> float:
+    manager = build(events)
+    entries = [manager._setup_event(e, asyncio.Event()) for e in manager.event_states]
+    # warm up caches and compiled state
+    for entry in entries:
+        await manager._event_tick(entry)
+    start = time.perf_counter()
+    for i in range(ticks):
+        await manager._event_tick(entries[i % len(entries)])
+    return (time.perf_counter() - start) / ticks * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--ticks", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    results = [asyncio.run(run(args.events, args.ticks)) for _ in range(args.repeat)]
+    print(f"{args.events} events, {args.ticks} ticks: best {min(results):.1f} us/tick, "
+          f"median {sorted(results)[len(results) // 2]:.1f} us/tick")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from typing import Optional
+
 class Action():
     resource: str
     method: str
@@ -6,6 +8,7 @@ class Action():
     response_match: str = ""
     taken: bool = False
     last_taken: int
+    timeout_ms: Optional[float] = None
     def __init__(self, **kwargs):
         for key, value in kwargs.items():
             self.__dict__[key] = value
\ No newline at end of file
@@ -25,7 +25,7 @@ async def eval_action(event:Event, action:Action, sms_message: str):
     return False
 
 async def do_action(event:Event, action:Action, resources: Dict[str, Any]):
-    await call_method(resources, action.resource, action.method, action.payload, event)
+    await call_method(resources, action.resource, action.method, action.payload, event, timeout_ms=action.timeout_ms)
 
     action.taken = True
     action.last_taken = int(time.time())
@@ -0,0 +1,113 @@
+import contextvars
+import logging
+import time
+import traceback
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+# name of the event whose tick is running, so errors can be grouped per event
+current_event: contextvars.ContextVar[str] = contextvars.ContextVar('current_event', default="")
+
+
+class _ErrorGroup():
+    first_seen: float
+    window_start: float
+    suppressed: int = 0
+    total: int = 0
+    message: str = ""
+
+    def __init__(self, now: float, message: str):
+        self.first_seen = now
+        self.window_start = now
+        self.suppressed = 0
+        self.total = 1
+        self.message = message
+
+
+class ErrorLog():
+    """Groups repeated errors so a persistent failure does not flood the log.
+
+    Errors are grouped by (event, rule, exception type).  The first error of a group is
+    logged at ERROR; repeats within summary_secs are only counted, then logged as a single
+    summary line with the count.  Tracebacks are only formatted when DEBUG is enabled.
+    """
+    summary_secs: float = 60
+
+    def __init__(self, summary_secs: float = 60):
+        self.summary_secs = summary_secs
+        self._groups: Dict[Tuple[str, str, str], _ErrorGroup] = {}
+        self._last_flush = 0.0
+
+    def error(self, logger: Any, message: str, exc: Optional[BaseException] = None, rule: Any = None) -> None:
+        now = time.monotonic()
+        key = (current_event.get(), rule_label(rule), type(exc).__name__ if exc is not None else "")
+        group = self._groups.get(key)
+
+        if group is None:
+            self._groups[key] = _ErrorGroup(now, message)
+            logger.error(message)
+        elif now - group.window_start >= self.summary_secs:
+            group.total += 1
+            self._summarize(logger, group, now, message)
+        else:
+            group.total += 1
+            group.suppressed += 1
+            group.message = message
+            return
+
+        if exc is not None and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("".join(traceback.format_exception(type(exc), exc, exc.__traceback__)))
+
+    def flush(self, logger: Any) -> None:
+        """Log summaries for groups whose window has passed, even if the error has stopped recurring"""
+        now = time.monotonic()
+        if now - self._last_flush < 1:
+            return
+        self._last_flush = now
+        for key, group in list(self._groups.items()):
+            if now - group.window_start >= self.summary_secs:
+                if group.suppressed:
+                    self._summarize(logger, group, now, None)
+                else:
+                    # quiet for a whole window, the next occurrence is logged as new
+                    del self._groups[key]
+
+    def _summarize(self, logger: Any, group: _ErrorGroup, now: float, message: Optional[str]) -> None:
+        repeats = group.suppressed + (1 if message is not None else 0)
+        logger.error(f"{message or group.message} (occurred {repeats} times in the last {now - group.window_start:.0f} secs, {group.total} in total)")
+        group.window_start = now
+        group.suppressed = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "groups": len(self._groups),
+            "suppressed": sum(g.suppressed for g in self._groups.values())
+        }
+
+
+def rule_label(rule: Any) -> str:
+    if rule is None:
+        return ""
+    parts = [str(getattr(rule, 'type', type(rule).__name__))]
+    for attr in ('camera', 'detector', 'classifier', 'tracker', 'resource', 'method'):
+        value = rule.__dict__.get(attr) if hasattr(rule, '__dict__') else None
+        if isinstance(value, str):
+            parts.append(value)
+    return ":".join(parts)
+
+
+# one error log per logger, so separate event manager resources are grouped independently
+_error_logs: "weakref.WeakKeyDictionary[Any, ErrorLog]" = weakref.WeakKeyDictionary()
+
+
+def error_log_for(logger: Any) -> ErrorLog:
+    error_log = _error_logs.get(logger)
+    if error_log is None:
+        error_log = ErrorLog()
+        _error_logs[logger] = error_log
+    return error_log
+
+
+def log_error(logger: Any, message: str, exc: Optional[BaseException] = None, rule: Any = None) -> None:
+    """Log an error, rate-limited and deduplicated per (event, rule, exception type)"""
+    error_log_for(logger).error(logger, message, exc, rule)
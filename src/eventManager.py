@@ -10,11 +10,7 @@ from viam.resource.base import ResourceBase
 from viam.resource.types import Model, ModelFamily
 
 from viam.services.generic import Generic as GenericService
-from viam.services.vision import VisionClient
-from viam.components.generic import Generic as GenericComponent
 from viam.components.sensor import Sensor
-from viam.components.camera import Camera
-from viam.components.motor import Motor
 from viam.utils import SensorReading
 from viam.errors import NoCaptureToStoreError
 from viam.utils import from_dm_from_extra
@@ -24,6 +20,16 @@ from viam.app.viam_client import ViamClient
 from viam.rpc.dial import DialOptions
 
 from . import events, rules, notifications, triggered, actions, globals
+from .resourceCache import SharedResultCache, ContentHashLRU
+from .imageHandle import TriggerMedia
+from .motionGate import MotionGate
+from .scheduler import EventScheduler, ScheduledEvent
+from .ruleStats import RuleStats, cost_order, get_rule_stats
+from .ruleGraph import RuleGraph
+from .resourceGuard import LoadShedder, ResourceGuards, current_priority
+from .errorLog import current_event, error_log_for, log_error
+from .modeState import ModeState
+from .eventPlan import EventPlan, event_plan, rule_plan, resource_name as dep_resource_name
 
 import time
 import copy
@@ -31,6 +37,7 @@ import asyncio
 import sqlite3
 import os
 import json
+import math
 import pickle
 from datetime import datetime, timezone, timedelta
 import re
@@ -47,9 +54,7 @@ class eventManager(Sensor, Reconfigurable):
     MODEL: ClassVar[Model] = Model(ModelFamily("viam", "event-manager"), "eventing")
     
     name: str
-    mode: str = "inactive"
-    mode_overridden: str = ""
-    mode_override_until: Optional[float] = None
+    mode_state: ModeState
     app_client: None
     api_key_id: str
     api_key: str
@@ -57,7 +62,6 @@ class eventManager(Sensor, Reconfigurable):
     robot_resources: Dict[str, Any] = {}
     dm_sent_status: Dict[str, float] = {}
     event_states: list[events.Event] = []
-    stop_events: list[asyncio.Event] = []
     back_state_to_disk: bool = False
     db_path: str = ""
     enable_backoff_schedule: bool = False
@@ -66,6 +70,49 @@ class eventManager(Sensor, Reconfigurable):
         1200: 300,
         3600: 900
     }
+    frame_max_age_ms: int = 100
+    frame_cache: SharedResultCache
+    inference_max_age_ms: int = 100
+    inference_cache: SharedResultCache
+    frame_hash_lru_size: int = 8
+    frame_results: ContentHashLRU
+    time_gate_max_park_secs: float = 3600
+    rule_share_max_age_ms: int = 100
+    rule_graph: RuleGraph
+    default_timeout_ms: float = 0
+    resource_guards: ResourceGuards
+    load_shedder: LoadShedder
+    scheduler: EventScheduler
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.frame_cache = SharedResultCache("frames", self.frame_max_age_ms)
+        self.inference_cache = SharedResultCache("inference", self.inference_max_age_ms)
+        self.frame_results = ContentHashLRU("frame_hash", self.frame_hash_lru_size)
+        self.rule_graph = RuleGraph(self.rule_share_max_age_ms)
+        self.resource_guards = ResourceGuards()
+        self.load_shedder = LoadShedder(self.resource_guards)
+        self.scheduler = EventScheduler(self._event_tick, self._events_stopped)
+        self.mode_state = ModeState()
+        self.mode_state.subscribe(self._mode_changed)
+        # running events by name, so reconfigure can leave unchanged events running
+        self._scheduled: Dict[str, ScheduledEvent] = {}
+
+    @property
+    def mode(self) -> str:
+        return self.mode_state.mode
+
+    @mode.setter
+    def mode(self, mode: str) -> None:
+        self.mode_state.set(mode)
+
+    @property
+    def mode_overridden(self) -> str:
+        return self.mode_state.overridden
+
+    @property
+    def mode_override_until(self) -> Optional[float]:
+        return self.mode_state.override_until
 
     # Constructor
     @classmethod
@@ -99,7 +146,13 @@ class eventManager(Sensor, Reconfigurable):
         # Add video_capture_resource from each event if configured
         dict_events = attributes.get("events")
         if dict_events is not None and isinstance(dict_events, list):
+            names = set()
             for e in dict_events:
+                if isinstance(e, dict):
+                    # events are scheduled, persisted and commanded by name
+                    if e.get("name") in names:
+                        raise ValueError(f"Duplicate event name '{e.get('name')}', event names must be unique")
+                    names.add(e.get("name"))
                 if isinstance(e, dict) and e.get("video_capture_resource"):
                     optional_deps.append(e["video_capture_resource"])
 
@@ -157,8 +210,8 @@ class eventManager(Sensor, Reconfigurable):
             self.logger.error(f"Error saving event states to disk: {e}")
             self.logger.error(traceback.format_exc())
     
-    def _restore_event_states(self):
-        """Restore event states from SQLite database"""
+    def _restore_event_states(self, event_names: Optional[set[str]] = None):
+        """Restore event states from SQLite database, only for event_names if given"""
         if not self.back_state_to_disk:
             return
             
@@ -181,6 +234,8 @@ class eventManager(Sensor, Reconfigurable):
                 
             # Get current event names for comparison
             current_event_names = {e.name for e in self.event_states}
+            if event_names is not None:
+                current_event_names &= event_names
             
             # Create a mapping of event name to event object for the current events
             event_map = {e.name: e for e in self.event_states}
@@ -195,34 +250,11 @@ class eventManager(Sensor, Reconfigurable):
                     # Restore the saved state using pickle
                     saved_event = pickle.loads(event_data)
                     
-                    # Transfer just the runtime state, not configuration
-                    fresh_event.is_triggered = saved_event.is_triggered
-                    fresh_event.last_triggered = saved_event.last_triggered
-                    fresh_event.state = saved_event.state
-                    fresh_event.sequence_count_current = saved_event.sequence_count_current
-                    fresh_event.paused_until = getattr(saved_event, 'paused_until', 0)
-                    fresh_event.pause_reason = saved_event.pause_reason
-                    fresh_event.actions_paused = saved_event.actions_paused
-                    fresh_event.triggered_camera = saved_event.triggered_camera
-                    fresh_event.triggered_label = saved_event.triggered_label
-                    fresh_event.triggered_rules = saved_event.triggered_rules
-                    
-                    # Restore backoff state
-                    fresh_event.backoff_adjustment = getattr(saved_event, 'backoff_adjustment', 0)
-                    fresh_event.continuous_trigger_start_time = getattr(saved_event, 'continuous_trigger_start_time', 0)
-
-                    # Transfer rule reset state attributes
+                    self._transfer_runtime_state(fresh_event, saved_event)
+                    # rule reset settings have always been restored from disk along with the state
                     fresh_event.require_rule_reset = getattr(saved_event, 'require_rule_reset', False)
                     fresh_event.rule_reset_count = getattr(saved_event, 'rule_reset_count', 1)
-                    fresh_event.rule_reset_counter = getattr(saved_event, 'rule_reset_counter', 0)
-                    
-                    # For actions, only restore taken status
-                    if hasattr(fresh_event, 'actions') and hasattr(saved_event, 'actions'):
-                        for i, action in enumerate(fresh_event.actions):
-                            if i < len(saved_event.actions):
-                                action.taken = saved_event.actions[i].taken
-                                action.last_taken = getattr(saved_event.actions[i], 'last_taken', 0)
-                    
+
                     self.logger.info(f"Restored state for event: {event_name}")
                 
             conn.close()
@@ -232,6 +264,36 @@ class eventManager(Sensor, Reconfigurable):
             self.logger.error(traceback.format_exc())
             # Continue with fresh state if restoration fails
 
+    def _transfer_runtime_state(self, fresh_event: events.Event, saved_event: events.Event) -> None:
+        """Copy the runtime state, not the configuration, of a previous instance of an event"""
+        fresh_event.is_triggered = saved_event.is_triggered
+        fresh_event.last_triggered = saved_event.last_triggered
+        fresh_event.state = saved_event.state
+        fresh_event.sequence_count_current = saved_event.sequence_count_current
+        fresh_event.paused_until = getattr(saved_event, 'paused_until', 0)
+        fresh_event.pause_started = getattr(saved_event, 'pause_started', 0)
+        fresh_event.pause_count = getattr(saved_event, 'pause_count', 0)
+        fresh_event.paused_secs_total = getattr(saved_event, 'paused_secs_total', 0)
+        fresh_event.pause_reason = saved_event.pause_reason
+        fresh_event.actions_paused = saved_event.actions_paused
+        fresh_event.triggered_camera = saved_event.triggered_camera
+        fresh_event.triggered_label = saved_event.triggered_label
+        fresh_event.triggered_rules = saved_event.triggered_rules
+
+        # Restore backoff state
+        fresh_event.backoff_adjustment = getattr(saved_event, 'backoff_adjustment', 0)
+        fresh_event.continuous_trigger_start_time = getattr(saved_event, 'continuous_trigger_start_time', 0)
+
+        # Transfer rule reset progress; require_rule_reset and rule_reset_count are configuration
+        fresh_event.rule_reset_counter = getattr(saved_event, 'rule_reset_counter', 0)
+
+        # For actions, only restore taken status
+        if hasattr(fresh_event, 'actions') and hasattr(saved_event, 'actions'):
+            for i, action in enumerate(fresh_event.actions):
+                if i < len(saved_event.actions):
+                    action.taken = saved_event.actions[i].taken
+                    action.last_taken = getattr(saved_event.actions[i], 'last_taken', 0)
+
     # Handles attribute reconfiguration
     def reconfigure(self, config: ModuleConfig, dependencies: Mapping[ResourceName, ResourceBase]):        
         self.name = config.name
@@ -246,8 +308,9 @@ class eventManager(Sensor, Reconfigurable):
         # Initialize database if needed
         self._init_db()
         
-        # Store previous event states for potential restoration
-        old_event_states = self.event_states
+        # previous events, diffed against the new configuration by name
+        old_events = {e.name: e for e in self.event_states}
+        carried_over: set[str] = set()
         
         # reset event states
         self.event_states = []
@@ -257,18 +320,15 @@ class eventManager(Sensor, Reconfigurable):
         if attributes.get("mode") and isinstance(attributes.get("mode"), str):
             mode = str(attributes.get("mode"))
 
+        self.mode_state.set(mode)
+
         mode_override = attributes.get("mode_override")
         if isinstance(mode_override, dict):
             until_value = mode_override.get("until")
             mode_value = mode_override.get("mode")
             if until_value is not None:
-                until = iso8601_to_timestamp(until_value)
-                self.mode_override_until = until
-                # Store current mode for later
-                self.mode_overridden = mode
-                if isinstance(mode_value, str):
-                    mode = mode_value
-        self.mode = mode
+                # the configured mode comes back when the override expires
+                self.mode_state.set_override(mode_value if isinstance(mode_value, str) else mode, iso8601_to_timestamp(until_value))
 
         # Set backoff schedule settings
         self.enable_backoff_schedule = bool(attributes.get("enable_backoff_schedule", False))
@@ -276,6 +336,21 @@ class eventManager(Sensor, Reconfigurable):
             # It comes from JSON, so keys will be strings
             self.default_backoff_schedule = {int(k): v for k, v in attributes["backoff_schedule"].items()}
 
+        # Rules reading the same camera within this window share one get_image() result
+        self.frame_max_age_ms = int(attributes.get("frame_max_age_ms", 100))
+        self.frame_cache.max_age_ms = self.frame_max_age_ms
+        self.frame_cache.clear()
+
+        # Rules using the same camera, vision service and extra within this window share one inference result
+        self.inference_max_age_ms = int(attributes.get("inference_max_age_ms", 100))
+        self.inference_cache.max_age_ms = self.inference_max_age_ms
+        self.inference_cache.clear()
+
+        # Vision results are reused for byte-identical frames from the same camera
+        self.frame_hash_lru_size = int(attributes.get("frame_hash_lru_size", 8))
+        self.frame_results.size_per_camera = self.frame_hash_lru_size
+        self.frame_results.clear()
+
         if attributes.get('event_video_capture_padding_secs'):
             self.event_video_capture_padding_secs = attributes.get('event_video_capture_padding_secs')
 
@@ -283,15 +358,45 @@ class eventManager(Sensor, Reconfigurable):
         if dict_events is not None and isinstance(dict_events, list):
             for e in dict_events:
                 if isinstance(e, dict):
+                    if any(existing.name == e.get("name") for existing in self.event_states):
+                        self.logger.error(f"Duplicate event name '{e.get('name')}', ignoring all but the first event with this name")
+                        continue
+                    config_key = self._event_config_key(e)
+                    old_event = old_events.get(str(e.get("name")))
+                    if old_event is not None and old_event.__dict__.get('_config_key') == config_key and old_event.name in self._scheduled:
+                        # unchanged and running, keeps running with its live state
+                        self.event_states.append(old_event)
+                        continue
                     event = events.Event(**e)
+                    event.__dict__['_config_key'] = config_key
                     # Apply default backoff schedule if enabled and event doesn't have one
                     if self.enable_backoff_schedule and not event.backoff_schedule:
                         event.backoff_schedule = self.default_backoff_schedule
                     event.state = "setup"
+                    if old_event is not None:
+                        # changed, restarts but keeps its runtime state
+                        self._transfer_runtime_state(event, old_event)
+                        carried_over.add(event.name)
                     self.event_states.append(event)
 
+        # Identical rules in different events are evaluated once and their result shared
+        self.rule_share_max_age_ms = int(attributes.get("rule_share_max_age_ms", 100))
+        self.rule_graph.max_age_ms = self.rule_share_max_age_ms
+        self.rule_graph.compile(self.event_states)
+
         self.deps = dependencies
         self.robot_resources['resources'] = attributes.get("resources")
+        # per-resource concurrency limits, declared as max_concurrent in each resource
+        # and circuit breakers, opening after breaker_failures consecutive failures for breaker_cooloff_secs
+        self.resource_guards.configure(attributes.get("resources"),
+                                       int(attributes.get("breaker_failures", 5)),
+                                       float(attributes.get("breaker_cooloff_secs", 30)))
+        # default timeout for every resource call, rules, actions and notifications can set their own timeout_ms
+        self.default_timeout_ms = float(attributes.get("timeout_ms", 0))
+        # when resources queue for longer than this, lower-priority events are slowed down
+        self.load_shedder.latency_budget_ms = float(attributes.get("latency_budget_ms", 0))
+        self.load_shedder.protected_priority = max([e.priority for e in self.event_states], default=0)
+        self.load_shedder.factor = 1
 
         sms_module = config.attributes.fields["sms_module"].string_value or ""
         if sms_module != "":
@@ -306,14 +411,16 @@ class eventManager(Sensor, Reconfigurable):
         self.api_key = config.attributes.fields["app_api_key"].string_value or ''
         self.api_key_id = config.attributes.fields["app_api_key_id"].string_value or ''
         
-        # Stop any running events
-        while self.stop_events:
-            stop_event = self.stop_events.pop()
-            stop_event.set()
+        # Stop events that were changed or removed
+        for name, entry in list(self._scheduled.items()):
+            if not any(entry.event is e for e in self.event_states):
+                entry.stop_event.set()
+                del self._scheduled[name]
+        self.scheduler.discard_stopped()
             
-        # Restore event states from disk if enabled
+        # Restore event states from disk if enabled, for events without a previous instance in memory
         if self.back_state_to_disk:
-            self._restore_event_states()
+            self._restore_event_states({e.name for e in self.event_states if e.name not in carried_over and e.name not in self._scheduled})
             
         # Start event processing
         asyncio.ensure_future(self.manage_events())
@@ -333,11 +440,34 @@ class eventManager(Sensor, Reconfigurable):
         if (self.api_key != '' and self.api_key_id != ''):
             self.app_client = await self.viam_connect()
 
+        self.scheduler.start()
+        self.mode_state.start()
+
         event: events.Event
         for event in self.event_states:
-            stop_event = asyncio.Event()
-            self.stop_events.append(stop_event)
-            asyncio.create_task(self.event_check_loop(event, stop_event))
+            running = self._scheduled.get(event.name)
+            if running is not None and running.event is event:
+                # still running from before the reconfigure, only pick up the new dependencies
+                refreshed = self._setup_event(event, running.stop_event)
+                if refreshed is None:
+                    running.stop_event.set()
+                    del self._scheduled[event.name]
+                else:
+                    running.resources = refreshed.resources
+                continue
+            entry = self._setup_event(event, asyncio.Event())
+            if entry is not None:
+                self.logger.info("Scheduling event " + event.name)
+                self._scheduled[event.name] = entry
+                self.scheduler.add(entry)
+        self.scheduler.discard_stopped()
+
+    def _event_config_key(self, event_config: Dict[str, Any]) -> str:
+        """An event's configuration, with the global settings applied to it; equal keys mean an unchanged event"""
+        return json.dumps({
+            "event": event_config,
+            "backoff_schedule": self.default_backoff_schedule if self.enable_backoff_schedule else None
+        }, sort_keys=True, default=str)
     
     def _check_resource_availability(self, name: str, event_resources: Dict[str, Any], 
                                    expected_type: Optional[str] = None, 
@@ -360,25 +490,8 @@ class eventManager(Sensor, Reconfigurable):
         resource_type = expected_type or event_resources["resources"][name]["type"]
         resource_subtype = expected_subtype or event_resources["resources"][name]["subtype"]
         
-        if resource_type == "component":
-            if resource_subtype == "camera":
-                resource_name = Camera.get_resource_name(name)
-            elif resource_subtype == "sensor":
-                resource_name = Sensor.get_resource_name(name)
-            elif resource_subtype == "motor":
-                resource_name = Motor.get_resource_name(name)
-            elif resource_subtype == "generic":
-                resource_name = GenericComponent.get_resource_name(name)
-            else:
-                return None
-        elif resource_type == "service":
-            if resource_subtype == "generic":
-                resource_name = GenericService.get_resource_name(name)
-            elif resource_subtype == "vision":
-                resource_name = VisionClient.get_resource_name(name)
-            else:
-                return None
-        else:
+        resource_name = dep_resource_name(name, resource_type, resource_subtype)
+        if resource_name is None:
             return None
             
         if resource_name not in event_resources['_deps']:
@@ -426,13 +539,19 @@ class eventManager(Sensor, Reconfigurable):
         
         return missing_resources if missing_resources else None
 
-    async def event_check_loop(self, event:events.Event, stop_event: asyncio.Event):
+    def _setup_event(self, event: events.Event, stop_event: asyncio.Event) -> Optional[ScheduledEvent]:
+        """Resolve the resources an event needs, returning None if the event is incomplete"""
         # make the resource logger available globally
         globals.setParam('logger',self.logger)
 
         # copy so we don't cause locking issue by referencing the same resource across event tasks
         event_resources = copy.deepcopy(self.robot_resources)
         event_resources['_deps'] = self.deps
+        event_resources['_frame_cache'] = self.frame_cache
+        event_resources['_inference_cache'] = self.inference_cache
+        event_resources['_frame_results'] = self.frame_results
+        event_resources['_guards'] = self.resource_guards
+        event_resources['_default_timeout_ms'] = self.default_timeout_ms
 
         if "sms_module_name" in event_resources and event_resources["sms_module_name"] != "":
             actual = event_resources['_deps'][GenericService.get_resource_name(event_resources["sms_module_name"])]
@@ -452,184 +571,351 @@ class eventManager(Sensor, Reconfigurable):
             event.state = "incomplete"
             event.pause_reason = f"Missing resources: {', '.join(missing_resources)}"
             self.logger.warning(f"Event {event.name} is incomplete due to missing resources: {', '.join(missing_resources)}")
-            return  # Exit the loop since reconfigure() will restart it when resources are available
+            return None
 
-        self.logger.info("Starting event check loop for " + event.name)
-        last_state_save_time = time.time()
-                
-        while not stop_event.is_set():
-            try:
-                if ((self.mode in event.modes) and ((event.is_triggered == False) or ((event.is_triggered == True) and ((time.time() - event.last_triggered) >= event.get_effective_pause_duration())))):
-                    start_time = datetime.now()
-                    event.state = "monitoring"
-
-                    # reset event and actions before evaluating
-                    # Only reset is_triggered if we're not waiting for rule reset
-                    if not (event.is_triggered and hasattr(event, 'require_rule_reset') and event.require_rule_reset and 
-                            (not hasattr(event, 'rule_reset_counter') or event.rule_reset_counter < getattr(event, 'rule_reset_count', 1))):
-                        event.is_triggered = False
-                    event.actions_paused = False
-                    event.pause_reason = ""
-
-                    event.triggered_camera = ""
-                    event.triggered_label = ""
-                    event.triggered_rules = {}
-
-                    actions.flip_action_status(event, False)
-
-                    start_eval_time = time.time()
-                    rule_results = []
-                    for rule in event.rules:
-                        self.logger.debug(rule)
-                        result = await rules.eval_rule(rule, event_resources)
-                        if result["triggered"] == True:
-                            event.sequence_count_current = event.sequence_count_current + 1
-                        else:
-                            event.sequence_count_current = 0
-
-                        if event.sequence_count_current< event.trigger_sequence_count:
-                            # don't consider triggered as we've not met the threshold
-                            result["triggered"] = False
-                        else:
-                            # reset sequence count if we are at the sequence count threshold
-                            event.sequence_count_current = 0
-
-                        # rule settings can determine if the event loop should be paused on
-                        # non-triggered events
-                        if hasattr(rule, 'inverse_pause_secs') and rule.inverse_pause_secs > 0 and not result["triggered"]:
-                            event.paused_until = time.time() + rule.inverse_pause_secs
-                            event.state = "paused"
-                            event.pause_reason = f"{rule.type} rule inverse pause for {rule.inverse_pause_secs} secs"
-                            break
-                        if hasattr(rule, 'pause_on_known_secs') and rule.pause_on_known_secs > 0 and "known_person_seen" in result and result["known_person_seen"]:
-                            event.paused_until = time.time() + rule.pause_on_known_secs
-                            event.state = "paused"
-                            event.pause_reason = "known person"
-                            break                       
-                        
-                        rule_results.append(result)
-
-                    # Check if rules evaluated to true
-                    rules_triggered = (event.state != "paused") and (rules.logical_trigger(event.rule_logic_type, [res['triggered'] for res in rule_results]) == True)
-                    
-                    # Handle rule reset counters if we're in reset mode
-                    if event.is_triggered and hasattr(event, 'require_rule_reset') and event.require_rule_reset:
-                        if not rules_triggered:
-                            # Rules evaluated to false, increment counter
-                            if not hasattr(event, 'rule_reset_counter'):
-                                event.rule_reset_counter = 1
-                            else:
-                                event.rule_reset_counter += 1
-                            
-                            if event.rule_reset_counter >= getattr(event, 'rule_reset_count', 1):
-                                # We've seen enough false evaluations, reset triggered state
-                                self.logger.debug(f"Event {event.name} reset after {event.rule_reset_counter} false evaluations")
-                                event.is_triggered = False
-                                event.rule_reset_counter = 0
-                        else:
-                            # If rules triggered again while waiting for reset, reset the counter
+        # resolve resource handles and compile rule settings once, rather than on every tick
+        event_resources['_plan'] = EventPlan(event, event_resources)
+        return ScheduledEvent(event, stop_event, event_resources, time.time())
+
+    def _events_stopped(self, entries: List[ScheduledEvent]) -> None:
+        for entry in entries:
+            self.logger.info("Ending event check loop for " + entry.event.name)
+
+        # Save final state when stopping
+        if self.back_state_to_disk:
+            self._save_event_states()
+
+    async def _event_tick(self, entry: ScheduledEvent) -> float:
+        """Run one step of an event and return how many seconds until it next needs attention"""
+        event = entry.event
+        event_resources = entry.resources
+        plan = event_plan(event, event_resources)
+        to_wait: float = .5
+        # calls made for this event wait in resource queues according to its priority
+        current_priority.set(plan.priority)
+        current_event.set(event.name)
+        try:
+            monitoring_due = ((self.mode in event.modes) and ((event.is_triggered == False) or ((event.is_triggered == True) and ((time.time() - event.last_triggered) >= event.get_effective_pause_duration()))))
+            if monitoring_due and event.paused_until > time.time():
+                # paused by a rule (inverse_pause_secs, pause_on_known_secs), evaluate nothing until the pause ends
+                event.state = "paused"
+                to_wait = event.paused_until - time.time()
+            elif monitoring_due:
+                event.end_pause(time.time())
+                start_time = datetime.now()
+                event.state = "monitoring"
+
+                # reset event and actions before evaluating
+                # Only reset is_triggered if we're not waiting for rule reset
+                if not (event.is_triggered and plan.require_rule_reset and event.rule_reset_counter < plan.rule_reset_count):
+                    event.is_triggered = False
+                event.actions_paused = False
+                event.pause_reason = ""
+
+                event.triggered_camera = ""
+                event.triggered_label = ""
+                event.triggered_rules = {}
+
+                actions.flip_action_status(event, False)
+
+                start_eval_time = time.time()
+                parked_until = self._time_gate(event)
+                if parked_until is not None:
+                    # a closed time window decides the outcome, so none of the other rules need to run
+                    rule_results = [{"triggered": False, "skipped": True} for _ in getattr(event, 'rules', [])]
+                    partial_match = False
+                    event.state = "paused"
+                    event.pause_reason = "outside time window until " + datetime.fromtimestamp(parked_until).isoformat(timespec='minutes')
+                else:
+                    rule_results, partial_match = await self._evaluate_rules(event, event_resources)
+
+                # Check if rules evaluated to true
+                rules_triggered = (event.state != "paused") and (rules.logical_trigger(event.rule_logic_type, [res['triggered'] for res in rule_results]) == True)
+
+                # Handle rule reset counters if we're in reset mode
+                if event.is_triggered and plan.require_rule_reset:
+                    if not rules_triggered:
+                        # Rules evaluated to false, increment counter
+                        event.rule_reset_counter += 1
+
+                        if event.rule_reset_counter >= plan.rule_reset_count:
+                            # We've seen enough false evaluations, reset triggered state
+                            self.logger.debug(f"Event {event.name} reset after {event.rule_reset_counter} false evaluations")
+                            event.is_triggered = False
                             event.rule_reset_counter = 0
-                    
-                    if rules_triggered and not event.is_triggered:
-                        event.is_triggered = True
-                        event.last_triggered = start_eval_time
-                        event.state = "triggered"
-                        # Reset the rule reset counter 
+                    else:
+                        # If rules triggered again while waiting for reset, reset the counter
                         event.rule_reset_counter = 0
 
-                        # If this is the first trigger in a sequence, set the continuous trigger start time
-                        if event.continuous_trigger_start_time == 0:
-                            event.continuous_trigger_start_time = event.last_triggered
-
-                        # Check backoff schedule if this is a repeating event and backoff is enabled
-                        if self.enable_backoff_schedule and event.backoff_schedule:
-                            event._check_backoff_schedule(event.last_triggered)
-
-                        rule_index = 0
-                        triggered_image = None
-                        
-                        # not all rules consider or capture images and labels, check if we have them
-                        for rule in event.rules:
-                            if rule_results[rule_index]['triggered'] == True:
-                                if hasattr(rule, 'camera'):
-                                    if "value" in rule_results[rule_index]:
-                                        event.triggered_label = rule_results[rule_index]["value"]
-                                    if "resource" in rule_results[rule_index]:
-                                        event.triggered_camera = rule_results[rule_index]["resource"]
-                                    if "image" in rule_results[rule_index]:
-                                        triggered_image = rule_results[rule_index]["image"]
-                                        # remove once copied because we will use rule_results for state reporting
-                                        del rule_results[rule_index]["image"]
-                                    if event.capture_video:
-                                        asyncio.ensure_future(triggered.request_capture(event, event_resources))
-                            rule_index = rule_index + 1
-
-                        # Convert list to dictionary with indices as keys
-                        event.triggered_rules = {i: result for i, result in enumerate(rule_results)}
+                if rules_triggered and not event.is_triggered:
+                    event.is_triggered = True
+                    event.last_triggered = start_eval_time
+                    event.state = "triggered"
+                    # Reset the rule reset counter 
+                    event.rule_reset_counter = 0
+
+                    # If this is the first trigger in a sequence, set the continuous trigger start time
+                    if event.continuous_trigger_start_time == 0:
+                        event.continuous_trigger_start_time = event.last_triggered
+
+                    # Check backoff schedule if this is a repeating event and backoff is enabled
+                    if self.enable_backoff_schedule and event.backoff_schedule:
+                        event._check_backoff_schedule(event.last_triggered)
 
+                    rule_index = 0
+                    triggered_image = None
+
+                    # not all rules consider or capture images and labels, check if we have them
+                    for rule in event.rules:
+                        # removed from every result, including ones forced false by trigger_sequence_count,
+                        # because we will use rule_results for state reporting and persistence
+                        image = rule_results[rule_index].pop("image", None)
+                        if rule_results[rule_index]['triggered'] == True:
+                            if hasattr(rule, 'camera'):
+                                if "value" in rule_results[rule_index]:
+                                    event.triggered_label = rule_results[rule_index]["value"]
+                                if "resource" in rule_results[rule_index]:
+                                    event.triggered_camera = rule_results[rule_index]["resource"]
+                                if image is not None:
+                                    triggered_image = image
+                                if event.capture_video:
+                                    asyncio.ensure_future(triggered.request_capture(event, event_resources))
+                        rule_index = rule_index + 1
+
+                    # Convert list to dictionary with indices as keys
+                    event.triggered_rules = {i: result for i, result in enumerate(rule_results)}
+
+                    # encode the image once for every notification of this trigger
+                    media = TriggerMedia(triggered_image) if triggered_image is not None else None
+                    for n in event.notifications:
+                        if triggered_image != None:
+                            n.image = triggered_image
+                        await notifications.notify(event, n, event_resources, media=media)
+                    if media is not None:
+                        media.release()
                         for n in event.notifications:
-                            if triggered_image != None:
-                                n.image = triggered_image
-                            await notifications.notify(event, n, event_resources)
-                            
-                        # Save state after significant change
-                        if self.back_state_to_disk:
-                            self._save_event_states()
-                            last_state_save_time = time.time()
-                    elif not rules_triggered:
-                        # Event is no longer triggered, reset continuous trigger time and backoff
-                        event.continuous_trigger_start_time = 0
-                        event.backoff_adjustment = 0
-
-                    # try to respect detection_hz as desired speed of detections
-                    elapsed = (datetime.now() - start_time).total_seconds()
-                    to_wait = (1 / event.detection_hz) - elapsed
-                    if to_wait > 0:
-                        await asyncio.sleep(to_wait)
-                elif (event.is_triggered == True) and (event.actions_paused == False):
-                    self.logger.debug("checking for ACTIONS")
-                    event.state = "actioning"
-
-                    # see if any actions need to be performed
-                    sms_message = ""
-                    # only poll for SMS if there are actions configured for this event
-                    # TODO: only poll if actions are checking for SMS responses
-                    if len(event.actions):
-                        sms_message = await notifications.check_sms_response(event.notifications, event.last_triggered, event_resources)
-                    for action in event.actions:
-                        await self.event_action(event, action, sms_message, event_resources)
-                    
-                    # Save state after actions are taken
-                    if self.back_state_to_disk and time.time() - last_state_save_time > 60:  # Save at most once per minute
-                        self._save_event_states()
-                        last_state_save_time = time.time()
-                        
-                    await asyncio.sleep(1)
-                else:
-                    # sleep if we know we are not currently checking for this event
-                    await asyncio.sleep(.5)
-                    
-                    # Periodically save state if enabled (once every 5 minutes)
-                    if self.back_state_to_disk and time.time() - last_state_save_time > 300:
+                            n.image = None
+
+                    # Save state after significant change
+                    if self.back_state_to_disk:
                         self._save_event_states()
-                        last_state_save_time = time.time()
-
-                # check if mode override is expired
-                if self.mode_overridden != "" and self.mode_override_until is not None and (time.time() >= self.mode_override_until):
-                    self.mode = self.mode_overridden
-                    self.mode_overridden = ""
-                    self.mode_override_until = None
-            except Exception as e:
-                self.logger.error(f'Error in event check loop: {e}')
-                self.logger.error(traceback.format_exc())
-                await asyncio.sleep(1)
-
-        self.logger.info("Ending event check loop for " + event.name)
-        
-        # Save final state when stopping
-        if self.back_state_to_disk:
-            self._save_event_states()
-    
+                        entry.last_state_save_time = time.time()
+                elif not rules_triggered:
+                    # Event is no longer triggered, reset continuous trigger time and backoff
+                    event.continuous_trigger_start_time = 0
+                    event.backoff_adjustment = 0
+
+                # try to respect detection_hz as desired speed of detections
+                elapsed = (datetime.now() - start_time).total_seconds()
+                to_wait = (1 / (event.next_evaluation_hz(partial_match) * self.load_shedder.rate_factor(event.priority))) - elapsed
+                if parked_until is not None:
+                    to_wait = max(to_wait, parked_until - time.time())
+            elif (event.is_triggered == True) and (event.actions_paused == False):
+                self.logger.debug("checking for ACTIONS")
+                event.state = "actioning"
+
+                # see if any actions need to be performed
+                sms_message = ""
+                # only poll for SMS if there are actions configured for this event
+                # TODO: only poll if actions are checking for SMS responses
+                if len(event.actions):
+                    sms_message = await notifications.check_sms_response(event.notifications, event.last_triggered, event_resources)
+                for action in event.actions:
+                    await self.event_action(event, action, sms_message, event_resources)
+
+                # Save state after actions are taken
+                if self.back_state_to_disk and time.time() - entry.last_state_save_time > 60:  # Save at most once per minute
+                    self._save_event_states()
+                    entry.last_state_save_time = time.time()
+
+                to_wait = self._actioning_delay(event)
+            else:
+                # not currently checking for this event, sleep until something can change
+                to_wait = self._idle_delay(event)
+
+                # Periodically save state if enabled (once every 5 minutes)
+                if self.back_state_to_disk and time.time() - entry.last_state_save_time > 300:
+                    self._save_event_states()
+                    entry.last_state_save_time = time.time()
+        except Exception as e:
+            log_error(self.logger, f'Error in event check loop for {event.name}: {e}', e)
+            to_wait = 1
+        finally:
+            error_log_for(self.logger).flush(self.logger)
+        return to_wait
+
+    async def _evaluate_rules(self, event: events.Event, event_resources: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], bool]:
+        """Evaluate an event's rules concurrently, returning the results in rule order and whether anything partially matched.
+
+        Rules are started in cost order (see _evaluation_order), at most max_concurrent_rules at a time if
+        that is set.  When rule_logic_type can short-circuit, results are processed as rules finish, and once
+        the outcome is certain (the first false for AND/NAND, the first true for OR/NOR) rules that are still
+        running or not yet started are cancelled and reported as skipped, unless they carry a pause setting
+        that could still pause the event.  With a trigger_sequence_count above 1 every result feeds the
+        sequence counter, so results are processed in order instead.
+        """
+        rule_list = getattr(event, 'rules', [])
+        short_circuit_on = self._short_circuit_on(event)
+        order = self._evaluation_order(event)
+        limit = int(event.max_concurrent_rules) if event.max_concurrent_rules > 0 else len(order)
+
+        tasks: Dict[int, "asyncio.Future[Dict[str, Any]]"] = {}
+        def start(i: int) -> "asyncio.Future[Dict[str, Any]]":
+            self.logger.debug(rule_list[i])
+            tasks[i] = asyncio.ensure_future(self._timed_eval_rule(rule_list[i], event_resources))
+            return tasks[i]
+
+        results: Dict[int, Dict[str, Any]] = {}
+        partial_match = False
+        decided = False
+        def record(i: int, result: Dict[str, Any]) -> bool:
+            """Apply a rule's result to the event, returning True if it paused the event"""
+            nonlocal partial_match, decided
+            rule = rule_list[i]
+            # anything seen (even below threshold, or a sequence that has only started) speeds up adaptive-rate events
+            if result.get("partial") or (result["triggered"] == True and rule.type != "time"):
+                partial_match = True
+            if result["triggered"] == True:
+                event.sequence_count_current = event.sequence_count_current + 1
+            else:
+                event.sequence_count_current = 0
+
+            if event.sequence_count_current< event.trigger_sequence_count:
+                # don't consider triggered as we've not met the threshold
+                result["triggered"] = False
+            else:
+                # reset sequence count if we are at the sequence count threshold
+                event.sequence_count_current = 0
+
+            # rule settings can determine if the event loop should be paused on
+            # non-triggered events
+            plan = rule_plan(rule)
+            if plan.inverse_pause_secs > 0 and not result["triggered"]:
+                event.start_pause(time.time(), plan.inverse_pause_secs, f"{rule.type} rule inverse pause for {plan.inverse_pause_secs} secs")
+                return True
+            if plan.pause_on_known_secs > 0 and "known_person_seen" in result and result["known_person_seen"]:
+                event.start_pause(time.time(), plan.pause_on_known_secs, "known person")
+                return True
+
+            results[i] = result
+            if short_circuit_on is not None and result["triggered"] == short_circuit_on:
+                decided = True
+            return False
+
+        paused = False
+        try:
+            if short_circuit_on is None:
+                for position, i in enumerate(order):
+                    for j in order[position:position + limit]:
+                        if j not in tasks:
+                            start(j)
+                    if record(i, await tasks[i]):
+                        paused = True
+                        break
+            else:
+                rank = {i: position for position, i in enumerate(order)}
+                running: Dict["asyncio.Future[Dict[str, Any]]", int] = {}
+                position = 0
+                while True:
+                    while position < len(order) and len(running) < limit:
+                        i = order[position]
+                        position += 1
+                        if not decided or _has_pause_settings(rule_list[i]):
+                            running[start(i)] = i
+                    if not running:
+                        break
+                    done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    # rules finishing together are taken in evaluation order so the outcome does not depend on scheduling
+                    for task in sorted(done, key=lambda t: rank[running[t]]):
+                        if record(running.pop(task), task.result()):
+                            paused = True
+                            break
+                    if paused:
+                        break
+                    if decided:
+                        for task, i in list(running.items()):
+                            if not _has_pause_settings(rule_list[i]):
+                                task.cancel()
+                                del running[task]
+        finally:
+            for task in tasks.values():
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # mark errors from rules whose results were not needed as retrieved
+                    task.exception()
+
+        if paused:
+            return [results[i] for i in sorted(results)], partial_match
+        return [results.get(i, {"triggered": False, "skipped": True}) for i in range(len(rule_list))], partial_match
+
+    async def _timed_eval_rule(self, rule: Any, event_resources: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.monotonic()
+        result = await self.rule_graph.evaluate(rule, event_resources)
+        get_rule_stats(rule).record((time.monotonic() - start) * 1000, result["triggered"] == True)
+        return result
+
+    def _short_circuit_on(self, event: events.Event) -> Optional[bool]:
+        # with a sequence count, every rule's result feeds the sequence counter, so all must be evaluated in order
+        if event.trigger_sequence_count > 1:
+            return None
+        return _short_circuit_value(event.rule_logic_type)
+
+    def _evaluation_order(self, event: events.Event) -> List[int]:
+        """Cheapest, most decisive rules first when the logic type can short-circuit, otherwise configured order"""
+        rule_list = getattr(event, 'rules', [])
+        if not event.reorder_rules:
+            return list(range(len(rule_list)))
+        return cost_order(rule_list, self._short_circuit_on(event))
+
+    def _time_gate(self, event: events.Event, now: Optional[datetime] = None) -> Optional[float]:
+        """If a closed time window keeps an AND event from triggering, when to evaluate it next"""
+        if event.rule_logic_type != "AND" or event.trigger_sequence_count > 1:
+            return None
+        now = now or datetime.now()
+        opens_at = None
+        for rule in getattr(event, 'rules', []):
+            if isinstance(rule, rules.RuleTime) and not rules.in_time_window(rule, now):
+                transition = rules.next_time_transition(rule, now)
+                transition_at = transition.timestamp() if transition is not None else float('inf')
+                # every time window has to be open, so wait for the latest of them
+                opens_at = transition_at if opens_at is None else max(opens_at, transition_at)
+        if opens_at is None:
+            return None
+        # re-check at least hourly in case the clock is adjusted
+        return min(opens_at, time.time() + self.time_gate_max_park_secs)
+
+    def _actioning_delay(self, event: events.Event) -> float:
+        """Seconds until a triggered event's next action deadline or pause expiry"""
+        # responses to notifications can only be noticed by polling
+        if any(a.response_match != "" and not a.taken for a in event.actions):
+            return 1
+        now = time.time()
+        deadlines = [event.last_triggered + event.get_effective_pause_duration()]
+        for a in event.actions:
+            if not a.taken and getattr(a, 'when_secs', -1) != -1:
+                deadlines.append(event.last_triggered + a.when_secs)
+        return max(min(deadlines) - now, .1)
+
+    def _idle_delay(self, event: events.Event) -> float:
+        """Seconds until an event that is neither monitoring nor actioning could change state"""
+        if self.mode in event.modes:
+            if event.is_triggered:
+                # waiting on the alerting pause
+                return max(event.last_triggered + event.get_effective_pause_duration() - time.time(), 0)
+            return .5
+        # not eligible in this mode, parked until the mode changes (or a do_command wakes it)
+        return math.inf
+
+    def _mode_changed(self, old: str, new: str) -> None:
+        """Wake the events whose eligibility changed with the mode"""
+        self.logger.info(f"Mode changed from {old} to {new}")
+        try:
+            self.scheduler.wake(lambda entry: (old in entry.event.modes) != (new in entry.event.modes))
+        except RuntimeError:
+            # no running event loop yet (during the first reconfigure), nothing is scheduled
+            pass
+
     async def event_action(self, event: events.Event, action: actions.Action, message: str, event_resources: Dict[str, Any]):
         should_action = await actions.eval_action(event, action, message)
         if should_action:
@@ -666,6 +952,7 @@ class eventManager(Sensor, Reconfigurable):
                         e.last_triggered = time.time()
                         e.state = "triggered"
                         result = {"triggered": True}
+                        self._wake_event(e)
             elif name == "pause_triggered" and isinstance(args, dict):
                 for e in self.event_states:
                     if (e.name == args.get("event", "")) and e.is_triggered == True:
@@ -673,14 +960,40 @@ class eventManager(Sensor, Reconfigurable):
                         e.pause_reason = "manual"
                         e.actions_paused = True
                         result = {"paused": True}
+                        self._wake_event(e)
             elif name == "respond_triggered" and isinstance(args, dict):
                 for e in self.event_states:
                     if (e.name == args.get("event", "")) and e.is_triggered == True:
                         for action in e.actions:
                             await self.event_action(e, action, args.get("response", ""), self.robot_resources)
+                        self._wake_event(e)
                 result = {"responded": True}
+            elif name == "set_mode" and isinstance(args, str):
+                # switches mode in place; the configured mode applies again on the next reconfigure
+                self.mode_state.set(args)
+                result.update(self._mode_result())
+            elif name == "set_mode_override" and isinstance(args, dict):
+                mode_value = args.get("mode", self.mode)
+                if args.get("until") is not None:
+                    self.mode_state.set_override(str(mode_value), iso8601_to_timestamp(str(args["until"])))
+                elif args.get("duration_secs") is not None:
+                    self.mode_state.set_override(str(mode_value), time.time() + float(args["duration_secs"]))
+                else:
+                    self.mode_state.cancel_override()
+                result.update(self._mode_result())
 
         return result  
+
+    def _mode_result(self) -> Dict[str, Any]:
+        ret: Dict[str, Any] = {"mode": self.mode}
+        if self.mode_override_until is not None:
+            ret["mode_override_until"] = datetime.fromtimestamp(int(self.mode_override_until), timezone.utc).isoformat().replace('+00:00', 'Z')
+            ret["mode_overridden"] = self.mode_overridden
+        return ret
+
+    def _wake_event(self, event: events.Event) -> None:
+        """Re-evaluate an event now rather than at its next scheduled time, after an external state change"""
+        self.scheduler.wake(lambda entry: entry.event is event)
     
     async def get_readings(
         self, *, extra: Optional[Mapping[str, Any]] = None, timeout: Optional[float] = None, **kwargs
@@ -771,6 +1084,18 @@ class eventManager(Sensor, Reconfigurable):
                     layer.add_edge(pydot.Edge(f'a{event_number}{len(actions)}', f'Paused{event_number}'))
 
             ret["state"][e.name]["actions"] = actions
+            if not from_dm_from_extra(dict(extra) if extra is not None else None):
+                if e.is_adaptive_rate():
+                    ret["state"][e.name]["evaluation_hz"] = e.current_hz
+                if self.load_shedder.rate_factor(e.priority) < 1:
+                    ret["state"][e.name]["shed_rate_factor"] = self.load_shedder.factor
+                if e.pause_count > 0:
+                    ret["state"][e.name]["pauses"] = e.pause_count
+                    ret["state"][e.name]["paused_secs"] = round(e.paused_secs(time.time()), 1)
+                rule_stats = self._rule_stats(e)
+                if rule_stats:
+                    ret["state"][e.name]["rule_stats"] = rule_stats
+                    ret["state"][e.name]["rule_order"] = self._evaluation_order(e)
             if include_dot:
                 if len(e.actions) == 0:
                     # connect straight to Paused if no configured actions
@@ -784,8 +1109,49 @@ class eventManager(Sensor, Reconfigurable):
         if include_dot:
             ret["dot"] = graph.to_string()
 
+        if not from_dm_from_extra(dict(extra) if extra is not None else None):
+            ret["cache"] = {
+                "frames": self.frame_cache.stats(),
+                "inference": self.inference_cache.stats(),
+                "frame_hash": self.frame_results.stats()
+            }
+            ret["scheduler"] = self.scheduler.stats()
+            ret["rules"] = self.rule_graph.stats()
+            ret["resources"] = self.resource_guards.stats()
+            ret["errors"] = error_log_for(self.logger).stats()
+            if self.load_shedder.latency_budget_ms > 0:
+                ret["load_shedding"] = self.load_shedder.stats()
+
         return ret
     
+    def _rule_stats(self, event: events.Event) -> List[Dict[str, Any]]:
+        """Per-rule evaluation statistics, used for tuning and debugging"""
+        rule_stats = []
+        for index, rule in enumerate(getattr(event, 'rules', [])):
+            stats: Dict[str, Any] = {}
+            rule_stats_entry = rule.__dict__.get('_rule_stats')
+            if isinstance(rule_stats_entry, RuleStats):
+                stats.update(rule_stats_entry.stats())
+            gate = rule.__dict__.get('_motion_gate')
+            if isinstance(gate, MotionGate):
+                stats.update(gate.stats())
+            if stats:
+                stats["rule"] = index
+                stats["type"] = rule.type
+                rule_stats.append(stats)
+        return rule_stats
+
+def _short_circuit_value(logic_type: str) -> Optional[bool]:
+    """The rule result that decides the outcome of logic_type on its own, if there is one"""
+    if logic_type in ("AND", "NAND"):
+        return False
+    if logic_type in ("OR", "NOR"):
+        return True
+    return None
+
+def _has_pause_settings(rule: Any) -> bool:
+    return rule_plan(rule).pauses
+
 def layer_color(state: str, state_node: str) -> str:
     if state == state_node:
         return "red"
@@ -0,0 +1,170 @@
+import re
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Pattern, Tuple
+
+from viam.components.camera import Camera
+from viam.components.generic import Generic as GenericComponent
+from viam.components.motor import Motor
+from viam.components.sensor import Sensor
+from viam.proto.common import ResourceName
+from viam.services.generic import Generic as GenericService
+from viam.services.vision import VisionClient
+
+from .resourceCache import extra_key
+
+# resource type and subtype, as configured in `resources`, to the API used to name the dependency
+RESOURCE_APIS: Dict[Tuple[str, str], Any] = {
+    ("component", "camera"): Camera,
+    ("component", "sensor"): Sensor,
+    ("component", "motor"): Motor,
+    ("component", "generic"): GenericComponent,
+    ("service", "generic"): GenericService,
+    ("service", "vision"): VisionClient,
+}
+
+# rule attributes naming a vision service
+VISION_ATTRIBUTES = ("detector", "classifier", "tracker")
+
+
+def resource_name(name: str, resource_type: str, resource_subtype: str) -> Optional[ResourceName]:
+    api = RESOURCE_APIS.get((resource_type, resource_subtype))
+    return api.get_resource_name(name) if api is not None else None
+
+
+class _Frozen():
+    """Attributes are set once in __init__ and cannot be changed afterwards"""
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable, compile a new one instead")
+
+    def _init(self, **values: Any) -> None:
+        self.__dict__.update(values)
+
+
+class RulePlan(_Frozen):
+    """What a rule's evaluation needs from its configuration, worked out once instead of on every tick"""
+    class_pattern: Optional[Pattern[str]]
+    result_keys: Tuple[str, ...]
+    result_pattern: Optional[Pattern[str]]
+    extra: Mapping[str, Any]
+    extra_key: str
+    defer_image: bool
+    timeout_ms: Optional[float]
+    motion_threshold: float
+    motion_recheck_secs: float
+    inverse_pause_secs: float
+    pause_on_known_secs: float
+    pauses: bool
+
+    def __init__(self, rule: Any):
+        class_regex = getattr(rule, 'class_regex', None)
+        result_path = getattr(rule, 'result_path', "")
+        result_value = getattr(rule, 'result_value', None)
+        extra = getattr(rule, 'extra', None) or {}
+        defer_image = bool(getattr(rule, 'defer_image', False))
+        inverse_pause_secs = _pause_secs(rule, 'inverse_pause_secs')
+        pause_on_known_secs = _pause_secs(rule, 'pause_on_known_secs')
+        self._init(
+            class_pattern=re.compile(str(class_regex)) if class_regex is not None else None,
+            result_keys=tuple(result_path.split('.')) if isinstance(result_path, str) and result_path else (),
+            result_pattern=re.compile(result_value) if getattr(rule, 'result_operator', None) == "regex" and isinstance(result_value, str) else None,
+            extra=extra,
+            extra_key=extra_key(extra),
+            defer_image=defer_image,
+            timeout_ms=getattr(rule, 'timeout_ms', None),
+            # the motion gate needs a frame, so it does not apply to rules that defer fetching the image
+            motion_threshold=0 if defer_image else (getattr(rule, 'motion_threshold', 0) or 0),
+            motion_recheck_secs=getattr(rule, 'motion_recheck_secs', 30),
+            inverse_pause_secs=inverse_pause_secs,
+            pause_on_known_secs=pause_on_known_secs,
+            pauses=inverse_pause_secs > 0 or pause_on_known_secs > 0
+        )
+
+
+def _pause_secs(rule: Any, attr: str) -> float:
+    # 0 (no pause) for rule types without the setting or an unusable value
+    value = getattr(rule, attr, 0)
+    return value if isinstance(value, (int, float)) and value > 0 else 0
+
+
+def rule_plan(rule: Any) -> RulePlan:
+    """The rule's compiled plan, compiling it on first use"""
+    plan = rule.__dict__.get('_plan')
+    if plan is None:
+        plan = compile_rule(rule)
+    return plan
+
+
+def compile_rule(rule: Any) -> RulePlan:
+    """(Re)compile the rule's plan, replacing any it already has"""
+    plan = RulePlan(rule)
+    rule.__dict__['_plan'] = plan
+    return plan
+
+
+class EventPlan(_Frozen):
+    """An event compiled against the resources of one configuration.
+
+    Holds the event settings each tick reads and the resource handles resolved from the
+    dependencies, so ticks look resources up by name instead of re-deriving resource names
+    from the configuration.  Building it also recompiles the plan of each of the event's rules.
+    Built whenever the event is (re)scheduled and replaced, never modified.
+    """
+    priority: int
+    require_rule_reset: bool
+    rule_reset_count: int
+    handles: Mapping[str, Any]
+
+    def __init__(self, event: Any, resources: Optional[Dict[str, Any]] = None):
+        for rule in getattr(event, 'rules', []):
+            compile_rule(rule)
+        self._init(
+            priority=int(getattr(event, 'priority', 0)),
+            require_rule_reset=bool(getattr(event, 'require_rule_reset', False)),
+            rule_reset_count=getattr(event, 'rule_reset_count', 1),
+            handles=MappingProxyType(_resolve_handles(event, resources or {}))
+        )
+
+
+def event_plan(event: Any, resources: Dict[str, Any]) -> EventPlan:
+    """The event's plan carried by its resources, compiling one if they do not carry it yet"""
+    plan = resources.get('_plan')
+    if plan is None:
+        plan = EventPlan(event, resources)
+        resources['_plan'] = plan
+    return plan
+
+
+def _resolve_handles(event: Any, resources: Dict[str, Any]) -> Dict[str, Any]:
+    deps = resources.get('_deps') or {}
+    configured = resources.get('resources') or {}
+    handles: Dict[str, Any] = {}
+
+    def resolve(name: Any, resource_type: Optional[str] = None, resource_subtype: Optional[str] = None) -> None:
+        if not isinstance(name, str) or not name or name in handles:
+            return
+        settings = configured.get(name) if isinstance(configured, dict) else None
+        if resource_type is None and isinstance(settings, dict):
+            resource_type, resource_subtype = settings.get("type"), settings.get("subtype")
+        if resource_type is None or resource_subtype is None:
+            return
+        dep_name = resource_name(name, resource_type, resource_subtype)
+        if dep_name is not None and dep_name in deps:
+            handles[name] = deps[dep_name]
+
+    for rule in getattr(event, 'rules', []):
+        resolve(rule.__dict__.get('camera'), "component", "camera")
+        for attr in VISION_ATTRIBUTES:
+            resolve(rule.__dict__.get(attr), "service", "vision")
+        resolve(rule.__dict__.get('resource'))
+    for action in getattr(event, 'actions', []):
+        resolve(getattr(action, 'resource', None))
+    return handles
+
+
+def plan_handle(resources: Dict[str, Any], name: str) -> Optional[Any]:
+    """The resolved handle for a resource, if the resources carry a plan that has it"""
+    plan = resources.get('_plan')
+    if plan is None:
+        return None
+    return plan.handles.get(name)
@@ -10,13 +10,23 @@ class Event():
     event_video_capture_padding_secs: int = 10
     pause_alerting_on_event_secs: int = 60
     detection_hz: int = 5
+    priority: int = 0  # higher priority events are served first by busy resources and are not slowed under load
+    min_hz: float = 0  # with max_hz, enables an adaptive evaluation rate instead of detection_hz
+    max_hz: float = 0
+    hz_decay: float = 0.8  # factor applied to the current rate on each tick without a partial match
+    current_hz: float = 0
     notification_settings: list
     is_triggered: bool = False
     last_triggered: float = 0
     paused_until: float = 0
+    pause_started: float = 0
+    pause_count: int = 0  # rule pauses so far, with paused_secs_total the time they held the event
+    paused_secs_total: float = 0
     pause_reason: str = ""
     modes: list = ["inactive"]
     rule_logic_type: str = 'AND'
+    reorder_rules: bool = True  # evaluate cheap, decisive rules first when rule_logic_type can short-circuit
+    max_concurrent_rules: int = 0  # 0 means all of an event's rules are evaluated at once
     rules: list[RuleDetector|RuleClassifier|RuleTime|RuleTracker|RuleCall]
     notifications: list[NotificationSMS|NotificationEmail|NotificationWebhookGET|NotificationPush]
     actions: list[Action]
@@ -93,6 +103,43 @@ class Event():
         """Get the effective pause duration including any backoff adjustments"""
         return self.pause_alerting_on_event_secs + self.backoff_adjustment
 
+    def start_pause(self, now: float, secs: float, reason: str) -> None:
+        """Hold the event, without evaluating rules, for secs"""
+        self.end_pause(now)
+        self.paused_until = now + secs
+        self.pause_started = now
+        self.pause_count += 1
+        self.state = "paused"
+        self.pause_reason = reason
+
+    def end_pause(self, now: float) -> None:
+        if self.pause_started > 0:
+            self.paused_secs_total += max(min(now, self.paused_until) - self.pause_started, 0)
+            self.pause_started = 0
+
+    def paused_secs(self, now: float) -> float:
+        """Total time held by rule pauses, including a pause in progress"""
+        if self.pause_started > 0:
+            return self.paused_secs_total + max(min(now, self.paused_until) - self.pause_started, 0)
+        return self.paused_secs_total
+
+    def is_adaptive_rate(self) -> bool:
+        return self.min_hz > 0 and self.max_hz > 0
+
+    def next_evaluation_hz(self, partial_match: bool) -> float:
+        """Get the evaluation rate for the next tick.
+
+        With min_hz/max_hz configured, the rate jumps to max_hz as soon as any rule partially
+        matches and then decays back towards min_hz; otherwise detection_hz is used.
+        """
+        if not self.is_adaptive_rate():
+            return self.detection_hz
+        if partial_match:
+            self.current_hz = self.max_hz
+        else:
+            self.current_hz = max(self.min_hz, (self.current_hz or self.min_hz) * self.hz_decay)
+        return self.current_hz
+
     def _check_backoff_schedule(self, current_time: float) -> None:
         """Check and update backoff adjustment based on time since continuous triggering started"""
         if not self.backoff_schedule or self.continuous_trigger_start_time <= 0:
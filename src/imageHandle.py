@@ -0,0 +1,154 @@
+import asyncio
+import base64
+from io import BytesIO
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from PIL import Image
+from viam.media.video import ViamImage, CameraMimeType
+from viam.media.utils.pil import viam_to_pil_image
+
+
+class ImageHandle():
+    """A triggered camera image that is decoded to PIL at most once, and only when a consumer asks for it.
+
+    Holds the raw ViamImage returned by the camera or vision service, and an optional
+    crop box (for example a tracker detection) that is applied on decode.  If the rule
+    did not fetch an image while monitoring, a fetch function is held instead and the
+    image is only requested from the camera when load() is awaited.
+    """
+    image: Optional[ViamImage]
+    crop_box: Optional[Tuple[Any, Any, Any, Any]] = None
+    fetch: Optional[Callable[[], Awaitable[ViamImage]]] = None
+    decode_count: int = 0
+
+    def __init__(
+        self,
+        image: Optional[ViamImage],
+        crop_box: Optional[Tuple[Any, Any, Any, Any]] = None,
+        fetch: Optional[Callable[[], Awaitable[ViamImage]]] = None
+    ):
+        self.image = image
+        self.crop_box = crop_box
+        self.fetch = fetch
+        self.decode_count = 0
+        self._pil: Optional[Image.Image] = None
+        self._fetching: Optional["asyncio.Future[ViamImage]"] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # the fetch function and any in-progress fetch belong to the running event manager, and
+        # the decoded image is redone on demand; a deferred image that was never fetched stays unavailable
+        state = self.__dict__.copy()
+        state.update(fetch=None, _fetching=None, _pil=None)
+        return state
+
+    async def load(self) -> None:
+        """Fetch a deferred image from the camera; a no-op if the image is already held"""
+        if self.image is not None or self.fetch is None:
+            return
+        if self._fetching is None:
+            self._fetching = asyncio.ensure_future(self.fetch())
+        self.image = await self._fetching
+
+    def pil(self) -> Image.Image:
+        """Return the decoded (and cropped, if configured) PIL image, decoding on first use"""
+        if self.image is None:
+            raise ValueError("image has not been fetched, await load() first")
+        if self._pil is None:
+            decoded = viam_to_pil_image(self.image)
+            if self.crop_box is not None:
+                decoded = decoded.crop(self.crop_box)
+            self._pil = decoded
+            self.decode_count += 1
+        return self._pil
+
+    def can_pass_through(self) -> bool:
+        """True if the camera's own bytes are already a JPEG of exactly the image we would send"""
+        return self.image is not None and self.crop_box is None and self.image.mime_type == CameraMimeType.JPEG
+
+    def jpeg_bytes(self) -> bytes:
+        """Return JPEG bytes, forwarding the camera's JPEG untouched when no crop is needed"""
+        if self.image is not None and self.can_pass_through():
+            return self.image.data
+        return encode_jpeg(self.pil())
+
+
+class EncodedMedia():
+    """One encoded variant of a trigger's image"""
+    data: bytes
+    base64: str
+    mime_type: str
+
+    def __init__(self, data: bytes, mime_type: str):
+        self.data = data
+        self.base64 = base64.b64encode(data).decode("ascii")
+        self.mime_type = mime_type
+
+
+class TriggerMedia():
+    """The image for a single trigger, encoded once and shared by every notification of that trigger.
+
+    Each (format, size) variant is encoded on first request and memoized until release() is called.
+    """
+    image: Any
+    encode_count: int = 0
+
+    def __init__(self, image: Any):
+        self.image = image
+        self.encode_count = 0
+        self._variants: Dict[Tuple[str, Optional[Tuple[int, int]]], EncodedMedia] = {}
+
+    def variant(self, format: str = "JPEG", size: Optional[Tuple[int, int]] = None) -> EncodedMedia:
+        key = (format.upper(), size)
+        if key not in self._variants:
+            self._variants[key] = self._encode(key[0], size)
+            self.encode_count += 1
+        return self._variants[key]
+
+    async def load(self) -> None:
+        """Fetch the image if its rule deferred fetching it until a consumer needed it"""
+        if isinstance(self.image, ImageHandle):
+            await self.image.load()
+
+    def jpeg(self) -> EncodedMedia:
+        return self.variant("JPEG")
+
+    def thumbnail(self, size: Tuple[int, int] = (320, 320)) -> EncodedMedia:
+        return self.variant("JPEG", size)
+
+    def release(self) -> None:
+        """Drop the image and encoded variants once the trigger's notifications are dispatched"""
+        self._variants = {}
+        self.image = None
+
+    def _encode(self, format: str, size: Optional[Tuple[int, int]]) -> EncodedMedia:
+        if size is None and format == "JPEG":
+            return EncodedMedia(to_jpeg_bytes(self.image), "image/jpeg")
+        pil = to_pil(self.image)
+        if size is not None:
+            pil = pil.copy()
+            pil.thumbnail(size)
+        return EncodedMedia(encode_image(pil, format), Image.MIME.get(format, "image/jpeg"))
+
+
+def encode_image(image: Image.Image, format: str) -> bytes:
+    buffered = BytesIO()
+    image.save(buffered, format=format)
+    return buffered.getvalue()
+
+
+def encode_jpeg(image: Image.Image) -> bytes:
+    return encode_image(image, "JPEG")
+
+
+def to_jpeg_bytes(image: Any) -> bytes:
+    """Return JPEG bytes for either an ImageHandle or an already decoded PIL image"""
+    if isinstance(image, ImageHandle):
+        return image.jpeg_bytes()
+    return encode_jpeg(image)
+
+
+def to_pil(image: Any) -> Optional[Image.Image]:
+    """Return a PIL image for either an ImageHandle or an already decoded PIL image"""
+    if isinstance(image, ImageHandle):
+        return image.pil()
+    return image
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from typing import Callable, List, Optional
+
+# called with (old mode, new mode) after every change
+ModeListener = Callable[[str, str], None]
+
+
+class ModeState():
+    """The current mode, observable so events can wait for it to change instead of polling.
+
+    A mode override replaces the mode until override_until, when the overridden mode is
+    restored by a single timer rather than by every event checking the clock.  Listeners
+    are called on each change, and wait_for_change() returns once the mode has changed.
+    """
+    mode: str = "inactive"
+    overridden: str = ""
+    override_until: Optional[float] = None
+
+    def __init__(self, mode: str = "inactive"):
+        self.mode = mode
+        self.overridden = ""
+        self.override_until = None
+        self._listeners: List[ModeListener] = []
+        self._changed = asyncio.Event()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def subscribe(self, listener: ModeListener) -> None:
+        self._listeners.append(listener)
+
+    def set(self, mode: str) -> None:
+        """Switch mode, cancelling any override"""
+        self._cancel_timer()
+        self.overridden = ""
+        self.override_until = None
+        self._change(mode)
+
+    def set_override(self, mode: str, until: float) -> None:
+        """Use mode until the given timestamp, then go back to the current (non-override) mode"""
+        self._cancel_timer()
+        if self.override_until is None:
+            self.overridden = self.mode
+        self.override_until = until
+        self._change(mode)
+        self.start()
+
+    def cancel_override(self) -> None:
+        if self.override_until is not None:
+            self.set(self.overridden)
+
+    def start(self) -> None:
+        """Arm the override expiry timer; needs a running event loop, so is retried when the manager starts"""
+        if self.override_until is None or self._timer is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._timer = loop.call_later(max(self.override_until - time.time(), 0), self._expire)
+
+    async def wait_for_change(self) -> None:
+        await self._changed.wait()
+
+    def _expire(self) -> None:
+        self._timer = None
+        if self.override_until is not None:
+            self.set(self.overridden)
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _change(self, mode: str) -> None:
+        old = self.mode
+        self.mode = mode
+        if old == mode:
+            return
+        # wake everything waiting on this change, later waiters wait for the next one
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+        for listener in self._listeners:
+            listener(old, mode)
@@ -0,0 +1,80 @@
+import time
+from io import BytesIO
+from typing import Any, Dict, Optional
+
+import numpy as np
+from PIL import Image
+from viam.media.video import ViamImage, CameraMimeType
+from viam.media.utils.pil import viam_to_pil_image
+
+
+class MotionGate():
+    """Frame-difference prefilter that decides whether a rule's vision call is worth making.
+
+    Each frame is reduced to a small grayscale array and compared with the frame the rule
+    was last successfully evaluated on (see record).  If the mean absolute pixel difference (0-255) is below
+    threshold, the vision call can be skipped, but never for longer than recheck_secs.
+    """
+    threshold: float
+    recheck_secs: float
+    size: int = 32
+    skipped: int = 0
+    evaluated: int = 0
+    last_difference: Optional[float] = None
+    last_response: Optional[Dict[str, Any]] = None
+
+    def __init__(self, threshold: float, recheck_secs: float):
+        self.threshold = threshold
+        self.recheck_secs = recheck_secs
+        self.skipped = 0
+        self.evaluated = 0
+        self.last_difference = None
+        self.last_response = None
+        self._reference: Optional[np.ndarray] = None
+        self._pending: Optional[np.ndarray] = None
+        self._last_evaluated_at: float = 0
+
+    def should_evaluate(self, image: ViamImage) -> bool:
+        frame = downsample(image, self.size)
+        now = time.time()
+
+        # only skip when there is a successful evaluation to reuse
+        if self._reference is not None and self.last_response is not None and self._reference.shape == frame.shape:
+            self.last_difference = float(np.abs(frame - self._reference).mean())
+            if self.last_difference < self.threshold and (now - self._last_evaluated_at) < self.recheck_secs:
+                self.skipped += 1
+                return False
+
+        self._pending = frame
+        self.evaluated += 1
+        return True
+
+    def record(self, response: Dict[str, Any]) -> None:
+        """Remember a successful evaluation of the frame passed to should_evaluate, to reuse while the scene is unchanged.
+
+        The response's image is not kept, as it holds a whole frame; callers reusing the response attach the current one.
+        """
+        if self._pending is None:
+            return
+        self._reference = self._pending
+        self._pending = None
+        self._last_evaluated_at = time.time()
+        self.last_response = {k: v for k, v in response.items() if k != "image"}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "motion_skipped": self.skipped,
+            "motion_evaluated": self.evaluated,
+            "motion_last_difference": self.last_difference
+        }
+
+
+def downsample(image: ViamImage, size: int) -> np.ndarray:
+    """Return a size x size grayscale array of the image, decoding as little as possible"""
+    if image.mime_type == CameraMimeType.JPEG:
+        pil = Image.open(BytesIO(image.data))
+        # JPEG can be decoded directly at a fraction of full resolution
+        pil.draft("L", (size * 4, size * 4))
+    else:
+        pil = viam_to_pil_image(image)
+    return np.asarray(pil.convert("L").resize((size, size)), dtype=np.int16)
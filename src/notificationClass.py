@@ -6,6 +6,7 @@ class NotificationSMS():
     to: str
     preset: str
     image: Optional[Image.Image] = None
+    timeout_ms: Optional[float] = None
     include_image: bool = True
     def __init__(self, **kwargs):
         for key, value in kwargs.items():
@@ -16,6 +17,7 @@ class NotificationEmail():
     to: str
     preset: str
     image: Optional[Image.Image] = None
+    timeout_ms: Optional[float] = None
     include_image: bool = False
     
     def __init__(self, **kwargs):
@@ -26,6 +28,7 @@ class NotificationWebhookGET():
     type: str="webhook_get"
     url: str
     image: Optional[Image.Image] = None
+    timeout_ms: Optional[float] = None
     include_image: bool = False
     def __init__(self, **kwargs):
         for key, value in kwargs.items():
@@ -36,6 +39,7 @@ class NotificationPush():
     fcm_tokens: list[str]
     preset: str
     image: Optional[Image.Image] = None
+    timeout_ms: Optional[float] = None
     include_image: bool = False
     def __init__(self, **kwargs):
         for key, value in kwargs.items():
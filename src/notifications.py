@@ -1,15 +1,16 @@
+import asyncio
 import urllib.request
-import base64
-from io import BytesIO
 from datetime import datetime, timezone
 from typing import Dict, Any, List, Union, Optional
 from PIL import Image
 from . import events
 from .notificationClass import NotificationEmail, NotificationSMS, NotificationWebhookGET, NotificationPush
 from .globals import getParam
+from .imageHandle import TriggerMedia
+from .resourceGuard import guarded
 
 
-async def notify(event: events.Event, notification: Union[NotificationEmail, NotificationSMS, NotificationWebhookGET, NotificationPush], resources: Dict[str, Any]) -> None:
+async def notify(event: events.Event, notification: Union[NotificationEmail, NotificationSMS, NotificationWebhookGET, NotificationPush], resources: Dict[str, Any], media: Optional[TriggerMedia] = None) -> None:
 
     notification_args: Dict[str, Any] = {"command": "send", "preset": notification.preset if hasattr(notification, "preset") else None, 
                             "template_vars": {
@@ -25,11 +26,17 @@ async def notify(event: events.Event, notification: Union[NotificationEmail, Not
     if hasattr(notification, "fcm_tokens"):
         notification_args["fcm_tokens"] = notification.fcm_tokens
 
-    # create base64 representation of the image if needed
-    if hasattr(notification, "include_image") and notification.include_image and notification.image is not None:
-        buffered = BytesIO()
-        notification.image.save(buffered, format="JPEG")
-        img_base64_str = base64.b64encode(buffered.getvalue()).decode("ascii")
+    # create base64 representation of the image if needed, reusing the trigger's shared media if given
+    if hasattr(notification, "include_image") and notification.include_image:
+        if media is None and notification.image is not None:
+            media = TriggerMedia(notification.image)
+        if media is not None and media.image is not None:
+            try:
+                await media.load()
+                encoded = media.jpeg()
+                img_base64_str = encoded.base64
+            except Exception as e:
+                getParam('logger').error(f"Unable to get image for {notification.type} notification, sending without it: {e}")
     
     match notification.type:
         case "email":
@@ -38,7 +45,7 @@ async def notify(event: events.Event, notification: Union[NotificationEmail, Not
                 if hasattr(notification, "include_image") and notification.include_image:
                     if 'img_base64_str' in locals():
                         notification_args["template_vars"]["image_base64"] = img_base64_str
-                        notification_args["template_vars"]["media_mime_type"] = "image/jpeg"
+                        notification_args["template_vars"]["media_mime_type"] = encoded.mime_type
             else:
                 getParam('logger').warning("No email module defined, can't send notification email")
                 return
@@ -49,13 +56,18 @@ async def notify(event: events.Event, notification: Union[NotificationEmail, Not
                     # Only add media_base64 if img_base64_str was created
                     if 'img_base64_str' in locals():
                         notification_args["media_base64"] = img_base64_str
-                        notification_args["media_mime_type"] = "image/jpeg"
+                        notification_args["media_mime_type"] = encoded.mime_type
             else:
                 getParam('logger').warning("No SMS module defined, can't send notification SMS")
                 return
         case "webhook_get":
             if isinstance(notification, NotificationWebhookGET) and hasattr(notification, "url"):
-                contents = urllib.request.urlopen(notification.url).read()
+                timeout_ms = _timeout_ms(notification, resources)
+                if timeout_ms:
+                    # run off the event loop so a slow webhook cannot stall other events
+                    contents = await asyncio.to_thread(lambda: urllib.request.urlopen(notification.url, timeout=timeout_ms / 1000).read())
+                else:
+                    contents = urllib.request.urlopen(notification.url).read()
             return
         case "push":
             if "push_module" in resources:
@@ -63,7 +75,7 @@ async def notify(event: events.Event, notification: Union[NotificationEmail, Not
                 if hasattr(notification, "include_image") and notification.include_image:
                     if 'img_base64_str' in locals():
                         notification_args["media_base64"] = img_base64_str
-                        notification_args["media_mime_type"] = "image/jpeg"
+                        notification_args["media_mime_type"] = encoded.mime_type
                         notification_args["data"] = {
                             "type": "camera_event",
                             "cameraName": event.triggered_camera
@@ -73,11 +85,15 @@ async def notify(event: events.Event, notification: Union[NotificationEmail, Not
                 return
     
     try:
-        res = await notification_resource.do_command(notification_args)
+        # alerts are never dropped by a circuit breaker, each one is attempted
+        res = await guarded(resources, resources.get(f"{notification.type}_module_name", notification.type),
+                            lambda: notification_resource.do_command(notification_args), timeout_ms=_timeout_ms(notification, resources),
+                            breaker=False)
         if "error" in res:
             getParam('logger').error(f"Error sending {notification.type}: {res['error']}")
     except Exception as e:
-        getParam('logger').error(f'Unexpected error, notification not sent {e}')
+        # logged every time rather than summarized, so no dropped alert goes unnoticed
+        getParam('logger').warning(f"Unexpected error, {notification.type} notification for event '{event.name}' not sent: {e}")
         
     return   
 
@@ -87,8 +103,15 @@ async def check_sms_response(notifications: List[Union[NotificationEmail, Notifi
         if n.type == "sms" and hasattr(n, "to"):
             sms_args: Dict[str, Any] = { "command": "get", "number": 1, "from": n.to, "time_start": formatted_time }
             getParam('logger').debug(sms_args)
-            res = await resources['sms_module'].do_command(sms_args)
+            res = await guarded(resources, resources.get("sms_module_name", "sms"), lambda: resources['sms_module'].do_command(sms_args),
+                                timeout_ms=getattr(n, 'timeout_ms', None), breaker=False)
             if len(res["messages"]):
                 getParam('logger').debug(res)
                 return res["messages"][0]["body"]
-    return ""
\ No newline at end of file
+    return ""
+
+def _timeout_ms(notification: Any, resources: Dict[str, Any]) -> float:
+    timeout_ms = getattr(notification, 'timeout_ms', None)
+    if timeout_ms is None:
+        return resources.get('_default_timeout_ms', 0)
+    return timeout_ms
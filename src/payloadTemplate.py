@@ -0,0 +1,139 @@
+import functools
+import json
+import re
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# template variables that can be used in action and call rule payloads, and the event attribute each is filled from
+SLOTS: Dict[str, str] = {
+    "triggered_label": "triggered_label",
+    "triggered_camera": "triggered_camera",
+    "event_name": "name",
+}
+SLOT_PATTERN = re.compile(r"<<(" + "|".join(SLOTS) + r")>>")
+
+# marks a slot while the payload is parsed; cannot appear in configured payloads
+_MARK = "\x00"
+
+
+class _Fill():
+    """A string with slots in it, as alternating text and slot names"""
+    parts: Tuple[str, ...]
+
+    def __init__(self, parts: Tuple[str, ...]):
+        self.parts = parts
+
+    def render(self, values: Optional[Dict[str, str]]) -> str:
+        out: List[str] = []
+        for i, part in enumerate(self.parts):
+            if i % 2 == 0:
+                out.append(part)
+            elif values is None:
+                # without an event, slots are left as written
+                out.append(f"<<{part}>>")
+            else:
+                out.append(values[part])
+        return "".join(out)
+
+
+class _List():
+    items: Tuple[Any, ...]
+
+    def __init__(self, items: Tuple[Any, ...]):
+        self.items = items
+
+
+class _Dict():
+    items: Tuple[Tuple[Any, Any], ...]
+
+    def __init__(self, items: Tuple[Tuple[Any, Any], ...]):
+        self.items = items
+
+
+class PayloadTemplate():
+    """A payload parsed once, rendered for each call by filling in its slots.
+
+    Payloads are JSON that may use single quotes, with <<triggered_label>>, <<triggered_camera>>
+    and <<event_name>> inside strings filled in from the event.  A payload without slots is
+    parsed into one argument object that every call reuses.  A slot outside of a string
+    cannot be parsed ahead of time, so such payloads are substituted and parsed per call.
+    """
+    payload: str
+    slots: Tuple[str, ...]
+
+    def __init__(self, payload: str):
+        self.payload = payload
+        self.slots = tuple(sorted(set(SLOT_PATTERN.findall(payload))))
+        self._tree: Any = None
+        self._structural = True
+        if not self.slots:
+            self._tree = json.loads(payload.replace("'", "\""))
+            return
+        marked = SLOT_PATTERN.sub(lambda m: _MARK + m.group(1) + _MARK, payload)
+        try:
+            self._tree = _compile(json.loads(marked.replace("'", "\""), strict=False))
+        except ValueError:
+            self._structural = False
+
+    def render(self, event: Optional[Any]) -> Any:
+        """The arguments for a call made for event (None leaves slots unfilled)"""
+        if not self.slots:
+            return self._tree
+        values = self._values(event)
+        if not self._structural:
+            text = self.payload
+            if values is not None:
+                text = SLOT_PATTERN.sub(lambda m: values[m.group(1)], text)
+            return json.loads(text.replace("'", "\""))
+        return _render(self._tree, values)
+
+    def key(self, event: Optional[Any]) -> Hashable:
+        """Identifies the rendered payload, calls with equal keys send equal arguments"""
+        if not self.slots or event is None:
+            return self.payload
+        values = self._values(event)
+        assert values is not None
+        return (self.payload,) + tuple(values[slot] for slot in self.slots)
+
+    def _values(self, event: Optional[Any]) -> Optional[Dict[str, str]]:
+        if event is None:
+            return None
+        return {slot: str(getattr(event, attr)) for slot, attr in SLOTS.items()}
+
+
+def _compile(node: Any) -> Any:
+    """Turn a parsed payload into a template tree; parts without slots are kept as they are"""
+    if isinstance(node, str):
+        if _MARK not in node:
+            return node
+        return _Fill(tuple(node.split(_MARK)))
+    if isinstance(node, list):
+        items = tuple(_compile(item) for item in node)
+        if not any(_has_slots(item) for item in items):
+            return node
+        return _List(items)
+    if isinstance(node, dict):
+        pairs = tuple((_compile(k), _compile(v)) for k, v in node.items())
+        if not any(_has_slots(k) or _has_slots(v) for k, v in pairs):
+            return node
+        return _Dict(pairs)
+    return node
+
+
+def _has_slots(node: Any) -> bool:
+    return isinstance(node, (_Fill, _List, _Dict))
+
+
+def _render(node: Any, values: Optional[Dict[str, str]]) -> Any:
+    if isinstance(node, _Fill):
+        return node.render(values)
+    if isinstance(node, _List):
+        return [_render(item, values) for item in node.items]
+    if isinstance(node, _Dict):
+        return {_render(k, values): _render(v, values) for k, v in node.items}
+    return node
+
+
+@functools.lru_cache(maxsize=256)
+def payload_template(payload: str) -> PayloadTemplate:
+    """The parsed template for a payload, parsed on first use and then shared by every call with it"""
+    return PayloadTemplate(payload)
@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from .resourceGuard import ResourceTimeout
+
+
+def extra_key(extra: Optional[Dict[str, Any]]) -> str:
+    """Return a canonical string form of an `extra` dict, usable as part of a cache key."""
+    if not extra:
+        return ""
+    return json.dumps(extra, sort_keys=True, default=str)
+
+
+class _CacheEntry():
+    task: "asyncio.Task[Any]"
+    completed_at: Optional[float] = None
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.completed_at = None
+
+
+class SharedResultCache():
+    """Short-lived cache of resource call results, shared across events and rules.
+
+    A call made while an identical call is still in flight awaits the in-flight
+    result instead of issuing a second call.  A completed result is reused until
+    it is older than max_age_ms.  Failed calls are never cached.
+    """
+    name: str
+    max_age_ms: int
+    hits: int = 0
+    misses: int = 0
+
+    def __init__(self, name: str, max_age_ms: int):
+        self.name = name
+        self.max_age_ms = max_age_ms
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Hashable, _CacheEntry] = {}
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[Any]], timeout_ms: float = 0, name: str = "") -> Any:
+        """The result of fetch(), shared with other callers of the same key.
+
+        timeout_ms bounds how long this caller waits (0 for no limit), whatever limits the
+        caller that started the call had; the call itself carries on for anyone else waiting.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and self._is_usable(entry):
+            self.hits += 1
+            return await self._wait(entry.task, timeout_ms, name)
+
+        self.misses += 1
+        task = asyncio.ensure_future(fetch())
+        entry = _CacheEntry(task)
+        self._entries[key] = entry
+        task.add_done_callback(lambda t: self._on_done(key, entry))
+        return await self._wait(task, timeout_ms, name)
+
+    async def _wait(self, task: "asyncio.Task[Any]", timeout_ms: float, name: str) -> Any:
+        # shield so one cancelled caller does not cancel the call for everyone waiting on it
+        if not timeout_ms or task.done():
+            return await asyncio.shield(task)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout_ms / 1000)
+        except asyncio.TimeoutError:
+            raise ResourceTimeout(name or self.name, timeout_ms) from None
+
+    def _is_usable(self, entry: _CacheEntry) -> bool:
+        if not entry.task.done():
+            return True
+        if entry.completed_at is None:
+            return False
+        return (time.monotonic() - entry.completed_at) * 1000 < self.max_age_ms
+
+    def _on_done(self, key: Hashable, entry: _CacheEntry) -> None:
+        if entry.task.cancelled() or entry.task.exception() is not None:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            return
+        entry.completed_at = time.monotonic()
+
+    def clear(self) -> None:
+        self._entries = {}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "max_age_ms": self.max_age_ms
+        }
+
+
+def frame_digest(data: bytes) -> bytes:
+    """Fast content fingerprint of raw image bytes"""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class ContentHashLRU():
+    """Recent vision results per camera, keyed by the content hash of the frame they were computed on.
+
+    Some cameras return byte-identical frames across calls; a result computed on one of those
+    frames can be reused for the same vision service and extra without calling it again.
+    """
+    name: str
+    size_per_camera: int
+    hits: int = 0
+    misses: int = 0
+
+    def __init__(self, name: str, size_per_camera: int):
+        self.name = name
+        self.size_per_camera = size_per_camera
+        self.hits = 0
+        self.misses = 0
+        self._cameras: Dict[str, "OrderedDict[Hashable, Any]"] = {}
+
+    def get(self, camera: str, key: Hashable, digest: bytes) -> Optional[Any]:
+        entries = self._cameras.get(camera)
+        if entries is not None and (key, digest) in entries:
+            entries.move_to_end((key, digest))
+            self.hits += 1
+            return entries[(key, digest)]
+        self.misses += 1
+        return None
+
+    def put(self, camera: str, key: Hashable, digest: bytes, result: Any) -> None:
+        if self.size_per_camera <= 0:
+            return
+        entries = self._cameras.setdefault(camera, OrderedDict())
+        entries[(key, digest)] = result
+        entries.move_to_end((key, digest))
+        while len(entries) > self.size_per_camera:
+            entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._cameras = {}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size_per_camera": self.size_per_camera
+        }
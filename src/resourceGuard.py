@@ -0,0 +1,433 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+# priority of the event a call is made for, set around each event's rule evaluation
+current_priority: contextvars.ContextVar[int] = contextvars.ContextVar('current_priority', default=0)
+
+
+class ResourceTimeout(TimeoutError):
+    """A resource call did not finish within its timeout"""
+    def __init__(self, name: str, timeout_ms: float):
+        super().__init__(f"call to {name} timed out after {timeout_ms:g} ms")
+        self.name = name
+        self.timeout_ms = timeout_ms
+
+
+class CircuitOpen(Exception):
+    """A resource call was refused because the resource's circuit breaker is open"""
+    def __init__(self, name: str, retry_in_secs: float):
+        super().__init__(f"circuit breaker open for {name}, retrying in {retry_in_secs:.0f} secs")
+        self.name = name
+
+
+class CircuitBreaker():
+    """Stops calling a resource that keeps failing.
+
+    After failure_threshold consecutive failures the breaker opens and calls fail immediately
+    for cooloff_secs.  Then it is half open: a single probe call is let through, closing the
+    breaker if it succeeds and re-opening it for another cool-off if it fails.
+    A failure_threshold of 0 disables the breaker.
+    """
+    name: str
+    failure_threshold: int = 5
+    cooloff_secs: float = 30
+    state: str = "closed"
+    consecutive_failures: int = 0
+    opened: int = 0
+    rejected: int = 0
+
+    def __init__(self, name: str, failure_threshold: int = 5, cooloff_secs: float = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooloff_secs = cooloff_secs
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def check(self) -> None:
+        """Raise CircuitOpen if a call to the resource would be refused right now"""
+        if self.state != "closed" and (self._cooling_off() or self._probing):
+            self.rejected += 1
+            raise CircuitOpen(self.name, self._opened_at + self.cooloff_secs - time.monotonic())
+
+    def before_call(self) -> bool:
+        """Admit a call, returning True if it is the half-open probe"""
+        self.check()
+        if self.state != "closed":
+            self.state = "half_open"
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self, probe: bool) -> None:
+        if probe:
+            self._probing = False
+        self.state = "closed"
+        self.consecutive_failures = 0
+
+    def record_failure(self, probe: bool) -> None:
+        if probe:
+            self._probing = False
+        self.consecutive_failures += 1
+        if self.failure_threshold > 0 and (probe or self.consecutive_failures >= self.failure_threshold):
+            if self.state == "closed":
+                self.opened += 1
+            self.state = "open"
+            self._opened_at = time.monotonic()
+
+    def record_abandoned(self, probe: bool) -> None:
+        """The call was cancelled, so it says nothing about the resource"""
+        if probe:
+            self._probing = False
+
+    def _cooling_off(self) -> bool:
+        return time.monotonic() - self._opened_at < self.cooloff_secs
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opened": self.opened,
+            "rejected": self.rejected
+        }
+
+
+class ResourceGuard():
+    """Concurrency limit and single-flight merging for the calls made to one resource.
+
+    At most max_concurrent calls run against the resource at once (0 means no limit);
+    further calls wait their turn, highest event priority first, and the time they spend
+    waiting is recorded.  A call given a key that matches a call still in flight awaits
+    that call's result instead of being made again.
+    """
+    name: str
+    max_concurrent: int = 0
+    calls: int = 0
+    merged: int = 0
+    waited: int = 0
+    timeouts: int = 0
+    total_wait_ms: float = 0
+    max_wait_ms: float = 0
+    wait_ewma_ms: float = 0
+    wait_alpha: float = 0.2
+    call_ewma_ms: float = 0
+    last_call_at: float = 0
+
+    def __init__(self, name: str, max_concurrent: int = 0, breaker: Optional[CircuitBreaker] = None):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.breaker = breaker or CircuitBreaker(name, 0)
+        self.calls = 0
+        self.merged = 0
+        self.waited = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0
+        self.max_wait_ms = 0
+        self.wait_ewma_ms = 0
+        self.call_ewma_ms = 0
+        self.last_call_at = 0
+        self._in_flight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        # how many callers are waiting on each shared call
+        self._callers: Dict["asyncio.Future[Any]", int] = {}
+        # shared calls a caller timed out on; cancelling one of them counts as a failure
+        self._overdue: Set["asyncio.Future[Any]"] = set()
+        self._active = 0
+        self._waiters: List[Tuple[int, int, "asyncio.Future[None]"]] = []
+        self._counter = itertools.count()
+
+    async def run(self, call: Callable[[], Awaitable[Any]], key: Optional[Hashable] = None, timeout_ms: float = 0,
+                  breaker: bool = True) -> Any:
+        """Make a call to the resource; breaker=False makes it without the circuit breaker refusing or counting it.
+
+        The deadline covers time spent queued for the resource as well as the call itself.
+        """
+        if key is None:
+            if breaker:
+                self.breaker.check()
+            if timeout_ms <= 0:
+                return await self._limited(call, breaker)
+            try:
+                return await asyncio.wait_for(self._limited(call, breaker), timeout_ms / 1000)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                if breaker:
+                    # the call was this caller's own and has been cancelled, count it as failed
+                    self.breaker.record_failure(False)
+                raise ResourceTimeout(self.name, timeout_ms)
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            # the call's outcome is recorded once, by the call itself
+            self.merged += 1
+            return await self._join(key, in_flight, timeout_ms)
+
+        if breaker:
+            self.breaker.check()
+        task = asyncio.ensure_future(self._limited(call, breaker))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda t: self._on_done(key, t))
+        return await self._join(key, task, timeout_ms)
+
+    async def _join(self, key: Hashable, task: "asyncio.Future[Any]", timeout_ms: float) -> Any:
+        """Wait for a shared call, within this caller's own deadline.
+
+        The call is shielded so one caller giving up does not cancel it for everyone else
+        waiting on it; it is cancelled once nobody is waiting any more.
+        """
+        self._callers[task] = self._callers.get(task, 0) + 1
+        try:
+            if timeout_ms <= 0:
+                return await asyncio.shield(task)
+            try:
+                return await asyncio.wait_for(asyncio.shield(task), timeout_ms / 1000)
+            except asyncio.TimeoutError:
+                if task.done():
+                    # the call itself raised TimeoutError
+                    raise
+                self.timeouts += 1
+                self._overdue.add(task)
+                # the call is overdue, later callers start a fresh one instead of joining it
+                if self._in_flight.get(key) is task:
+                    del self._in_flight[key]
+                raise ResourceTimeout(self.name, timeout_ms) from None
+        finally:
+            remaining = self._callers.pop(task) - 1
+            if remaining > 0:
+                self._callers[task] = remaining
+            elif not task.done():
+                # a hung call would otherwise run, and hold its max_concurrent slot, forever
+                task.cancel()
+
+    async def _limited(self, call: Callable[[], Awaitable[Any]], breaker: bool = True) -> Any:
+        self.calls += 1
+        if self.max_concurrent <= 0:
+            return await self._call(call, breaker)
+
+        start = time.monotonic()
+        await self._acquire()
+        self._record_wait((time.monotonic() - start) * 1000)
+        try:
+            return await self._breaker_call(call, breaker)
+        finally:
+            self._release()
+
+    async def _breaker_call(self, call: Callable[[], Awaitable[Any]], breaker: bool = True) -> Any:
+        """Make the actual call, recording its outcome with the circuit breaker"""
+        start = time.monotonic()
+        try:
+            if not breaker:
+                return await call()
+            probe = self.breaker.before_call()
+            try:
+                result = await call()
+            except asyncio.CancelledError:
+                if asyncio.current_task() in self._overdue:
+                    # cancelled for taking longer than its callers' timeouts
+                    self.breaker.record_failure(probe)
+                else:
+                    self.breaker.record_abandoned(probe)
+                raise
+            except Exception:
+                self.breaker.record_failure(probe)
+                raise
+            self.breaker.record_success(probe)
+            return result
+        finally:
+            # calls cut short by a timeout count too, they are the slowest ones
+            self._record_call(start)
+
+    async def _acquire(self) -> None:
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+            return
+        waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (-current_priority.get(), next(self._counter), waiter))
+        try:
+            # the slot is handed over by _release, already counted as active
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # granted just as we were cancelled, pass the slot on
+                self._release()
+            else:
+                self._waiters = [w for w in self._waiters if w[2] is not waiter]
+                heapq.heapify(self._waiters)
+            raise
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    async def _call(self, call: Callable[[], Awaitable[Any]], breaker: bool = True) -> Any:
+        self._active += 1
+        try:
+            return await self._breaker_call(call, breaker)
+        finally:
+            self._active -= 1
+
+    def _record_wait(self, wait_ms: float) -> None:
+        self.waited += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self.wait_ewma_ms = self.wait_alpha * wait_ms + (1 - self.wait_alpha) * self.wait_ewma_ms
+
+    def _record_call(self, start: float) -> None:
+        self.last_call_at = time.monotonic()
+        call_ms = (self.last_call_at - start) * 1000
+        self.call_ewma_ms = self.wait_alpha * call_ms + (1 - self.wait_alpha) * self.call_ewma_ms
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def _on_done(self, key: Hashable, task: "asyncio.Future[Any]") -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        self._overdue.discard(task)
+        if not task.cancelled():
+            # every caller may have been cancelled, so make sure a failure is marked as retrieved
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "calls": self.calls,
+            "merged": self.merged,
+            "timeouts": self.timeouts,
+            "active": self.active,
+            "queued": self.queued,
+            "avg_wait_ms": round(self.total_wait_ms / self.waited, 3) if self.waited else 0,
+            "recent_wait_ms": round(self.wait_ewma_ms, 3),
+            "recent_call_ms": round(self.call_ewma_ms, 3),
+            "max_wait_ms": round(self.max_wait_ms, 3),
+            "breaker": self.breaker.stats()
+        }
+
+
+class ResourceGuards():
+    """The guards for every resource, configured from the `resources` attribute"""
+
+    breaker_failures: int = 5
+    breaker_cooloff_secs: float = 30
+    # call latency older than this no longer says anything about the resource's load
+    latency_window_secs: float = 10
+
+    def __init__(self):
+        self._guards: Dict[str, ResourceGuard] = {}
+        self.breaker_failures = 5
+        self.breaker_cooloff_secs = 30
+
+    def configure(self, resources_config: Optional[Dict[str, Any]], breaker_failures: int = 5, breaker_cooloff_secs: float = 30) -> None:
+        self._guards = {}
+        self.breaker_failures = breaker_failures
+        self.breaker_cooloff_secs = breaker_cooloff_secs
+        for name, settings in (resources_config or {}).items():
+            if isinstance(settings, dict):
+                breaker = CircuitBreaker(name, int(settings.get("breaker_failures", breaker_failures)),
+                                         float(settings.get("breaker_cooloff_secs", breaker_cooloff_secs)))
+                self._guards[name] = ResourceGuard(name, int(settings.get("max_concurrent", 0)), breaker)
+
+    def get(self, name: str) -> ResourceGuard:
+        guard = self._guards.get(name)
+        if guard is None:
+            guard = ResourceGuard(name, 0, CircuitBreaker(name, self.breaker_failures, self.breaker_cooloff_secs))
+            self._guards[name] = guard
+        return guard
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: guard.stats() for name, guard in self._guards.items() if guard.calls > 0 or guard.breaker.rejected > 0}
+
+    def overloaded(self, budget_ms: float) -> bool:
+        """Whether callers currently queue for, or calls currently take, longer than budget_ms at any resource"""
+        now = time.monotonic()
+        for guard in self._guards.values():
+            if guard.queued > 0 and guard.wait_ewma_ms > budget_ms:
+                return True
+            # without max_concurrent nothing queues, and a saturated resource shows as slow calls instead
+            recent = guard.active > 0 or now - guard.last_call_at < self.latency_window_secs
+            if recent and guard.call_ewma_ms > budget_ms:
+                return True
+        return False
+
+
+class LoadShedder():
+    """Slows lower-priority events while resources are overloaded, and recovers when they are not.
+
+    Once per interval_secs the shared rate factor halves while any resource's recent queue
+    wait or call latency is over latency_budget_ms, down to min_factor, and doubles back
+    towards 1 once it is within budget.  Events below protected_priority evaluate at their rate times the factor.
+    """
+    latency_budget_ms: float = 0
+    min_factor: float = 0.125
+    interval_secs: float = 1
+    factor: float = 1
+    protected_priority: int = 0
+
+    def __init__(self, guards: ResourceGuards):
+        self.guards = guards
+        self.latency_budget_ms = 0
+        self.factor = 1
+        self.protected_priority = 0
+        self._last_update = 0.0
+
+    def rate_factor(self, priority: int) -> float:
+        if self.latency_budget_ms <= 0 or priority >= self.protected_priority:
+            return 1
+        self._update()
+        return self.factor
+
+    def _update(self) -> None:
+        now = time.monotonic()
+        if now - self._last_update < self.interval_secs:
+            return
+        self._last_update = now
+        if self.guards.overloaded(self.latency_budget_ms):
+            self.factor = max(self.factor / 2, self.min_factor)
+        else:
+            self.factor = min(self.factor * 2, 1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "latency_budget_ms": self.latency_budget_ms,
+            "rate_factor": self.factor,
+            "protected_priority": self.protected_priority
+        }
+
+
+def check_breaker(resources: Dict[str, Any], name: str) -> None:
+    """Raise CircuitOpen if the resource's circuit breaker is refusing calls"""
+    guards = resources.get('_guards')
+    if guards is not None:
+        guards.get(name).breaker.check()
+
+
+async def guarded(resources: Dict[str, Any], name: str, call: Callable[[], Awaitable[Any]],
+                  key: Optional[Hashable] = None, timeout_ms: Optional[float] = None, breaker: bool = True) -> Any:
+    """Make a resource call through that resource's guard, if the resources carry guards.
+
+    timeout_ms of None uses the configured default timeout; 0 means no timeout.
+    breaker=False exempts the call from the resource's circuit breaker.
+    """
+    if timeout_ms is None:
+        timeout_ms = resources.get('_default_timeout_ms', 0)
+    guards = resources.get('_guards')
+    if guards is None:
+        if not timeout_ms:
+            return await call()
+        return await ResourceGuard(name).run(call, key, timeout_ms, breaker)
+    return await guards.get(name).run(call, key, timeout_ms or 0, breaker)
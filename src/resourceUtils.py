@@ -1,13 +1,11 @@
-import json
-from typing import cast, Dict, Any, Optional, Protocol, runtime_checkable, Union
+from typing import Dict, Any, Optional, Protocol, runtime_checkable, Union
 
-from viam.components.generic import Generic as GenericComponent
-from viam.services.generic import Generic as GenericService
-from viam.services.vision import VisionClient
-from viam.components.sensor import Sensor
-from viam.components.motor import Motor
 from viam.resource.base import ResourceBase
 
+from .resourceGuard import guarded
+from .eventPlan import plan_handle, resource_name
+from .payloadTemplate import payload_template
+
 @runtime_checkable
 class EventLike(Protocol):
     """Protocol for objects that have event-like properties."""
@@ -21,7 +19,9 @@ async def call_method(
     name: str, 
     method: str, 
     payload: Optional[str], 
-    event: Optional[Any]  # Keep Any to ensure backward compatibility
+    event: Optional[Any],  # Keep Any to ensure backward compatibility
+    single_flight: bool = False,
+    timeout_ms: Optional[float] = None
 ) -> Any:
     """Call a method on a resource with optional payload.
     
@@ -31,41 +31,28 @@ async def call_method(
         method: Method name to call on the resource
         payload: Optional JSON payload as string
         event: Optional Event object (must have name, triggered_label and triggered_camera attributes)
+        single_flight: Whether an identical call already in flight may be shared; only for calls without side effects
+        timeout_ms: Timeout for the call, None to use the configured default
         
     Returns:
         Result of the method call
     """
-    # certainly this could be improved
-    resource: ResourceBase
-    
-    if (resources["resources"][name]["type"] == "component") and (resources["resources"][name]["subtype"] == "generic"):
-        resource_dep = resources['_deps'][GenericComponent.get_resource_name(name)]
-        resource = cast(GenericComponent, resource_dep)
-    if (resources["resources"][name]["type"] == "component") and (resources["resources"][name]["subtype"] == "sensor"):
-        resource_dep = resources['_deps'][Sensor.get_resource_name(name)]
-        resource = cast(Sensor, resource_dep)
-    if (resources["resources"][name]["type"] == "component") and (resources["resources"][name]["subtype"] == "motor"):
-        resource_dep = resources['_deps'][Motor.get_resource_name(name)]
-        resource = cast(Motor, resource_dep)
-    if (resources["resources"][name]["type"] == "service") and (resources["resources"][name]["subtype"] == "generic"):
-        resource_dep = resources['_deps'][GenericService.get_resource_name(name)]
-        resource = cast(GenericService, resource_dep)
-    if (resources["resources"][name]["type"] == "service") and (resources["resources"][name]["subtype"] == "vision"):
-        resource_dep = resources['_deps'][VisionClient.get_resource_name(name)]
-        resource = cast(VisionClient, resource_dep)
+    # resolved when the event's plan was compiled, otherwise looked up from the configured type
+    resource = plan_handle(resources, name)
+    if resource is None:
+        resource = _resolve_resource(resources, name)
 
     method_fn = getattr(resource, method)
 
     if payload:
-        # we don't want to alter action.payload directly as it will be used as a template repeatedly
-        payload_copy = payload
-
-        if event:
-            # At some point we might want other things to be template variables, for now just label and event name
-            payload_copy = payload_copy.replace('<<triggered_label>>', event.triggered_label)
-            payload_copy = payload_copy.replace('<<triggered_camera>>', event.triggered_camera)
-            payload_copy = payload_copy.replace('<<event_name>>', event.name)
-        
-        return await method_fn(json.loads(payload_copy.replace("'", "\"")))
+        # parsed once per payload, only the template slots are filled in for each call
+        template = payload_template(payload)
+        args = template.render(event)
+        return await guarded(resources, name, lambda: method_fn(args), (method, template.key(event)) if single_flight else None, timeout_ms)
     else:
-        return await method_fn()
\ No newline at end of file
+        return await guarded(resources, name, lambda: method_fn(), (method,) if single_flight else None, timeout_ms)
+
+
+def _resolve_resource(resources: Dict[str, Any], name: str) -> ResourceBase:
+    settings = resources["resources"][name]
+    return resources['_deps'][resource_name(name, settings["type"], settings["subtype"])]
@@ -0,0 +1,93 @@
+import json
+from typing import Any, Dict, List
+
+from . import rules
+from .resourceCache import SharedResultCache
+from .errorLog import rule_label
+from .resourceGuard import ResourceTimeout
+
+# settings that change what the event does with a rule's result, not the result itself
+EVENT_SIDE_SETTINGS = ("inverse_pause_secs", "pause_on_known_secs")
+
+
+def rule_key(rule: Any) -> str:
+    """Canonical form of a rule's configuration; rules with the same key always evaluate the same way"""
+    config: Dict[str, Any] = {}
+    for source in (vars(type(rule)), vars(rule)):
+        for key, value in source.items():
+            if key.startswith("_") or key in EVENT_SIDE_SETTINGS or callable(value) or isinstance(value, property):
+                continue
+            config[key] = _canonical(value)
+    return json.dumps(config, sort_keys=True, default=str)
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if hasattr(value, "__dict__"):
+        return {k: _canonical(v) for k, v in vars(value).items() if not k.startswith("_")}
+    return value
+
+
+class SharedRule():
+    key: str
+    rule: Any  # the instance evaluated on behalf of every reference
+    references: int = 0
+
+    def __init__(self, key: str, rule: Any):
+        self.key = key
+        self.rule = rule
+        self.references = 0
+
+
+class RuleGraph():
+    """Rules that appear in more than one event, compiled once per reconfigure.
+
+    Every rule is mapped to a node by its canonical configuration.  A rule whose node is
+    referenced by several events is evaluated once and the result is handed to each of
+    them; evaluations within max_age_ms of each other (such as events ticking at the same
+    time) share one result.  Each event gets its own copy of the result to modify.
+    """
+    max_age_ms: int
+
+    def __init__(self, max_age_ms: int):
+        self.max_age_ms = max_age_ms
+        self._nodes: Dict[str, SharedRule] = {}
+        self._results = SharedResultCache("rules", max_age_ms)
+
+    def compile(self, event_list: List[Any]) -> None:
+        self._nodes = {}
+        self._results = SharedResultCache("rules", self.max_age_ms)
+        for event in event_list:
+            for rule in getattr(event, 'rules', []):
+                key = rule_key(rule)
+                node = self._nodes.get(key)
+                if node is None:
+                    node = SharedRule(key, rule)
+                    self._nodes[key] = node
+                node.references += 1
+                rule.__dict__['_shared_rule'] = node
+
+    async def evaluate(self, rule: Any, resources: Dict[str, Any]) -> Dict[str, Any]:
+        node = rule.__dict__.get('_shared_rule')
+        if not isinstance(node, SharedRule) or node.references < 2:
+            return await rules.eval_rule(rule, resources)
+        try:
+            result = await self._results.get(node.key, lambda: rules.eval_rule(node.rule, resources),
+                                             rules.evaluation_wait_ms(rule, resources), rule_label(rule))
+        except ResourceTimeout as e:
+            # the evaluation this rule joined is taking longer than the rule's own timeout allows
+            return rules.failed_response(rule, {"triggered": False}, e)
+        return dict(result)
+
+    def stats(self) -> Dict[str, Any]:
+        cache_stats = self._results.stats()
+        return {
+            "total": sum(node.references for node in self._nodes.values()),
+            "unique": len(self._nodes),
+            "shared": sum(1 for node in self._nodes.values() if node.references > 1),
+            "shared_hits": cache_stats["hits"],
+            "shared_misses": cache_stats["misses"]
+        }
@@ -0,0 +1,71 @@
+from typing import Any, Dict, List, Optional
+
+
+class RuleStats():
+    """Measured cost and selectivity of a rule, used to decide evaluation order.
+
+    Latency is an exponentially weighted moving average so the order follows
+    changes in resource load; true_rate is the fraction of evaluations that
+    returned triggered.
+    """
+    alpha: float = 0.2
+    evaluations: int = 0
+    true_count: int = 0
+    latency_ms: Optional[float] = None
+
+    def __init__(self):
+        self.evaluations = 0
+        self.true_count = 0
+        self.latency_ms = None
+
+    def record(self, latency_ms: float, triggered: bool) -> None:
+        self.evaluations += 1
+        if triggered:
+            self.true_count += 1
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms = self.alpha * latency_ms + (1 - self.alpha) * self.latency_ms
+
+    @property
+    def true_rate(self) -> float:
+        if self.evaluations == 0:
+            return 0
+        return self.true_count / self.evaluations
+
+    def rank(self, short_circuit_on: bool) -> float:
+        """Expected cost per chance of deciding the outcome; lower runs earlier.
+
+        A rule that has not been measured yet ranks first so it gets measured.
+        """
+        if self.latency_ms is None:
+            return 0
+        decisive_rate = self.true_rate if short_circuit_on else 1 - self.true_rate
+        return self.latency_ms / max(decisive_rate, 0.01)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "evaluations": self.evaluations,
+            "true_rate": round(self.true_rate, 3),
+            "latency_ms": round(self.latency_ms, 3) if self.latency_ms is not None else None
+        }
+
+
+def get_rule_stats(rule: Any) -> RuleStats:
+    stats = rule.__dict__.get('_rule_stats')
+    if stats is None:
+        stats = RuleStats()
+        rule.__dict__['_rule_stats'] = stats
+    return stats
+
+
+def cost_order(rules: List[Any], short_circuit_on: Optional[bool]) -> List[int]:
+    """Indexes of rules in the order they should be evaluated.
+
+    Without a short-circuiting logic type every rule has to be evaluated, so configured order is kept.
+    """
+    order = list(range(len(rules)))
+    if short_circuit_on is None:
+        return order
+    # sorted() is stable, so equally ranked rules keep their configured order
+    return sorted(order, key=lambda i: get_rule_stats(rules[i]).rank(short_circuit_on))
@@ -1,13 +1,19 @@
 import re
+import math
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import cast, Dict, Any, List, Union, Optional, TypeVar, Callable, Tuple, overload
 from PIL import Image
 from . import logic
 from .resourceUtils import call_method
+from .resourceCache import frame_digest
+from .resourceGuard import check_breaker, guarded
+from .imageHandle import ImageHandle
+from .motionGate import MotionGate
 from .globals import getParam
+from .errorLog import log_error
+from .eventPlan import plan_handle, rule_plan
 from viam.services.vision import VisionClient, Detection, Classification, Vision
-from viam.media.utils.pil import viam_to_pil_image
 from viam.components.camera import CameraClient
 
 
@@ -27,7 +33,11 @@ class RuleDetector():
     confidence_pct: float
     inverse_pause_secs: int
     fail_eval: Optional[bool] = None
+    timeout_ms: Optional[float] = None
     extra: dict = {}
+    defer_image: bool = False
+    motion_threshold: float = 0
+    motion_recheck_secs: float = 30
 
     def __init__(self, **kwargs: Any) -> None:
         for key, value in kwargs.items():
@@ -40,7 +50,11 @@ class RuleClassifier():
     confidence_pct: float
     inverse_pause_secs: int
     fail_eval: Optional[bool] = None
+    timeout_ms: Optional[float] = None
     extra: dict = {}
+    defer_image: bool = False
+    motion_threshold: float = 0
+    motion_recheck_secs: float = 30
 
     def __init__(self, **kwargs: Any) -> None:
         for key, value in kwargs.items():
@@ -53,6 +67,7 @@ class RuleTracker():
     inverse_pause_secs: int
     pause_on_known_secs: int
     fail_eval: Optional[bool] = None
+    timeout_ms: Optional[float] = None
     extra: dict = {}
 
     def __init__(self, **kwargs: Any) -> None:
@@ -69,6 +84,7 @@ class RuleCall():
     result_operator: str
     result_value: Any
     fail_eval: Optional[bool] = None
+    timeout_ms: Optional[float] = None
     inverse_pause_secs: int
 
     def __init__(self, **kwargs: Any) -> None:
@@ -89,16 +105,63 @@ class RuleTime():
 
 RuleType = Union[RuleTime, RuleDetector, RuleClassifier, RuleTracker, RuleCall]
 
+# label appended to the class name of a tracker detection that has been labeled
+TRACKER_LABEL_SUFFIX = re.compile(r'\s+\(label:\s.*')
+
+def time_windows(rule: RuleTime) -> List[Tuple[int, int]]:
+    """The rule's ranges as sorted, merged [start, end) hour intervals within a day.
+
+    An hour h is in a range when start_hour <= h < end_hour, so fractional bounds round up.
+    Compiled once per ranges list.
+    """
+    ranges = getattr(rule, 'ranges', [])
+    compiled = rule.__dict__.get('_time_windows')
+    if compiled is not None and compiled[0] is ranges:
+        return compiled[1]
+
+    intervals = []
+    for r in ranges:
+        start = max(math.ceil(r.start_hour), 0)
+        end = min(math.ceil(r.end_hour), 24)
+        if start < end:
+            intervals.append((start, end))
+    intervals.sort()
+    windows: List[Tuple[int, int]] = []
+    for start, end in intervals:
+        if windows and start <= windows[-1][1]:
+            windows[-1] = (windows[-1][0], max(windows[-1][1], end))
+        else:
+            windows.append((start, end))
+
+    rule.__dict__['_time_windows'] = (ranges, windows)
+    return windows
+
+def in_time_window(rule: RuleTime, now: datetime) -> bool:
+    return any(start <= now.hour < end for start, end in time_windows(rule))
+
+def next_time_transition(rule: RuleTime, now: datetime) -> Optional[datetime]:
+    """When the rule's result next changes, or None if it never does"""
+    windows = time_windows(rule)
+    if not windows or windows == [(0, 24)]:
+        return None
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    for start, end in windows:
+        if now.hour < start:
+            return midnight + timedelta(hours=start)
+        if now.hour < end:
+            return midnight + timedelta(hours=end)
+    # past the last window, the first one opens tomorrow
+    return midnight + timedelta(days=1, hours=windows[0][0])
+
 async def eval_rule(rule: RuleType, resources: Dict[str, Any]) -> Dict[str, Any]:
     response: Dict[str, Any] = { "triggered" : False }
     match rule.type:
         case "time":
             curr_time = datetime.now()
             if isinstance(rule, RuleTime):
-                for r in rule.ranges:
-                    if (curr_time.hour >= r.start_hour) and (curr_time.hour < r.end_hour):
-                        getParam('logger').debug("Time triggered")
-                        response["triggered"] = True   
+                if in_time_window(rule, curr_time):
+                    getParam('logger').debug("Time triggered")
+                    response["triggered"] = True   
         case "detection":
             try:
                 if isinstance(rule, RuleDetector):
@@ -107,28 +170,38 @@ async def eval_rule(rule: RuleType, resources: Dict[str, Any]) -> Dict[str, Any]
                     # Get the camera component
                     camera = _get_camera_component(rule.camera, resources)
                     
-                    # Get an image from the camera
-                    image = await camera.get_image(extra=getattr(rule, 'extra', {}))
-                    
-                    # Get detections using the image
-                    detections = await detector.get_detections(image, extra=getattr(rule, 'extra', {}))
+                    gate = _motion_gate(rule)
+                    frame = None
+                    if gate is not None:
+                        frame = await _get_image(rule, camera, resources)
+                        if not gate.should_evaluate(frame):
+                            # scene has not changed, reuse this rule's previous result instead of calling the detector
+                            return _reused_response(rule, gate, response, frame, camera, resources)
+
+                    # Get an image and detections, shared with other rules using the same camera and detector
+                    image, detections = await _get_detections(rule, camera, detector, resources, frame)
                     
                     if detections:
+                        # keep the best match; the image is only decoded if a consumer needs it
+                        best: Optional[Detection] = None
+                        class_pattern = rule_plan(rule).class_pattern
                         for d in detections:
-                            if (d.confidence >= rule.confidence_pct) and re.search(rule.class_regex, d.class_name):
-                                getParam('logger').debug("Detection triggered")
-                                response["triggered"] = True
-                                response["image"] = viam_to_pil_image(image)
-                                response["value"] = d.class_name
-                                response["resource"] = rule.camera
+                            if class_pattern.search(d.class_name):
+                                if d.confidence < rule.confidence_pct:
+                                    # seen, but below threshold; lets adaptive-rate events speed up
+                                    response["partial"] = True
+                                elif best is None or d.confidence > best.confidence:
+                                    best = d
+                        if best is not None:
+                            getParam('logger').debug("Detection triggered")
+                            response["triggered"] = True
+                            response["image"] = _image_handle(rule, image, camera, resources)
+                            response["value"] = best.class_name
+                            response["resource"] = rule.camera
+                    if gate is not None:
+                        gate.record(response)
             except Exception as e:
-                getParam('logger').error(f"Error in 'detection' type rule, rule not properly evaluated: {e}")
-                if getattr(rule, 'fail_eval', None) is not None:
-                    response["triggered"] = rule.fail_eval
-                    response["value"] = None
-                    response["resource"] = rule.camera
-                    getParam('logger').debug(f"detection rule failed, using fail_eval: {rule.fail_eval}")
-                # If fail_eval is None, don't modify the response (maintains original behavior)
+                failed_response(rule, response, e)
         case "classification":
             try:
                 if isinstance(rule, RuleClassifier):
@@ -137,51 +210,63 @@ async def eval_rule(rule: RuleType, resources: Dict[str, Any]) -> Dict[str, Any]
                     # Get the camera component
                     camera = _get_camera_component(rule.camera, resources)
                     
-                    # Get an image from the camera
-                    image = await camera.get_image(extra=getattr(rule, 'extra', {}))
-                    
-                    # Get classifications using the image
-                    classifications = await classifier.get_classifications(image, count=10, extra=getattr(rule, 'extra', {}))
+                    gate = _motion_gate(rule)
+                    frame = None
+                    if gate is not None:
+                        frame = await _get_image(rule, camera, resources)
+                        if not gate.should_evaluate(frame):
+                            # scene has not changed, reuse this rule's previous result instead of calling the classifier
+                            return _reused_response(rule, gate, response, frame, camera, resources)
+
+                    # Get an image and classifications, shared with other rules using the same camera and classifier
+                    image, classifications = await _get_classifications(rule, camera, classifier, resources, frame)
                     
                     if classifications:
+                        # keep the best match; the image is only decoded if a consumer needs it
+                        best_c: Optional[Classification] = None
+                        class_pattern = rule_plan(rule).class_pattern
                         for c in classifications:
-                            if (c.confidence >= rule.confidence_pct) and re.search(rule.class_regex, c.class_name):
-                                getParam('logger').debug("Classification triggered")
-                                response["triggered"] = True
-                                response["image"] = viam_to_pil_image(image)
-                                response["value"] = c.class_name
-                                response["resource"] = rule.camera
+                            if class_pattern.search(c.class_name):
+                                if c.confidence < rule.confidence_pct:
+                                    response["partial"] = True
+                                elif best_c is None or c.confidence > best_c.confidence:
+                                    best_c = c
+                        if best_c is not None:
+                            getParam('logger').debug("Classification triggered")
+                            response["triggered"] = True
+                            response["image"] = _image_handle(rule, image, camera, resources)
+                            response["value"] = best_c.class_name
+                            response["resource"] = rule.camera
+                    if gate is not None:
+                        gate.record(response)
             except Exception as e:
-                getParam('logger').error(f"Error in 'classification' type rule, rule not properly evaluated: {e}")
-                if getattr(rule, 'fail_eval', None) is not None:
-                    response["triggered"] = rule.fail_eval
-                    response["value"] = None
-                    response["resource"] = rule.camera
-                    getParam('logger').debug(f"classification rule failed, using fail_eval: {rule.fail_eval}")
-                # If fail_eval is None, don't modify the response (maintains original behavior)
+                failed_response(rule, response, e)
         case "tracker":
             try:
                 if isinstance(rule, RuleTracker):
                     tracker = _get_vision_service(rule.tracker, resources)
                     # NOTE: we call capture_all_from_camera() in order to get an image and coordinates in case there is an actionable detection
-                    all = await tracker.capture_all_from_camera(
+                    extra = rule_plan(rule).extra
+                    all = await guarded(resources, rule.tracker, lambda: tracker.capture_all_from_camera(
                         rule.camera, 
                         return_classifications=False, 
                         return_detections=True, 
                         return_image=True,
-                        extra=getattr(rule, 'extra', {})
-                    )
+                        extra=extra
+                    ), ("capture_all_from_camera", rule.camera, rule_plan(rule).extra_key), rule_plan(rule).timeout_ms)
                     approved_status: List[bool] = []
 
-                    current = await tracker.do_command({"list_current": True})
+                    current = await guarded(resources, rule.tracker, lambda: tracker.do_command({"list_current": True}), ("list_current",), rule_plan(rule).timeout_ms)
                     
                     if all.detections is not None:
+                        if len(all.detections) > 0:
+                            response["partial"] = True
                         for d in all.detections:
                             authorized = False
 
                             # NOTE: the class name of a tracker detection that has been labeled will have a label appended to it,
                             #  so we strip this label to match against the keys in current["list_current"]
-                            class_without_label = re.sub(r'\s+\(label:\s.*', '', d.class_name)
+                            class_without_label = TRACKER_LABEL_SUFFIX.sub('', d.class_name)
                             list_current = current.get("list_current", {})
                             getParam('logger').debug(class_without_label + "-" + str(list_current))
 
@@ -191,8 +276,9 @@ async def eval_rule(rule: RuleType, resources: Dict[str, Any]) -> Dict[str, Any]
                                     authorized = True
                                     response["known_person_seen"] = True
                                 approved_status.append(authorized)
-                                if not authorized and all.image is not None:
-                                    response["image"] = viam_to_pil_image(all.image).crop((d.x_min, d.y_min, d.x_max, d.y_max))
+                                if not authorized and all.image is not None and "image" not in response:
+                                    # keep the first unknown person; cropping happens only if the image is used
+                                    response["image"] = ImageHandle(all.image, crop_box=(d.x_min, d.y_min, d.x_max, d.y_max))
                                     response["value"] = class_without_label
                                     response["resource"] = rule.camera
                     getParam('logger').debug(approved_status)
@@ -202,21 +288,16 @@ async def eval_rule(rule: RuleType, resources: Dict[str, Any]) -> Dict[str, Any]
 
                         response["triggered"] = True
             except Exception as e:
-                getParam('logger').error(f"Error in 'tracker' type rule, rule not properly evaluated: {e}")
-                if getattr(rule, 'fail_eval', None) is not None:
-                    response["triggered"] = rule.fail_eval
-                    response["value"] = None
-                    response["resource"] = rule.camera
-                    getParam('logger').debug(f"tracker rule failed, using fail_eval: {rule.fail_eval}")
-                # If fail_eval is None, don't modify the response (maintains original behavior)
+                failed_response(rule, response, e)
         case "call":
             try:
                 if isinstance(rule, RuleCall):
-                    call_res = await call_method(resources, rule.resource, rule.method, rule.payload, None)
-                    if rule.result_path:
-                        call_res = get_value_by_dot_notation(call_res, rule.result_path)
+                    call_res = await call_method(resources, rule.resource, rule.method, rule.payload, None, single_flight=True, timeout_ms=rule_plan(rule).timeout_ms)
+                    plan = rule_plan(rule)
+                    if plan.result_keys:
+                        call_res = get_value_by_keys(call_res, plan.result_keys)
                         if call_res == None:
-                            getParam('logger').error(f"data not found in path {rule.result_path}")
+                            log_error(getParam('logger'), f"data not found in path {rule.result_path}", None, rule)
                             return response
 
                     getParam('logger').debug(call_res)
@@ -242,7 +323,7 @@ async def eval_rule(rule: RuleType, resources: Dict[str, Any]) -> Dict[str, Any]
                         case "gte":
                             triggered = call_res >= rule.result_value
                         case "regex":
-                            triggered = re.match(rule.result_value, call_res) is not None
+                            triggered = (plan.result_pattern or re.compile(rule.result_value)).match(call_res) is not None
                         case "in":
                             triggered = rule.result_value in call_res
                         case "hasattr":
@@ -253,13 +334,18 @@ async def eval_rule(rule: RuleType, resources: Dict[str, Any]) -> Dict[str, Any]
                     response["resource"] = rule.resource
                     getParam('logger').debug(f"call rule eval to {triggered} call_res {call_res} result_val {rule.result_value}")
             except Exception as e:
-                getParam('logger').error(f"Error in 'call' type rule, rule not properly evaluated: {e}")
-                if getattr(rule, 'fail_eval', None) is not None:
-                    response["triggered"] = rule.fail_eval
-                    response["value"] = None
-                    response["resource"] = rule.resource
-                    getParam('logger').debug(f"call rule failed, using fail_eval: {rule.fail_eval}")
-                # If fail_eval is None, don't modify the response (maintains original behavior)
+                failed_response(rule, response, e)
+    return response
+
+def failed_response(rule: RuleType, response: Dict[str, Any], e: Exception) -> Dict[str, Any]:
+    """Log a failed evaluation and apply the rule's fail_eval to its response"""
+    log_error(getParam('logger'), f"Error in '{rule.type}' type rule, rule not properly evaluated: {e}", e, rule)
+    if getattr(rule, 'fail_eval', None) is not None:
+        response["triggered"] = rule.fail_eval
+        response["value"] = None
+        response["resource"] = rule.resource if rule.type == "call" else rule.camera
+        getParam('logger').debug(f"{rule.type} rule failed, using fail_eval: {rule.fail_eval}")
+    # If fail_eval is None, don't modify the response (maintains original behavior)
     return response
 
 def logical_trigger(logic_type: str, list: List[bool]) -> bool:
@@ -267,6 +353,11 @@ def logical_trigger(logic_type: str, list: List[bool]) -> bool:
     return logic_function(list)
 
 def _get_vision_service(name: str, resources: Dict[str, Any]) -> Vision:
+    # fail fast while the resource's circuit breaker is open
+    check_breaker(resources, name)
+    handle = plan_handle(resources, name)
+    if handle is not None:
+        return handle
     actual = resources['_deps'][VisionClient.get_resource_name(name)]
     if resources.get(actual) == None:
         # initialize if it is not already
@@ -274,16 +365,132 @@ def _get_vision_service(name: str, resources: Dict[str, Any]) -> Vision:
     return resources[actual]
 
 def _get_camera_component(name: str, resources: Dict[str, Any]):
+    # fail fast while the resource's circuit breaker is open
+    check_breaker(resources, name)
+    handle = plan_handle(resources, name)
+    if handle is not None:
+        return handle
     actual = resources['_deps'][CameraClient.get_resource_name(name)]
     if resources.get(actual) == None:
         # initialize if it is not already
         resources[actual] = cast(CameraClient, actual)
     return resources[actual]
 
+async def _get_image(rule: Union[RuleDetector, RuleClassifier], camera: Any, resources: Dict[str, Any]) -> Any:
+    plan = rule_plan(rule)
+    key = (rule.camera, plan.extra_key)
+    fetch = lambda: guarded(resources, rule.camera, lambda: camera.get_image(extra=plan.extra), ("get_image",) + key, plan.timeout_ms)
+    frame_cache = resources.get('_frame_cache')
+    if frame_cache is None:
+        return await fetch()
+    return await frame_cache.get(key, fetch, _wait_ms(rule, resources), rule.camera)
+
+async def _get_detections(rule: RuleDetector, camera: Any, detector: Vision, resources: Dict[str, Any], frame: Any = None) -> Tuple[Any, List[Detection]]:
+    plan = rule_plan(rule)
+
+    async def infer() -> Tuple[Any, List[Detection]]:
+        if plan.defer_image:
+            # single round trip, the image is only fetched if the rule triggers and something needs it
+            return None, await guarded(resources, rule.detector, lambda: detector.get_detections_from_camera(rule.camera, extra=plan.extra),
+                                       ("get_detections_from_camera", rule.camera, plan.extra_key), plan.timeout_ms)
+        image = frame if frame is not None else await _get_image(rule, camera, resources)
+        return image, await _reuse_for_identical_frame(
+            resources, rule.camera, ("detection", rule.detector, plan.extra_key), image,
+            lambda: guarded(resources, rule.detector, lambda: detector.get_detections(image, extra=plan.extra),
+                            ("get_detections", id(image), plan.extra_key), plan.timeout_ms)
+        )
+
+    inference_cache = resources.get('_inference_cache')
+    if inference_cache is None:
+        return await infer()
+    # thresholds and class_regex are applied per rule, so they are not part of the key
+    kind = "detection_from_camera" if plan.defer_image else "detection"
+    calls = 1 if frame is not None or plan.defer_image else 2
+    return await inference_cache.get((kind, rule.camera, rule.detector, plan.extra_key), infer,
+                                     _wait_ms(rule, resources, calls), rule.detector)
+
+async def _get_classifications(rule: RuleClassifier, camera: Any, classifier: Vision, resources: Dict[str, Any], frame: Any = None) -> Tuple[Any, List[Classification]]:
+    plan = rule_plan(rule)
+
+    async def infer() -> Tuple[Any, List[Classification]]:
+        if plan.defer_image:
+            return None, await guarded(resources, rule.classifier, lambda: classifier.get_classifications_from_camera(rule.camera, count=10, extra=plan.extra),
+                                       ("get_classifications_from_camera", rule.camera, plan.extra_key), plan.timeout_ms)
+        image = frame if frame is not None else await _get_image(rule, camera, resources)
+        return image, await _reuse_for_identical_frame(
+            resources, rule.camera, ("classification", rule.classifier, plan.extra_key), image,
+            lambda: guarded(resources, rule.classifier, lambda: classifier.get_classifications(image, count=10, extra=plan.extra),
+                            ("get_classifications", id(image), plan.extra_key), plan.timeout_ms)
+        )
+
+    inference_cache = resources.get('_inference_cache')
+    if inference_cache is None:
+        return await infer()
+    kind = "classification_from_camera" if plan.defer_image else "classification"
+    calls = 1 if frame is not None or plan.defer_image else 2
+    return await inference_cache.get((kind, rule.camera, rule.classifier, plan.extra_key), infer,
+                                     _wait_ms(rule, resources, calls), rule.classifier)
+
+async def _reuse_for_identical_frame(resources: Dict[str, Any], camera_name: str, key: Tuple[Any, ...], image: Any, infer: Callable[[], Any]) -> Any:
+    frame_results = resources.get('_frame_results')
+    data = getattr(image, 'data', None)
+    if frame_results is None or not isinstance(data, bytes):
+        return await infer()
+    digest = frame_digest(data)
+    result = frame_results.get(camera_name, key, digest)
+    if result is None:
+        result = await infer()
+        frame_results.put(camera_name, key, digest, result)
+    return result
+
+def _wait_ms(rule: RuleType, resources: Dict[str, Any], calls: int = 1) -> float:
+    """How long the rule waits on a result shared with other rules: as long as its own calls may take, 0 for no limit"""
+    timeout = rule_plan(rule).timeout_ms
+    if timeout is None:
+        timeout = resources.get('_default_timeout_ms', 0)
+    return (timeout or 0) * calls
+
+def evaluation_wait_ms(rule: RuleType, resources: Dict[str, Any]) -> float:
+    """How long the rule waits on an evaluation of it shared with other events, 0 for no limit"""
+    match rule.type:
+        case "detection" | "classification":
+            # the motion gate's frame fetch is reused for inference, so a vision rule makes at most two calls
+            return _wait_ms(rule, resources, 1 if rule_plan(rule).defer_image else 2)
+        case "tracker":
+            return _wait_ms(rule, resources, 2)
+        case "call":
+            return _wait_ms(rule, resources)
+    return 0
+
+def _motion_gate(rule: Union[RuleDetector, RuleClassifier]) -> Optional[MotionGate]:
+    plan = rule_plan(rule)
+    if not plan.motion_threshold:
+        return None
+    gate = rule.__dict__.get('_motion_gate')
+    if gate is None:
+        gate = MotionGate(plan.motion_threshold, plan.motion_recheck_secs)
+        rule.__dict__['_motion_gate'] = gate
+    return gate
+
+def _reused_response(rule: Union[RuleDetector, RuleClassifier], gate: MotionGate, response: Dict[str, Any], frame: Any, camera: Any, resources: Dict[str, Any]) -> Dict[str, Any]:
+    reused = dict(gate.last_response or response)
+    if reused.get("triggered") == True:
+        # show the frame that was just checked rather than the one the result came from
+        reused["image"] = _image_handle(rule, frame, camera, resources)
+    return reused
+
+def _image_handle(rule: Union[RuleDetector, RuleClassifier], image: Any, camera: Any, resources: Dict[str, Any]) -> ImageHandle:
+    if image is None:
+        # defer_image mode: fetch a frame from the camera only when a consumer asks for it
+        return ImageHandle(None, fetch=lambda: _get_image(rule, camera, resources))
+    return ImageHandle(image)
+
 def get_value_by_dot_notation(data: Any, path: str) -> Optional[Any]:
     """Access a nested dictionary value using dot notation."""
+    return get_value_by_keys(data, tuple(path.split('.')))
 
-    keys = path.split('.')
+def get_value_by_keys(data: Any, keys: Tuple[str, ...]) -> Optional[Any]:
+    """Access a nested dictionary value by a path already split into keys."""
     value = data
 
     for key in keys:
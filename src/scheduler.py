@@ -0,0 +1,164 @@
+import asyncio
+import heapq
+import itertools
+import math
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+class ScheduledEvent():
+    """An event registered with the scheduler, along with its per-event runtime context"""
+    event: Any
+    stop_event: asyncio.Event
+    resources: Dict[str, Any]
+    last_state_save_time: float = 0
+    due: float = 0
+
+    def __init__(self, event: Any, stop_event: asyncio.Event, resources: Dict[str, Any], last_state_save_time: float):
+        self.event = event
+        self.stop_event = stop_event
+        self.resources = resources
+        self.last_state_save_time = last_state_save_time
+        self.due = 0
+
+
+class EventScheduler():
+    """Runs every event from a single task, using a heap of next-due times.
+
+    Instead of one polling loop per event, each event tick returns how many seconds until it
+    next needs attention (its next evaluation, action deadline or pause expiry) and the
+    scheduler sleeps until the earliest of those.  Ticks of different events that are due
+    at the same time run concurrently; an event is only re-queued once its tick finishes.
+    A tick returning math.inf parks its event until it is woken with wake().
+    """
+    tick: Callable[[ScheduledEvent], Awaitable[float]]
+    on_stop: Callable[[List[ScheduledEvent]], None]
+    ticks: int = 0
+    last_lag_ms: float = 0
+    max_lag_ms: float = 0
+    total_lag_ms: float = 0
+
+    def __init__(self, tick: Callable[[ScheduledEvent], Awaitable[float]], on_stop: Callable[[List[ScheduledEvent]], None]):
+        self.tick = tick
+        self.on_stop = on_stop
+        self.ticks = 0
+        self.last_lag_ms = 0
+        self.max_lag_ms = 0
+        self.total_lag_ms = 0
+        self._heap: List[Tuple[float, int, ScheduledEvent]] = []
+        self._counter = itertools.count()
+        self._running: Set[ScheduledEvent] = set()
+        self._parked: Set[ScheduledEvent] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def add(self, entry: ScheduledEvent, delay: float = 0) -> None:
+        self._push(entry, asyncio.get_running_loop().time() + max(delay, 0))
+
+    def wake(self, predicate: Callable[[ScheduledEvent], bool]) -> None:
+        """Make queued and parked entries matching predicate due immediately"""
+        now = asyncio.get_running_loop().time()
+        changed = False
+        for entry in [entry for entry in self._parked if predicate(entry)]:
+            self._parked.discard(entry)
+            entry.due = now
+            heapq.heappush(self._heap, (now, next(self._counter), entry))
+            changed = True
+        for i, (due, count, entry) in enumerate(self._heap):
+            if due > now and predicate(entry):
+                entry.due = now
+                self._heap[i] = (now, count, entry)
+                changed = True
+        if changed:
+            heapq.heapify(self._heap)
+            self._notify()
+
+    def discard_stopped(self) -> None:
+        """Drop queued entries whose stop event is set, rather than waiting for them to come due"""
+        stopped = [entry for _, _, entry in self._heap if entry.stop_event.is_set()]
+        stopped += [entry for entry in self._parked if entry.stop_event.is_set()]
+        if stopped:
+            self._heap = [item for item in self._heap if not item[2].stop_event.is_set()]
+            heapq.heapify(self._heap)
+            self._parked = {entry for entry in self._parked if not entry.stop_event.is_set()}
+            self.on_stop(stopped)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": len(self._heap),
+            "running": len(self._running),
+            "parked": len(self._parked),
+            "ticks": self.ticks,
+            "last_lag_ms": round(self.last_lag_ms, 3),
+            "max_lag_ms": round(self.max_lag_ms, 3),
+            "avg_lag_ms": round(self.total_lag_ms / self.ticks, 3) if self.ticks else 0
+        }
+
+    def _push(self, entry: ScheduledEvent, due: float) -> None:
+        entry.due = due
+        heapq.heappush(self._heap, (due, next(self._counter), entry))
+        self._notify()
+
+    def _notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        assert self._wakeup is not None
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            now = loop.time()
+            due = self._heap[0][0]
+            if due > now:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), due - now)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, _, entry = heapq.heappop(self._heap)
+            if entry.stop_event.is_set():
+                self.on_stop([entry])
+                continue
+
+            lag_ms = (now - due) * 1000
+            self.ticks += 1
+            self.last_lag_ms = lag_ms
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            self.total_lag_ms += lag_ms
+
+            self._running.add(entry)
+            asyncio.ensure_future(self._tick(entry))
+
+    async def _tick(self, entry: ScheduledEvent) -> None:
+        try:
+            delay = await self.tick(entry)
+        except Exception:
+            delay = 1
+        finally:
+            self._running.discard(entry)
+        if entry.stop_event.is_set():
+            self.on_stop([entry])
+            return
+        if delay == math.inf:
+            self._parked.add(entry)
+            return
+        self._push(entry, asyncio.get_running_loop().time() + max(delay, 0))
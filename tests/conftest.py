@@ -39,13 +39,3 @@ def mock_image():
     image = MagicMock()
     image.crop.return_value = MagicMock()
     return image
-
-# Mock for regex substitution used in tracker rules
-@pytest.fixture
-def mock_regex_sub():
-    """Mock function for re.sub that handles tracker label stripping."""
-    def _sub_side_effect(pattern, replacement, string):
-        if '(label:' in string:
-            return string.split('(label:')[0].strip()
-        return string
-    return _sub_side_effect 
\ No newline at end of file
@@ -145,7 +145,8 @@ class TestActionEvaluation:
                 action.resource, 
                 action.method, 
                 action.payload, 
-                event
+                event,
+                timeout_ms=None
             )
             
             # Verify action fields were updated
@@ -97,7 +97,7 @@ class TestCallRuleEvaluation(unittest.IsolatedAsyncioTestCase):
         self.assertTrue(result["triggered"])
         self.assertEqual(result["value"], "on")
         self.assertEqual(result["resource"], "kasa_plug_2")
-        mock_call_method.assert_called_once_with(resources, "kasa_plug_2", "do_command", "{'action': 'get_status'}", None)
+        mock_call_method.assert_called_once_with(resources, "kasa_plug_2", "do_command", "{'action': 'get_status'}", None, single_flight=True, timeout_ms=None)
     
     @patch('src.rules.call_method')
     @patch('src.rules.getParam')
@@ -280,6 +280,11 @@ class TestCallRuleEvaluation(unittest.IsolatedAsyncioTestCase):
         
         self.assertFalse(result["triggered"])
         mock_logger.error.assert_called_once()
+
+        # the same missing path on later ticks is grouped by the error log instead of logged every time
+        await eval_rule(rule, resources)
+        await eval_rule(rule, resources)
+        mock_logger.error.assert_called_once()
     
     @patch('src.rules.call_method')
     @patch('src.rules.getParam')
@@ -306,6 +311,11 @@ class TestCallRuleEvaluation(unittest.IsolatedAsyncioTestCase):
         
         self.assertFalse(result["triggered"])
         mock_logger.error.assert_called_once()
+
+        # the same missing path on later ticks is grouped by the error log instead of logged every time
+        await eval_rule(rule, resources)
+        await eval_rule(rule, resources)
+        mock_logger.error.assert_called_once()
     
     @patch('src.rules.call_method')
     @patch('src.rules.getParam')
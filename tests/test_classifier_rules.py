@@ -41,7 +41,7 @@ class TestClassifierRuleEvaluation(unittest.IsolatedAsyncioTestCase):
         with patch('src.rules.getParam', return_value=mock_logger):
             with patch('src.rules._get_vision_service', return_value=mock_classifier):
                 with patch('src.rules._get_camera_component', return_value=mock_camera):
-                    with patch('src.rules.viam_to_pil_image', return_value=mock_pil_image):
+                    with patch('src.imageHandle.viam_to_pil_image', return_value=mock_pil_image):
                         result = await eval_rule(rule, mock_resources)
                         
                         self.assertTrue(result["triggered"])
@@ -148,12 +148,35 @@ class TestClassifierRuleEvaluation(unittest.IsolatedAsyncioTestCase):
         with patch('src.rules.getParam', return_value=mock_logger):
             with patch('src.rules._get_vision_service', return_value=mock_classifier):
                 with patch('src.rules._get_camera_component', return_value=mock_camera):
-                    with patch('src.rules.viam_to_pil_image', return_value=mock_pil_image):
+                    with patch('src.imageHandle.viam_to_pil_image', return_value=mock_pil_image):
                         result = await eval_rule(rule, mock_resources)
                         
                         self.assertTrue(result["triggered"])
                         self.assertEqual(result["value"], "dog")
 
+    async def test_classifier_rule_defer_image(self):
+        """Test that defer_image classifies straight from the camera without fetching an image"""
+        rule = RuleClassifier(camera="cam1", classifier="image_classifier", class_regex="dog",
+                              confidence_pct=0.7, defer_image=True)
+
+        mock_classification = MagicMock()
+        mock_classification.class_name = "dog"
+        mock_classification.confidence = 0.8
+
+        mock_camera = AsyncMock()
+        mock_classifier = AsyncMock()
+        mock_classifier.get_classifications_from_camera.return_value = [mock_classification]
+
+        with patch('src.rules.getParam', return_value=MagicMock()):
+            with patch('src.rules._get_vision_service', return_value=mock_classifier):
+                with patch('src.rules._get_camera_component', return_value=mock_camera):
+                    result = await eval_rule(rule, {"_deps": {}})
+
+                    self.assertTrue(result["triggered"])
+                    mock_classifier.get_classifications_from_camera.assert_called_once_with("cam1", count=10, extra={})
+                    mock_classifier.get_classifications.assert_not_called()
+                    mock_camera.get_image.assert_not_called()
+
 class TestErrorHandling(unittest.IsolatedAsyncioTestCase):
     async def test_call_rule_with_error(self):
         """Test error handling in call rule evaluation"""
@@ -43,7 +43,7 @@ class TestDefaultClassRegex(unittest.IsolatedAsyncioTestCase):
         with patch('src.rules.getParam', return_value=mock_logger):
             with patch('src.rules._get_vision_service', return_value=mock_detector):
                 with patch('src.rules._get_camera_component', return_value=mock_camera):
-                    with patch('src.rules.viam_to_pil_image', return_value=mock_pil_image):
+                    with patch('src.imageHandle.viam_to_pil_image', return_value=mock_pil_image):
                         result = await eval_rule(rule, mock_resources)
                         
                         self.assertTrue(result["triggered"])
@@ -82,7 +82,7 @@ class TestDefaultClassRegex(unittest.IsolatedAsyncioTestCase):
         with patch('src.rules.getParam', return_value=mock_logger):
             with patch('src.rules._get_vision_service', return_value=mock_detector):
                 with patch('src.rules._get_camera_component', return_value=mock_camera):
-                    with patch('src.rules.viam_to_pil_image', return_value=mock_pil_image):
+                    with patch('src.imageHandle.viam_to_pil_image', return_value=mock_pil_image):
                         result = await eval_rule(rule, mock_resources)
                         
                         self.assertTrue(result["triggered"])
@@ -121,7 +121,7 @@ class TestDefaultClassRegex(unittest.IsolatedAsyncioTestCase):
         with patch('src.rules.getParam', return_value=mock_logger):
             with patch('src.rules._get_vision_service', return_value=mock_classifier):
                 with patch('src.rules._get_camera_component', return_value=mock_camera):
-                    with patch('src.rules.viam_to_pil_image', return_value=mock_pil_image):
+                    with patch('src.imageHandle.viam_to_pil_image', return_value=mock_pil_image):
                         result = await eval_rule(rule, mock_resources)
                         
                         self.assertTrue(result["triggered"])
@@ -160,7 +160,7 @@ class TestDefaultClassRegex(unittest.IsolatedAsyncioTestCase):
         with patch('src.rules.getParam', return_value=mock_logger):
             with patch('src.rules._get_vision_service', return_value=mock_classifier):
                 with patch('src.rules._get_camera_component', return_value=mock_camera):
-                    with patch('src.rules.viam_to_pil_image', return_value=mock_pil_image):
+                    with patch('src.imageHandle.viam_to_pil_image', return_value=mock_pil_image):
                         result = await eval_rule(rule, mock_resources)
                         
                         self.assertTrue(result["triggered"])
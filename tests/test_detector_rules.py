@@ -9,6 +9,7 @@ from unittest.mock import MagicMock, patch, AsyncMock
 sys.path.append(str(Path(__file__).parent.parent))
 
 from src.rules import RuleDetector, eval_rule
+from src.resourceGuard import ResourceGuards
 
 class TestDetectorRuleInitialization(unittest.TestCase):
     def test_detector_rule_initialization(self):
@@ -62,7 +63,7 @@ class TestDetectorRuleEvaluation(unittest.IsolatedAsyncioTestCase):
         with patch('src.rules.getParam', return_value=mock_logger):
             with patch('src.rules._get_vision_service', return_value=mock_detector):
                 with patch('src.rules._get_camera_component', return_value=mock_camera):
-                    with patch('src.rules.viam_to_pil_image', return_value=mock_pil_image):
+                    with patch('src.imageHandle.viam_to_pil_image', return_value=mock_pil_image):
                         result = await eval_rule(rule, mock_resources)
                         
                         self.assertTrue(result["triggered"])
@@ -174,7 +175,7 @@ class TestDetectorRuleEvaluation(unittest.IsolatedAsyncioTestCase):
         with patch('src.rules.getParam', return_value=mock_logger):
             with patch('src.rules._get_vision_service', return_value=mock_detector):
                 with patch('src.rules._get_camera_component', return_value=mock_camera):
-                    with patch('src.rules.viam_to_pil_image', return_value=mock_pil_image):
+                    with patch('src.imageHandle.viam_to_pil_image', return_value=mock_pil_image):
                         result = await eval_rule(rule, mock_resources)
                         
                         self.assertTrue(result["triggered"])
@@ -243,5 +244,116 @@ class TestDetectorRuleEvaluation(unittest.IsolatedAsyncioTestCase):
                         mock_camera.get_image.assert_called_once()
                         pass
 
+    async def test_detector_rule_defer_image(self):
+        """Test that defer_image uses a single RPC and only fetches the image when it is loaded"""
+        rule = RuleDetector(camera="cam1", detector="object_detector", class_regex="person",
+                            confidence_pct=0.7, defer_image=True)
+
+        mock_detection = MagicMock()
+        mock_detection.class_name = "person"
+        mock_detection.confidence = 0.8
+
+        mock_image = MagicMock()
+        mock_camera = AsyncMock()
+        mock_camera.get_image.return_value = mock_image
+
+        mock_detector = AsyncMock()
+        mock_detector.get_detections_from_camera.return_value = [mock_detection]
+
+        mock_logger = MagicMock()
+        mock_resources = {"_deps": {}}
+
+        with patch('src.rules.getParam', return_value=mock_logger):
+            with patch('src.rules._get_vision_service', return_value=mock_detector):
+                with patch('src.rules._get_camera_component', return_value=mock_camera):
+                    result = await eval_rule(rule, mock_resources)
+
+                    self.assertTrue(result["triggered"])
+                    mock_detector.get_detections_from_camera.assert_called_once_with("cam1", extra={})
+                    mock_detector.get_detections.assert_not_called()
+                    mock_camera.get_image.assert_not_called()
+
+                    await result["image"].load()
+                    await result["image"].load()
+                    mock_camera.get_image.assert_called_once()
+                    self.assertEqual(result["image"].image, mock_image)
+
+    async def test_detector_rule_defer_image_not_triggered(self):
+        """Test that a deferred rule that does not trigger never fetches an image"""
+        rule = RuleDetector(camera="cam1", detector="object_detector", class_regex="person",
+                            confidence_pct=0.7, defer_image=True)
+
+        mock_camera = AsyncMock()
+        mock_detector = AsyncMock()
+        mock_detector.get_detections_from_camera.return_value = []
+
+        with patch('src.rules.getParam', return_value=MagicMock()):
+            with patch('src.rules._get_vision_service', return_value=mock_detector):
+                with patch('src.rules._get_camera_component', return_value=mock_camera):
+                    result = await eval_rule(rule, {"_deps": {}})
+
+                    self.assertFalse(result["triggered"])
+                    self.assertNotIn("image", result)
+                    mock_camera.get_image.assert_not_called()
+
+    async def test_detector_rule_partial_match(self):
+        """Test that a matching class below the confidence threshold is reported as a partial match"""
+        rule = RuleDetector(camera="cam1", detector="object_detector", class_regex="person", confidence_pct=0.7)
+
+        mock_detection = MagicMock()
+        mock_detection.class_name = "person"
+        mock_detection.confidence = 0.4
+
+        mock_camera = AsyncMock()
+        mock_detector = AsyncMock()
+        mock_detector.get_detections.return_value = [mock_detection]
+
+        with patch('src.rules.getParam', return_value=MagicMock()):
+            with patch('src.rules._get_vision_service', return_value=mock_detector):
+                with patch('src.rules._get_camera_component', return_value=mock_camera):
+                    result = await eval_rule(rule, {"_deps": {}})
+
+                    self.assertFalse(result["triggered"])
+                    self.assertTrue(result["partial"])
+
+    async def test_detector_rule_timeout_uses_fail_eval(self):
+        """Test that a hung vision call times out and is treated as a failed evaluation"""
+        rule = RuleDetector(camera="cam1", detector="object_detector", class_regex="person",
+                            confidence_pct=0.7, fail_eval=True, timeout_ms=10)
+
+        async def hang(*args, **kwargs):
+            await asyncio.sleep(10)
+
+        mock_camera = AsyncMock()
+        mock_detector = AsyncMock()
+        mock_detector.get_detections.side_effect = hang
+        mock_logger = MagicMock()
+
+        with patch('src.rules.getParam', return_value=mock_logger):
+            with patch('src.rules._get_vision_service', return_value=mock_detector):
+                with patch('src.rules._get_camera_component', return_value=mock_camera):
+                    result = await eval_rule(rule, {"_deps": {}})
+
+        self.assertTrue(result["triggered"])
+        self.assertIsNone(result["value"])
+        self.assertIn("timed out", mock_logger.error.call_args[0][0])
+
+    async def test_detector_rule_open_breaker_uses_fail_eval(self):
+        """Test that an open circuit breaker fails the rule without calling the resource"""
+        rule = RuleDetector(camera="cam1", detector="object_detector", class_regex="person",
+                            confidence_pct=0.7, fail_eval=False)
+        guards = ResourceGuards()
+        guards.configure({"object_detector": {"breaker_failures": 1}})
+        guards.get("object_detector").breaker.record_failure(False)
+        mock_logger = MagicMock()
+
+        with patch('src.rules.getParam', return_value=mock_logger):
+            result = await eval_rule(rule, {"_deps": {}, "_guards": guards})
+
+        self.assertFalse(result["triggered"])
+        self.assertIsNone(result["value"])
+        self.assertIn("circuit breaker open", mock_logger.error.call_args[0][0])
+        self.assertEqual(guards.stats()["object_detector"]["breaker"]["rejected"], 1)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
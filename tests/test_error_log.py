@@ -0,0 +1,106 @@
+import logging
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# Add the source directory to the path so we can import the modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.errorLog import ErrorLog, current_event, error_log_for, log_error, rule_label
+from src.rules import RuleDetector
+
+
+def _logger(debug: bool = False) -> MagicMock:
+    logger = MagicMock()
+    logger.isEnabledFor.side_effect = lambda level: debug or level > logging.DEBUG
+    return logger
+
+
+def _raise(exc: Exception) -> Exception:
+    try:
+        raise exc
+    except Exception as e:
+        return e
+
+
+class TestErrorLog:
+    def test_repeats_are_suppressed(self):
+        logger = _logger()
+        error_log = ErrorLog(summary_secs=60)
+        rule = RuleDetector(camera="cam1", detector="det")
+        for _ in range(5):
+            error_log.error(logger, "camera down", _raise(RuntimeError("camera down")), rule)
+
+        logger.error.assert_called_once_with("camera down")
+        assert error_log.stats() == {"groups": 1, "suppressed": 4}
+
+    def test_groups_by_exception_type_and_rule(self):
+        logger = _logger()
+        error_log = ErrorLog()
+        rule = RuleDetector(camera="cam1", detector="det")
+        other = RuleDetector(camera="cam2", detector="det")
+        error_log.error(logger, "a", _raise(RuntimeError("a")), rule)
+        error_log.error(logger, "b", _raise(ValueError("b")), rule)
+        error_log.error(logger, "c", _raise(RuntimeError("c")), other)
+        assert logger.error.call_count == 3
+
+    def test_groups_by_event(self):
+        logger = _logger()
+        error_log = ErrorLog()
+        for name in ["front", "back"]:
+            token = current_event.set(name)
+            error_log.error(logger, "down", _raise(RuntimeError("down")))
+            current_event.reset(token)
+        assert logger.error.call_count == 2
+
+    def test_summary_after_window(self):
+        logger = _logger()
+        error_log = ErrorLog(summary_secs=60)
+        with patch('src.errorLog.time.monotonic', return_value=1000):
+            error_log.error(logger, "down", _raise(RuntimeError("down")))
+            error_log.error(logger, "down", _raise(RuntimeError("down")))
+            error_log.error(logger, "down", _raise(RuntimeError("down")))
+        with patch('src.errorLog.time.monotonic', return_value=1061):
+            error_log.error(logger, "down", _raise(RuntimeError("down")))
+
+        assert logger.error.call_count == 2
+        summary = logger.error.call_args[0][0]
+        assert "occurred 3 times" in summary
+        assert "4 in total" in summary
+
+    def test_flush_reports_pending_summary(self):
+        logger = _logger()
+        error_log = ErrorLog(summary_secs=60)
+        with patch('src.errorLog.time.monotonic', return_value=1000):
+            error_log.error(logger, "down", _raise(RuntimeError("down")))
+            error_log.error(logger, "down", _raise(RuntimeError("down")))
+        with patch('src.errorLog.time.monotonic', return_value=1061):
+            error_log.flush(logger)
+        assert "occurred 1 times" in logger.error.call_args[0][0]
+
+        # a group that stays quiet for a window is forgotten
+        with patch('src.errorLog.time.monotonic', return_value=1200):
+            error_log.flush(logger)
+        assert error_log.stats()["groups"] == 0
+
+    def test_traceback_only_at_debug(self):
+        logger = _logger(debug=False)
+        ErrorLog().error(logger, "down", _raise(RuntimeError("down")))
+        logger.debug.assert_not_called()
+
+        logger = _logger(debug=True)
+        ErrorLog().error(logger, "down", _raise(RuntimeError("down")))
+        assert "Traceback" in logger.debug.call_args[0][0]
+
+    def test_error_log_per_logger(self):
+        first, second = _logger(), _logger()
+        assert error_log_for(first) is error_log_for(first)
+        assert error_log_for(first) is not error_log_for(second)
+        log_error(first, "down", _raise(RuntimeError("down")))
+        log_error(second, "down", _raise(RuntimeError("down")))
+        first.error.assert_called_once()
+        second.error.assert_called_once()
+
+    def test_rule_label(self):
+        assert rule_label(RuleDetector(camera="cam1", detector="det")) == "detection:cam1:det"
+        assert rule_label(None) == ""
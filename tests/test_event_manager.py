@@ -7,6 +7,7 @@ from unittest.mock import MagicMock, patch, AsyncMock
 import time
 from datetime import datetime, timedelta
 import json
+import pickle
 
 # Add the source directory to the path so we can import the modules
 sys.path.append(str(Path(__file__).parent.parent))
@@ -24,6 +25,9 @@ from viam.components.camera import Camera
 from google.protobuf.struct_pb2 import Struct
 from src.notificationClass import NotificationPush
 from src.rules import RuleDetector
+from src.ruleStats import get_rule_stats
+from src.scheduler import ScheduledEvent
+from src.imageHandle import ImageHandle
 
 # Basic tests from both files
 @pytest.mark.asyncio
@@ -210,7 +214,7 @@ class TestEventManagerBasics:
         assert result is not None 
 
 class TestEventManagerReconfigureAndLoop:
-    """Tests focusing on reconfigure and event_check_loop with push_module."""
+    """Tests focusing on reconfigure and event ticks with push_module."""
 
     def _create_mock_module_config(self, attributes_dict: dict) -> MagicMock:
         mock_struct = Struct()
@@ -243,9 +247,12 @@ class TestEventManagerReconfigureAndLoop:
 
         assert "push_module_name" in manager.robot_resources
         assert manager.robot_resources["push_module_name"] == "my_push_service"
+        # let the started scheduler run, then stop it
+        await asyncio.sleep(0.01)
+        await manager.scheduler.stop()
 
     @pytest.mark.asyncio
-    async def test_event_check_loop_with_push_module(self):
+    async def test_event_tick_with_push_module(self):
         manager = eventManager("test_manager_loop")
         manager.logger = MagicMock()
 
@@ -286,21 +293,14 @@ class TestEventManagerReconfigureAndLoop:
         }
         manager.event_states = [event] # Ensure the event is in event_states
 
-        stop_event = asyncio.Event()
-
         # Patch dependencies
         with patch('src.eventManager.globals.setParam') as mock_set_param, \
              patch('src.eventManager.rules.eval_rule', new_callable=AsyncMock, return_value={"triggered": True, "value": "test_label", "resource": "test_camera", "image": MagicMock()}) as mock_eval_rule, \
-             patch('src.eventManager.notifications.notify', new_callable=AsyncMock) as mock_notify, \
-             patch('asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
-            
-            # mock_sleep to prevent infinite loop in test
-            mock_sleep.side_effect = asyncio.CancelledError # Stop loop after first check
+             patch('src.eventManager.notifications.notify', new_callable=AsyncMock) as mock_notify:
 
-            try:
-                await manager.event_check_loop(event, stop_event)
-            except asyncio.CancelledError:
-                pass # Expected
+            entry = manager._setup_event(event, asyncio.Event())
+            assert entry is not None
+            await manager._event_tick(entry)
 
             mock_set_param.assert_called_with('logger', manager.logger)
             mock_eval_rule.assert_called()
@@ -312,9 +312,112 @@ class TestEventManagerReconfigureAndLoop:
             assert "push_module" in called_resources
             assert called_resources["push_module"] == mock_push_service 
 
+    def _time_event(self, name: str, start_hour: int = 0) -> dict:
+        return {"name": name, "modes": ["active"], "detection_hz": 1,
+                "rules": [{"type": "time", "ranges": [{"start_hour": start_hour, "end_hour": 24}]}]}
+
+    @pytest.mark.asyncio
+    async def test_reconfigure_only_restarts_changed_events(self):
+        manager = eventManager("test_manager_diff")
+        manager.logger = MagicMock()
+        manager.robot_resources = {}
+
+        manager.reconfigure(self._create_mock_module_config({"events": [
+            self._time_event("same"), self._time_event("changed"), self._time_event("removed")
+        ]}), {})
+        await asyncio.sleep(0.01)
+        same, changed, removed = manager.event_states
+        same_entry = manager._scheduled["same"]
+        removed_entry = manager._scheduled["removed"]
+        changed.pause_count = 3
+        changed.last_triggered = 1234
+
+        with patch.object(manager, '_restore_event_states') as mock_restore:
+            manager.reconfigure(self._create_mock_module_config({"events": [
+                self._time_event("same"), self._time_event("changed", start_hour=1), self._time_event("new")
+            ]}), {})
+            await asyncio.sleep(0.01)
+        mock_restore.assert_not_called()
+
+        assert manager.event_states[0] is same
+        assert manager._scheduled["same"] is same_entry
+        assert not same_entry.stop_event.is_set()
+
+        # the changed event restarts with its runtime state carried over
+        assert manager.event_states[1] is not changed
+        assert manager.event_states[1].pause_count == 3
+        assert manager.event_states[1].last_triggered == 1234
+        assert manager._scheduled["changed"].event is manager.event_states[1]
+
+        assert removed_entry.stop_event.is_set()
+        assert "removed" not in manager._scheduled
+        assert "new" in manager._scheduled
+        await manager.scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_global_settings_change_restarts_events(self):
+        manager = eventManager("test_manager_diff_global")
+        manager.logger = MagicMock()
+        manager.robot_resources = {}
+
+        manager.reconfigure(self._create_mock_module_config({"events": [self._time_event("e")]}), {})
+        await asyncio.sleep(0.01)
+        event = manager.event_states[0]
+
+        manager.reconfigure(self._create_mock_module_config({"enable_backoff_schedule": True, "events": [self._time_event("e")]}), {})
+        await asyncio.sleep(0.01)
+        assert manager.event_states[0] is not event
+        assert manager.event_states[0].backoff_schedule == manager.default_backoff_schedule
+        await manager.scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_changed_rule_reset_settings_take_effect(self):
+        manager = eventManager("test_manager_diff_rule_reset")
+        manager.logger = MagicMock()
+        manager.robot_resources = {}
+
+        manager.reconfigure(self._create_mock_module_config({"events": [self._time_event("e")]}), {})
+        await asyncio.sleep(0.01)
+        manager.event_states[0].rule_reset_counter = 1
+
+        changed = dict(self._time_event("e"), require_rule_reset=True, rule_reset_count=5)
+        manager.reconfigure(self._create_mock_module_config({"events": [changed]}), {})
+        await asyncio.sleep(0.01)
+        event = manager.event_states[0]
+        assert event.require_rule_reset is True
+        assert event.rule_reset_count == 5
+        # progress towards the reset is runtime state and carries over
+        assert event.rule_reset_counter == 1
+        await manager.scheduler.stop()
+
+    def test_validate_rejects_duplicate_event_names(self):
+        config = self._create_mock_module_config({"events": [self._time_event("dup"), self._time_event("dup", start_hour=1)]})
+        with pytest.raises(ValueError, match="dup"):
+            eventManager.validate(config)
+
+    @pytest.mark.asyncio
+    async def test_duplicate_event_names_are_all_stopped(self):
+        manager = eventManager("test_manager_duplicates")
+        manager.logger = MagicMock()
+        manager.robot_resources = {}
+
+        manager.reconfigure(self._create_mock_module_config({"events": [
+            self._time_event("dup"), self._time_event("dup", start_hour=1)
+        ]}), {})
+        await asyncio.sleep(0.01)
+        # only the first event with the name is used
+        assert len(manager.event_states) == 1
+        assert manager.scheduler.stats()["queue_depth"] + manager.scheduler.stats()["parked"] == 1
+
+        manager.reconfigure(self._create_mock_module_config({"events": []}), {})
+        await asyncio.sleep(0.01)
+        assert manager._scheduled == {}
+        assert manager.scheduler.stats()["queue_depth"] + manager.scheduler.stats()["parked"] == 0
+        await manager.scheduler.stop()
+
 @pytest.mark.asyncio
 class TestResourceAvailability:
-    """Tests for resource availability checking in event check loop."""
+    """Tests for resource availability checking when an event is set up."""
 
     async def test_event_with_missing_resources(self):
         """Test that event goes into incomplete state when resources are missing."""
@@ -358,21 +461,12 @@ class TestResourceAvailability:
             # camera1, camera2, and light1 are missing
         }
 
-        # Create stop event
-        stop_event = asyncio.Event()
-
-        # Mock necessary dependencies to prevent infinite loop
         with patch('src.eventManager.globals.setParam') as mock_set_param, \
-             patch('src.eventManager.rules.eval_rule', new_callable=AsyncMock) as mock_eval_rule, \
-             patch('asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
-            
-            # Set up sleep to raise CancelledError after first check
-            mock_sleep.side_effect = asyncio.CancelledError()
+             patch('src.eventManager.rules.eval_rule', new_callable=AsyncMock) as mock_eval_rule:
 
-            try:
-                await manager.event_check_loop(event, stop_event)
-            except asyncio.CancelledError:
-                pass  # Expected
+            # the event is not scheduled, reconfigure() sets it up again when resources are available
+            assert manager._setup_event(event, asyncio.Event()) is None
+            mock_eval_rule.assert_not_called()
 
             # Verify event went into incomplete state
             assert event.state == "incomplete"
@@ -434,20 +528,12 @@ class TestResourceAvailability:
             GenericComponent.get_resource_name("light1"): MagicMock(),  # Generic component
         }
 
-        # Create stop event
-        stop_event = asyncio.Event()
-
-        # Mock the rule evaluation to prevent infinite loop
         with patch('src.eventManager.rules.eval_rule', new_callable=AsyncMock) as mock_eval_rule:
             mock_eval_rule.return_value = {"triggered": False}
-            # Remove CancelledError side effect, use timeout instead
 
-            try:
-                await asyncio.wait_for(manager.event_check_loop(event, stop_event), timeout=2)
-            except asyncio.TimeoutError:
-                stop_event.set()  # Ensure the loop exits if it didn't already
-            except asyncio.CancelledError:
-                pass  # In case CancelledError is still raised
+            entry = manager._setup_event(event, asyncio.Event())
+            assert entry is not None
+            await manager._event_tick(entry)
 
         # Verify event did not go into incomplete state
         assert event.state != "incomplete"
@@ -486,11 +572,7 @@ class TestResourceAvailability:
         # Set up dependencies with optional resource missing
         manager.deps = {}  # No resources available
 
-        # Create stop event
-        stop_event = asyncio.Event()
-
-        # Run the event check loop
-        await manager.event_check_loop(event, stop_event)
+        assert manager._setup_event(event, asyncio.Event()) is None
 
         # Verify event went into incomplete state
         assert event.state == "incomplete"
@@ -501,4 +583,362 @@ class TestResourceAvailability:
         manager.logger.warning.assert_called_once()
         warning_msg = manager.logger.warning.call_args[0][0]
         assert "incomplete due to missing resources" in warning_msg
-        assert "camera1" in warning_msg 
\ No newline at end of file
+        assert "camera1" in warning_msg 
+
+@pytest.mark.asyncio
+class TestConcurrentRuleEvaluation:
+    """Tests for evaluating an event's rules concurrently"""
+
+    def _manager(self) -> eventManager:
+        manager = eventManager("test_manager")
+        manager.logger = MagicMock()
+        return manager
+
+    def _rule(self, name: str, **kwargs) -> RuleDetector:
+        return RuleDetector(camera=name, detector="det", class_regex="person", **kwargs)
+
+    def _fake_eval(self, outcomes: dict, delays: dict, started: list, finished: list):
+        async def fake_eval(rule, resources):
+            started.append(rule.camera)
+            await asyncio.sleep(delays.get(rule.camera, 0))
+            finished.append(rule.camera)
+            return {"triggered": outcomes[rule.camera]}
+        return fake_eval
+
+    async def test_rules_run_concurrently(self):
+        manager = self._manager()
+        event = Event(name="e", rule_logic_type="AND")
+        event.rules = [self._rule("a"), self._rule("b"), self._rule("c")]
+        started, finished = [], []
+        fake_eval = self._fake_eval({"a": True, "b": True, "c": True}, {"a": 0.05, "b": 0.05, "c": 0.05}, started, finished)
+
+        with patch('src.eventManager.rules.eval_rule', side_effect=fake_eval):
+            start = time.monotonic()
+            results, _ = await manager._evaluate_rules(event, {})
+            elapsed = time.monotonic() - start
+
+        assert [r["triggered"] for r in results] == [True, True, True]
+        assert elapsed < 0.12
+
+    async def test_and_short_circuits_on_first_false(self):
+        manager = self._manager()
+        event = Event(name="e", rule_logic_type="AND")
+        event.rules = [self._rule("a"), self._rule("b")]
+        started, finished = [], []
+        fake_eval = self._fake_eval({"a": False, "b": True}, {"b": 1}, started, finished)
+
+        with patch('src.eventManager.rules.eval_rule', side_effect=fake_eval):
+            results, _ = await manager._evaluate_rules(event, {})
+
+        assert started == ["a", "b"]
+        assert finished == ["a"]
+        assert results[1] == {"triggered": False, "skipped": True}
+
+    async def test_and_short_circuits_on_fast_false_behind_slow_rule(self):
+        manager = self._manager()
+        event = Event(name="e", rule_logic_type="AND", reorder_rules=False)
+        event.rules = [self._rule("a"), self._rule("b")]
+        started, finished = [], []
+        fake_eval = self._fake_eval({"a": True, "b": False}, {"a": 1}, started, finished)
+
+        with patch('src.eventManager.rules.eval_rule', side_effect=fake_eval):
+            start = time.monotonic()
+            results, _ = await manager._evaluate_rules(event, {})
+            elapsed = time.monotonic() - start
+
+        assert elapsed < 0.5
+        assert started == ["a", "b"]
+        assert finished == ["b"]
+        assert results == [{"triggered": False, "skipped": True}, {"triggered": False}]
+
+    async def test_or_short_circuits_on_first_true(self):
+        manager = self._manager()
+        event = Event(name="e", rule_logic_type="OR")
+        event.rules = [self._rule("a"), self._rule("b")]
+        started, finished = [], []
+        fake_eval = self._fake_eval({"a": True, "b": False}, {"b": 1}, started, finished)
+
+        with patch('src.eventManager.rules.eval_rule', side_effect=fake_eval):
+            results, _ = await manager._evaluate_rules(event, {})
+
+        assert finished == ["a"]
+        assert len(results) == 2
+
+    async def test_xor_does_not_short_circuit(self):
+        manager = self._manager()
+        event = Event(name="e", rule_logic_type="XOR")
+        event.rules = [self._rule("a"), self._rule("b")]
+        started, finished = [], []
+        fake_eval = self._fake_eval({"a": True, "b": False}, {"b": 0.01}, started, finished)
+
+        with patch('src.eventManager.rules.eval_rule', side_effect=fake_eval):
+            results, _ = await manager._evaluate_rules(event, {})
+
+        assert finished == ["a", "b"]
+        assert [r["triggered"] for r in results] == [True, False]
+
+    async def test_rule_with_inverse_pause_is_not_cancelled(self):
+        manager = self._manager()
+        event = Event(name="e", rule_logic_type="AND")
+        event.rules = [self._rule("a"), self._rule("b", inverse_pause_secs=30)]
+        started, finished = [], []
+        fake_eval = self._fake_eval({"a": False, "b": False}, {"b": 0.01}, started, finished)
+
+        with patch('src.eventManager.rules.eval_rule', side_effect=fake_eval):
+            results, _ = await manager._evaluate_rules(event, {})
+
+        assert finished == ["a", "b"]
+        assert event.state == "paused"
+        assert event.paused_until > time.time()
+        assert len(results) == 1
+
+    async def test_sequence_count_disables_short_circuit(self):
+        manager = self._manager()
+        event = Event(name="e", rule_logic_type="AND", trigger_sequence_count=2)
+        event.rules = [self._rule("a"), self._rule("b")]
+        started, finished = [], []
+        fake_eval = self._fake_eval({"a": False, "b": True}, {"b": 0.01}, started, finished)
+
+        with patch('src.eventManager.rules.eval_rule', side_effect=fake_eval):
+            await manager._evaluate_rules(event, {})
+
+        assert finished == ["a", "b"]
+        assert event.sequence_count_current == 1
+
+    async def test_cost_order_with_concurrency_limit(self):
+        manager = self._manager()
+        event = Event(name="e", rule_logic_type="AND", max_concurrent_rules=1)
+        expensive, cheap = self._rule("expensive"), self._rule("cheap")
+        event.rules = [expensive, cheap]
+        started, finished = [], []
+        fake_eval = self._fake_eval({"expensive": True, "cheap": False}, {"expensive": 0.02}, started, finished)
+
+        with patch('src.eventManager.rules.eval_rule', side_effect=fake_eval):
+            # first pass measures both rules in configured order
+            await manager._evaluate_rules(event, {})
+            assert started == ["expensive", "cheap"]
+            assert manager._evaluation_order(event) == [1, 0]
+
+            started.clear()
+            results, _ = await manager._evaluate_rules(event, {})
+
+        # the cheap rule decides the outcome, so the expensive one is never started
+        assert started == ["cheap"]
+        assert results[0] == {"triggered": False, "skipped": True}
+
+        manager.event_states = [event]
+        readings = await manager.get_readings()
+        assert readings["state"]["e"]["rule_order"] == [1, 0]
+        assert readings["state"]["e"]["rule_stats"][0]["evaluations"] == 1
+        assert readings["state"]["e"]["rule_stats"][1]["true_rate"] == 0
+
+    async def test_reorder_rules_disabled(self):
+        manager = self._manager()
+        event = Event(name="e", rule_logic_type="AND", reorder_rules=False)
+        event.rules = [self._rule("a"), self._rule("b")]
+        get_rule_stats(event.rules[0]).record(500, False)
+        assert manager._evaluation_order(event) == [0, 1]
+
+
+@pytest.mark.asyncio
+class TestTimeGate:
+    """Tests for parking AND events outside their time windows"""
+
+    def _event(self, **kwargs) -> Event:
+        event = Event(name="night", rules=[
+            {"type": "time", "ranges": [{"start_hour": 20, "end_hour": 23}]},
+            {"type": "detection", "camera": "cam1", "detector": "det", "class_regex": "person"}
+        ], **kwargs)
+        event.modes = ["active"]
+        return event
+
+    async def test_closed_window_parks_until_it_opens(self):
+        manager = eventManager("test_manager")
+        manager.time_gate_max_park_secs = float('inf')
+        opens_at = manager._time_gate(self._event(), now=datetime(2024, 1, 1, 12, 0))
+        assert opens_at == datetime(2024, 1, 1, 20, 0).timestamp()
+
+    async def test_open_window_is_not_gated(self):
+        manager = eventManager("test_manager")
+        assert manager._time_gate(self._event(), now=datetime(2024, 1, 1, 21, 0)) is None
+
+    async def test_only_and_events_are_gated(self):
+        manager = eventManager("test_manager")
+        assert manager._time_gate(self._event(rule_logic_type="OR"), now=datetime(2024, 1, 1, 12, 0)) is None
+
+    async def test_park_is_capped(self):
+        manager = eventManager("test_manager")
+        opens_at = manager._time_gate(self._event(), now=datetime(2024, 1, 1, 12, 0))
+        assert opens_at <= time.time() + manager.time_gate_max_park_secs
+
+    async def test_parked_tick_runs_no_rules(self):
+        manager = eventManager("test_manager")
+        manager.logger = MagicMock()
+        manager.mode = "active"
+        event = self._event()
+        entry = ScheduledEvent(event, asyncio.Event(), {}, time.time())
+
+        with patch.object(manager, '_time_gate', return_value=time.time() + 100), \
+             patch('src.eventManager.rules.eval_rule', new_callable=AsyncMock) as mock_eval_rule:
+            to_wait = await manager._event_tick(entry)
+
+        mock_eval_rule.assert_not_called()
+        assert 99 < to_wait <= 100
+        assert event.state == "paused"
+        assert event.pause_reason.startswith("outside time window")
+
+
+@pytest.mark.asyncio
+class TestRulePause:
+    """Tests for parking events paused by a rule"""
+
+    def _manager_and_entry(self):
+        manager = eventManager("test_manager")
+        manager.logger = MagicMock()
+        manager.mode = "active"
+        event = Event(name="e", rules=[
+            {"type": "detection", "camera": "cam1", "detector": "det", "class_regex": "person", "inverse_pause_secs": 30}
+        ])
+        event.modes = ["active"]
+        return manager, event, ScheduledEvent(event, asyncio.Event(), {}, time.time())
+
+    async def test_paused_event_is_not_evaluated(self):
+        manager, event, entry = self._manager_and_entry()
+
+        with patch('src.eventManager.rules.eval_rule', new_callable=AsyncMock, return_value={"triggered": False}) as mock_eval_rule:
+            await manager._event_tick(entry)
+            assert event.state == "paused"
+            assert mock_eval_rule.call_count == 1
+
+            to_wait = await manager._event_tick(entry)
+            assert mock_eval_rule.call_count == 1
+            assert 29 < to_wait <= 30
+
+    async def test_evaluation_resumes_after_pause(self):
+        manager, event, entry = self._manager_and_entry()
+
+        with patch('src.eventManager.rules.eval_rule', new_callable=AsyncMock, return_value={"triggered": False}) as mock_eval_rule:
+            await manager._event_tick(entry)
+            # pretend the pause started 30 seconds ago
+            event.pause_started -= 30
+            event.paused_until -= 30
+            await manager._event_tick(entry)
+
+        assert mock_eval_rule.call_count == 2
+        assert event.pause_count == 2
+        assert 29 < event.paused_secs_total <= 30
+
+        manager.event_states = [event]
+        readings = await manager.get_readings()
+        assert readings["state"]["e"]["pauses"] == 2
+        assert readings["state"]["e"]["paused_secs"] >= 30
+
+
+@pytest.mark.asyncio
+class TestTriggeredImages:
+    async def test_images_are_not_kept_in_stored_results(self):
+        manager = eventManager("test_manager")
+        manager.logger = MagicMock()
+        manager.mode = "active"
+        event = Event(name="e", rule_logic_type="OR", trigger_sequence_count=2, rules=[
+            {"type": "detection", "camera": "cam1", "detector": "det", "class_regex": "person", "defer_image": True},
+            {"type": "detection", "camera": "cam2", "detector": "det", "class_regex": "person", "defer_image": True}
+        ])
+        event.modes = ["active"]
+        entry = ScheduledEvent(event, asyncio.Event(), {}, time.time())
+
+        async def fake_eval(rule, resources):
+            # a deferred image holds a fetch function, which cannot be pickled
+            return {"triggered": True, "value": "person", "resource": rule.camera,
+                    "image": ImageHandle(None, fetch=lambda: rule.camera)}
+
+        with patch('src.eventManager.rules.eval_rule', side_effect=fake_eval):
+            await manager._event_tick(entry)
+
+        assert event.state == "triggered"
+        # the first result was forced false by trigger_sequence_count, its image is removed all the same
+        assert [r["triggered"] for r in event.triggered_rules.values()] == [False, True]
+        assert all("image" not in r for r in event.triggered_rules.values())
+        pickle.dumps(event)
+
+
+@pytest.mark.asyncio
+class TestModeWakeups:
+    """Tests for parking events outside the current mode and waking them when it changes"""
+
+    def _manager_and_entry(self):
+        manager = eventManager("test_manager")
+        manager.logger = MagicMock()
+        manager.mode = "inactive"
+        event = Event(name="e", rules=[
+            {"type": "detection", "camera": "cam1", "detector": "det", "class_regex": "person"}
+        ])
+        event.modes = ["active"]
+        return manager, event, ScheduledEvent(event, asyncio.Event(), {}, time.time())
+
+    async def test_ineligible_event_is_parked(self):
+        manager, event, entry = self._manager_and_entry()
+        with patch('src.eventManager.rules.eval_rule', new_callable=AsyncMock, return_value={"triggered": False}) as mock_eval_rule:
+            assert await manager._event_tick(entry) == float('inf')
+        mock_eval_rule.assert_not_called()
+
+    async def test_mode_change_wakes_parked_event(self):
+        manager, event, entry = self._manager_and_entry()
+        with patch('src.eventManager.rules.eval_rule', new_callable=AsyncMock, return_value={"triggered": False}) as mock_eval_rule:
+            manager.scheduler.start()
+            manager.scheduler.add(entry)
+            await asyncio.sleep(0.01)
+            assert manager.scheduler.stats()["parked"] == 1
+            mock_eval_rule.assert_not_called()
+
+            manager.mode = "active"
+            await asyncio.sleep(0.01)
+            await manager.scheduler.stop()
+
+        assert manager.scheduler.stats()["parked"] == 0
+        assert mock_eval_rule.call_count == 1
+        assert event.state == "monitoring"
+
+    async def test_override_expiry_restores_mode(self):
+        manager, event, entry = self._manager_and_entry()
+        manager.mode_state.set_override("active", time.time() + 0.02)
+        assert manager.mode == "active"
+        assert manager.mode_overridden == "inactive"
+        await asyncio.wait_for(manager.mode_state.wait_for_change(), 1)
+        assert manager.mode == "inactive"
+        assert manager.mode_override_until is None
+
+    async def test_set_mode_wakes_eligible_events(self):
+        manager, event, entry = self._manager_and_entry()
+        with patch('src.eventManager.rules.eval_rule', new_callable=AsyncMock, return_value={"triggered": False}) as mock_eval_rule:
+            manager.scheduler.start()
+            manager.scheduler.add(entry)
+            await asyncio.sleep(0.01)
+
+            result = await manager.do_command({"set_mode": "active"})
+            await asyncio.sleep(0.01)
+            await manager.scheduler.stop()
+
+        assert result == {"mode": "active"}
+        assert mock_eval_rule.call_count == 1
+
+    async def test_set_mode_override(self):
+        manager, event, entry = self._manager_and_entry()
+        result = await manager.do_command({"set_mode_override": {"mode": "active", "duration_secs": 3600}})
+        assert result["mode"] == "active"
+        assert result["mode_overridden"] == "inactive"
+        assert "mode_override_until" in result
+
+        result = await manager.do_command({"set_mode_override": {"mode": "active", "until": "2099-01-01T00:00:00Z"}})
+        assert result["mode_override_until"] == "2099-01-01T00:00:00Z"
+
+        # without an end time the override is cancelled
+        result = await manager.do_command({"set_mode_override": {}})
+        assert result == {"mode": "inactive"}
+
+    async def test_set_mode_cancels_override(self):
+        manager, event, entry = self._manager_and_entry()
+        await manager.do_command({"set_mode_override": {"mode": "active", "duration_secs": 3600}})
+        result = await manager.do_command({"set_mode": "away"})
+        assert result == {"mode": "away"}
+        assert manager.mode_override_until is None
@@ -0,0 +1,130 @@
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Add the source directory to the path so we can import the modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from viam.components.camera import Camera
+from viam.components.generic import Generic as GenericComponent
+from viam.services.vision import VisionClient
+
+from src.eventPlan import EventPlan, RulePlan, rule_plan
+from src.events import Event
+from src.resourceUtils import call_method
+from src.rules import RuleCall, RuleDetector, _get_camera_component, eval_rule
+
+
+def _event() -> Event:
+    return Event(name="e", rules=[
+        {"type": "detection", "camera": "cam1", "detector": "det", "class_regex": "person|dog", "extra": {"b": 1, "a": 2}},
+        {"type": "call", "resource": "plug", "method": "do_command", "result_path": "status.power",
+         "result_operator": "regex", "result_value": "^on", "inverse_pause_secs": 30}
+    ], actions=[{"resource": "light", "method": "do_command", "payload": "{}"}])
+
+
+class TestRulePlan:
+    def test_compiles_rule_settings(self):
+        detector, call = _event().rules
+        assert rule_plan(detector).class_pattern.search("a dog")
+        assert rule_plan(detector).extra_key == '{"a": 2, "b": 1}'
+        assert not rule_plan(detector).pauses
+
+        assert rule_plan(call).result_keys == ("status", "power")
+        assert rule_plan(call).result_pattern.match("on")
+        assert rule_plan(call).pauses
+        assert rule_plan(call).inverse_pause_secs == 30
+        assert rule_plan(call).pause_on_known_secs == 0
+
+    def test_compiles_evaluation_settings(self):
+        rule = RuleDetector(camera="cam1", detector="det", timeout_ms=250, motion_threshold=4, extra={"a": 1})
+        plan = rule_plan(rule)
+        assert plan.timeout_ms == 250
+        assert plan.extra == {"a": 1}
+        assert plan.motion_threshold == 4
+        assert not plan.defer_image
+
+        # the motion gate needs a frame, so deferring the image turns it off
+        deferred = rule_plan(RuleDetector(camera="cam1", detector="det", motion_threshold=4, defer_image=True))
+        assert deferred.defer_image
+        assert deferred.motion_threshold == 0
+
+    def test_compiled_once_and_immutable(self):
+        rule = RuleDetector(camera="cam1", detector="det")
+        plan = rule_plan(rule)
+        assert rule_plan(rule) is plan
+        with pytest.raises(AttributeError):
+            plan.extra_key = "x"
+
+
+class TestEventPlan:
+    def test_resolves_handles(self):
+        camera, detector, plug, light = MagicMock(), MagicMock(), MagicMock(), MagicMock()
+        resources = {
+            "resources": {
+                "plug": {"type": "component", "subtype": "generic"},
+                "light": {"type": "component", "subtype": "generic"}
+            },
+            "_deps": {
+                Camera.get_resource_name("cam1"): camera,
+                VisionClient.get_resource_name("det"): detector,
+                GenericComponent.get_resource_name("plug"): plug,
+                GenericComponent.get_resource_name("light"): light
+            }
+        }
+        plan = EventPlan(_event(), resources)
+        assert dict(plan.handles) == {"cam1": camera, "det": detector, "plug": plug, "light": light}
+        with pytest.raises(TypeError):
+            plan.handles["other"] = MagicMock()
+
+    def test_compiles_event_settings(self):
+        event = Event(name="e", priority=3, require_rule_reset=True, rule_reset_count=2)
+        plan = EventPlan(event)
+        assert plan.priority == 3
+        assert plan.require_rule_reset
+        assert plan.rule_reset_count == 2
+
+    def test_recompiles_rule_plans(self):
+        event = _event()
+        stale = rule_plan(event.rules[0])
+        event.rules[0].class_regex = "cat"
+        EventPlan(event)
+        assert rule_plan(event.rules[0]) is not stale
+        assert rule_plan(event.rules[0]).class_pattern.search("cat")
+
+    def test_missing_resources_are_left_out(self):
+        plan = EventPlan(_event(), {"resources": {}, "_deps": {}})
+        assert dict(plan.handles) == {}
+
+    @pytest.mark.asyncio
+    async def test_call_method_uses_plan_handle(self):
+        plug = MagicMock()
+        plug.do_command = AsyncMock(return_value={"status": {"power": "on"}})
+        plan = EventPlan(_event(), {
+            "resources": {"plug": {"type": "component", "subtype": "generic"}},
+            "_deps": {GenericComponent.get_resource_name("plug"): plug}
+        })
+        # no configured type or dependencies needed once the plan has the handle
+        result = await call_method({"_plan": plan}, "plug", "do_command", "{'a': 1}", None)
+        assert result == {"status": {"power": "on"}}
+        plug.do_command.assert_called_once_with({"a": 1})
+
+    @pytest.mark.asyncio
+    async def test_call_rule_with_plan(self):
+        plug = MagicMock()
+        plug.do_command = AsyncMock(return_value={"status": {"power": "on-ish"}})
+        event = _event()
+        plan = EventPlan(event, {
+            "resources": {"plug": {"type": "component", "subtype": "generic"}},
+            "_deps": {GenericComponent.get_resource_name("plug"): plug}
+        })
+        with patch('src.rules.getParam', return_value=MagicMock()):
+            result = await eval_rule(event.rules[1], {"_plan": plan})
+        assert result["triggered"] is True
+        assert result["value"] == "on-ish"
+
+    def test_camera_from_plan(self):
+        camera = MagicMock()
+        plan = EventPlan(_event(), {"resources": {}, "_deps": {Camera.get_resource_name("cam1"): camera}})
+        assert _get_camera_component("cam1", {"_plan": plan}) is camera
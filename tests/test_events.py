@@ -67,5 +67,43 @@ class TestEvent(unittest.TestCase):
         self.assertEqual(event.trigger_sequence_count, 1)
         self.assertEqual(event.sequence_count_current, 0)
 
+    def test_fixed_rate_without_min_max_hz(self):
+        """Test that detection_hz is used when no adaptive rate is configured"""
+        event = Event(name="Fixed", detection_hz=2)
+        self.assertFalse(event.is_adaptive_rate())
+        self.assertEqual(event.next_evaluation_hz(True), 2)
+        self.assertEqual(event.next_evaluation_hz(False), 2)
+
+    def test_adaptive_rate(self):
+        """Test that the rate jumps to max_hz on a partial match and decays to min_hz"""
+        event = Event(name="Adaptive", min_hz=1, max_hz=8, hz_decay=0.5)
+        self.assertTrue(event.is_adaptive_rate())
+        self.assertEqual(event.next_evaluation_hz(False), 1)
+        self.assertEqual(event.next_evaluation_hz(True), 8)
+        self.assertEqual(event.next_evaluation_hz(False), 4)
+        self.assertEqual(event.next_evaluation_hz(False), 2)
+        self.assertEqual(event.next_evaluation_hz(False), 1)
+        self.assertEqual(event.next_evaluation_hz(False), 1)
+        self.assertEqual(event.next_evaluation_hz(True), 8)
+
+    def test_pause_tracking(self):
+        """Test that time held by rule pauses is accumulated"""
+        event = Event(name="Paused")
+        event.start_pause(1000, 30, "known person")
+        self.assertEqual(event.state, "paused")
+        self.assertEqual(event.pause_reason, "known person")
+        self.assertEqual(event.paused_until, 1030)
+        self.assertEqual(event.paused_secs(1010), 10)
+
+        # a pause is only counted until it expires
+        event.end_pause(1100)
+        self.assertEqual(event.paused_secs(1200), 30)
+
+        # a new pause started before the previous one expired ends it early
+        event.start_pause(2000, 60, "known person")
+        event.start_pause(2020, 60, "known person")
+        self.assertEqual(event.pause_count, 3)
+        self.assertEqual(event.paused_secs(2030), 60)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,172 @@
+import pickle
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, AsyncMock, patch
+from PIL import Image
+
+# Add the source directory to the path so we can import the modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from io import BytesIO
+from viam.media.video import ViamImage, CameraMimeType
+from src.imageHandle import ImageHandle, TriggerMedia, to_pil, to_jpeg_bytes
+from src.rules import RuleDetector, eval_rule
+from src.notifications import notify
+from src.notificationClass import NotificationSMS
+from src.events import Event
+
+
+class TestImageHandle:
+    def test_decodes_once(self):
+        decoded = MagicMock()
+        with patch('src.imageHandle.viam_to_pil_image', return_value=decoded) as mock_decode:
+            handle = ImageHandle(MagicMock())
+            assert handle.decode_count == 0
+            assert handle.pil() == decoded
+            assert handle.pil() == decoded
+            mock_decode.assert_called_once()
+            assert handle.decode_count == 1
+
+    def test_pickles_without_fetch(self):
+        handle = ImageHandle(None, crop_box=(1, 2, 3, 4), fetch=lambda: None)
+        restored = pickle.loads(pickle.dumps(handle))
+        assert restored.fetch is None
+        assert restored.image is None
+        assert restored.crop_box == (1, 2, 3, 4)
+        # the live handle keeps its fetch function
+        assert handle.fetch is not None
+
+    def test_crop_applied_on_decode(self):
+        decoded = MagicMock()
+        cropped = MagicMock()
+        decoded.crop.return_value = cropped
+        with patch('src.imageHandle.viam_to_pil_image', return_value=decoded):
+            handle = ImageHandle(MagicMock(), crop_box=(1, 2, 3, 4))
+            assert handle.pil() == cropped
+            decoded.crop.assert_called_once_with((1, 2, 3, 4))
+
+    def test_camera_jpeg_passes_through(self):
+        buffered = BytesIO()
+        Image.new('RGB', (10, 10), color='red').save(buffered, format="JPEG")
+        jpeg = buffered.getvalue()
+
+        with patch('src.imageHandle.viam_to_pil_image') as mock_decode:
+            handle = ImageHandle(ViamImage(jpeg, CameraMimeType.JPEG))
+            assert handle.jpeg_bytes() == jpeg
+            mock_decode.assert_not_called()
+            assert handle.decode_count == 0
+
+    def test_cropped_jpeg_is_reencoded(self):
+        buffered = BytesIO()
+        Image.new('RGB', (10, 10), color='red').save(buffered, format="JPEG")
+        jpeg = buffered.getvalue()
+
+        handle = ImageHandle(ViamImage(jpeg, CameraMimeType.JPEG), crop_box=(0, 0, 5, 5))
+        assert not handle.can_pass_through()
+        cropped = Image.open(BytesIO(handle.jpeg_bytes()))
+        assert cropped.size == (5, 5)
+        assert handle.decode_count == 1
+
+    def test_non_jpeg_is_encoded(self):
+        buffered = BytesIO()
+        Image.new('RGB', (10, 10), color='red').save(buffered, format="PNG")
+
+        handle = ImageHandle(ViamImage(buffered.getvalue(), CameraMimeType.PNG))
+        assert Image.open(BytesIO(handle.jpeg_bytes())).format == "JPEG"
+
+    def test_pil_images_are_encoded(self):
+        assert Image.open(BytesIO(to_jpeg_bytes(Image.new('RGB', (10, 10))))).format == "JPEG"
+
+    def test_to_pil_passes_through_pil_images(self):
+        image = Image.new('RGB', (10, 10))
+        assert to_pil(image) is image
+        assert to_pil(None) is None
+
+
+class TestTriggerMedia:
+    def test_variants_are_memoized(self):
+        media = TriggerMedia(Image.new('RGB', (100, 100), color='red'))
+        first = media.jpeg()
+        second = media.jpeg()
+        assert first is second
+        assert media.encode_count == 1
+        assert first.mime_type == "image/jpeg"
+        assert len(first.base64) > 0
+
+    def test_thumbnail_variant(self):
+        media = TriggerMedia(Image.new('RGB', (100, 50), color='red'))
+        thumb = media.thumbnail((20, 20))
+        assert Image.open(BytesIO(thumb.data)).size == (20, 10)
+        assert media.thumbnail((20, 20)) is thumb
+        assert media.variant("PNG").mime_type == "image/png"
+        assert media.encode_count == 2
+
+    def test_release(self):
+        media = TriggerMedia(Image.new('RGB', (10, 10)))
+        media.jpeg()
+        media.release()
+        assert media.image is None
+
+
+@pytest.mark.asyncio
+class TestLazyDecode:
+    async def test_many_matches_are_not_decoded(self):
+        """A frame with many matching detections should not be decoded by rule evaluation"""
+        rule = RuleDetector(camera="cam1", detector="person_detector", class_regex="person", confidence_pct=0.5)
+
+        detections = []
+        for confidence in [0.6, 0.9, 0.7]:
+            d = MagicMock()
+            d.class_name = "person"
+            d.confidence = confidence
+            detections.append(d)
+
+        mock_camera = AsyncMock()
+        mock_camera.get_image.return_value = MagicMock()
+        mock_detector = AsyncMock()
+        mock_detector.get_detections.return_value = detections
+
+        with patch('src.rules.getParam', return_value=MagicMock()):
+            with patch('src.rules._get_vision_service', return_value=mock_detector):
+                with patch('src.rules._get_camera_component', return_value=mock_camera):
+                    with patch('src.imageHandle.viam_to_pil_image') as mock_decode:
+                        result = await eval_rule(rule, {"_deps": {}})
+                        mock_decode.assert_not_called()
+
+        assert result["triggered"]
+        assert isinstance(result["image"], ImageHandle)
+
+    async def test_notify_decodes_handle(self):
+        event = Event(name="Test Event")
+        event.triggered_label = "person"
+        event.triggered_camera = "cam1"
+        notification = NotificationSMS(to="+15555555555", preset="alert")
+
+        with patch('src.imageHandle.viam_to_pil_image', return_value=Image.new('RGB', (10, 10), color='red')):
+            notification.image = ImageHandle(MagicMock())
+            sms_module = AsyncMock()
+            sms_module.do_command.return_value = {}
+            with patch('src.notifications.getParam', return_value=MagicMock()):
+                await notify(event, notification, {"sms_module": sms_module})
+
+        args = sms_module.do_command.call_args[0][0]
+        assert args["media_mime_type"] == "image/jpeg"
+        assert len(args["media_base64"]) > 0
+
+    async def test_shared_media_encodes_once_for_all_recipients(self):
+        event = Event(name="Test Event")
+        event.triggered_label = "person"
+        event.triggered_camera = "cam1"
+        sms_module = AsyncMock()
+        sms_module.do_command.return_value = {}
+        media = TriggerMedia(Image.new('RGB', (10, 10), color='red'))
+
+        with patch('src.notifications.getParam', return_value=MagicMock()):
+            for to in ["+15555555551", "+15555555552", "+15555555553"]:
+                await notify(event, NotificationSMS(to=to, preset="alert"), {"sms_module": sms_module}, media=media)
+
+        assert sms_module.do_command.call_count == 3
+        assert media.encode_count == 1
+        payloads = [c[0][0]["media_base64"] for c in sms_module.do_command.call_args_list]
+        assert payloads[0] == payloads[1] == payloads[2]
@@ -54,18 +54,10 @@ class TestMissingModules:
         event.trigger_sequence_count = 1
         event.state = "setup"
         
-        # Create a stop event to terminate the event check loop
-        stop_event = asyncio.Event()
-        
-        # Run the event check loop for a short time
-        task = asyncio.create_task(manager.event_check_loop(event, stop_event))
-        
-        # Allow the loop to run briefly
-        await asyncio.sleep(1)
-        
-        # Stop the event loop
-        stop_event.set()
-        await task
+        # Set the event up and run one step of it
+        entry = manager._setup_event(event, asyncio.Event())
+        assert entry is not None
+        await manager._event_tick(entry)
         
         # Check that the event was processed
         assert event.state != "setup", "Event should have been processed"
@@ -0,0 +1,65 @@
+import asyncio
+import time
+import pytest
+import sys
+from pathlib import Path
+
+# Add the source directory to the path so we can import the modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.modeState import ModeState
+
+
+class TestModeState:
+    def test_set_notifies_listeners(self):
+        changes = []
+        state = ModeState("inactive")
+        state.subscribe(lambda old, new: changes.append((old, new)))
+        state.set("active")
+        state.set("active")
+        assert state.mode == "active"
+        assert changes == [("inactive", "active")]
+
+    def test_override_and_cancel(self):
+        state = ModeState("inactive")
+        state.set_override("active", time.time() + 3600)
+        state.set_override("away", time.time() + 3600)
+        assert state.mode == "away"
+        assert state.overridden == "inactive"
+
+        state.cancel_override()
+        assert state.mode == "inactive"
+        assert state.override_until is None
+
+    @pytest.mark.asyncio
+    async def test_override_expires_on_timer(self):
+        changes = []
+        state = ModeState("inactive")
+        state.subscribe(lambda old, new: changes.append((old, new)))
+        state.set_override("active", time.time() + 0.02)
+        assert state.mode == "active"
+
+        await asyncio.wait_for(state.wait_for_change(), 1)
+        assert state.mode == "inactive"
+        assert state.override_until is None
+        assert changes == [("inactive", "active"), ("active", "inactive")]
+
+    @pytest.mark.asyncio
+    async def test_override_set_before_loop_is_armed_on_start(self):
+        state = ModeState("inactive")
+        # as if set by reconfigure before the event loop was running
+        state.override_until = time.time() + 0.01
+        state.overridden = "inactive"
+        state.mode = "active"
+        state.start()
+        await asyncio.wait_for(state.wait_for_change(), 1)
+        assert state.mode == "inactive"
+
+    @pytest.mark.asyncio
+    async def test_wait_for_change(self):
+        state = ModeState("inactive")
+        waiter = asyncio.ensure_future(state.wait_for_change())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        state.set("active")
+        await asyncio.wait_for(waiter, 1)
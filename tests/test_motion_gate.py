@@ -0,0 +1,148 @@
+import pytest
+import sys
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import MagicMock, AsyncMock, patch
+from PIL import Image
+
+# Add the source directory to the path so we can import the modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from viam.media.video import ViamImage, CameraMimeType
+from src.motionGate import MotionGate, downsample
+from src.rules import RuleDetector, eval_rule
+
+
+def _jpeg(color, size=(320, 240)) -> ViamImage:
+    buffered = BytesIO()
+    Image.new('RGB', size, color=color).save(buffered, format="JPEG")
+    return ViamImage(buffered.getvalue(), CameraMimeType.JPEG)
+
+
+class TestMotionGate:
+    def test_downsample(self):
+        frame = downsample(_jpeg('red'), 32)
+        assert frame.shape == (32, 32)
+
+    def test_first_frame_is_evaluated(self):
+        gate = MotionGate(threshold=5, recheck_secs=30)
+        assert gate.should_evaluate(_jpeg('red'))
+        assert gate.evaluated == 1
+
+    def test_static_scene_is_skipped(self):
+        gate = MotionGate(threshold=5, recheck_secs=30)
+        gate.should_evaluate(_jpeg('red'))
+        gate.record({"triggered": False})
+        assert not gate.should_evaluate(_jpeg('red'))
+        assert gate.stats()["motion_skipped"] == 1
+        assert gate.stats()["motion_evaluated"] == 1
+
+    def test_changed_scene_is_evaluated(self):
+        gate = MotionGate(threshold=5, recheck_secs=30)
+        gate.should_evaluate(_jpeg('black'))
+        gate.record({"triggered": False})
+        assert gate.should_evaluate(_jpeg('white'))
+        assert gate.last_difference > 5
+
+    def test_not_skipped_without_recorded_evaluation(self):
+        gate = MotionGate(threshold=5, recheck_secs=30)
+        gate.should_evaluate(_jpeg('red'))
+        # the evaluation failed, so nothing was recorded to reuse
+        assert gate.should_evaluate(_jpeg('red'))
+        assert gate.skipped == 0
+
+    def test_forced_recheck(self):
+        gate = MotionGate(threshold=5, recheck_secs=0)
+        gate.should_evaluate(_jpeg('red'))
+        gate.record({"triggered": False})
+        assert gate.should_evaluate(_jpeg('red'))
+        assert gate.skipped == 0
+
+
+@pytest.mark.asyncio
+class TestMotionGatedRules:
+    async def test_detector_skipped_on_static_scene(self):
+        rule = RuleDetector(camera="cam1", detector="person_detector", class_regex="person",
+                            confidence_pct=0.5, motion_threshold=5)
+
+        mock_detection = MagicMock()
+        mock_detection.class_name = "person"
+        mock_detection.confidence = 0.9
+
+        mock_camera = AsyncMock()
+        mock_camera.get_image.return_value = _jpeg('red')
+        mock_detector = AsyncMock()
+        mock_detector.get_detections.return_value = [mock_detection]
+
+        with patch('src.rules.getParam', return_value=MagicMock()):
+            with patch('src.rules._get_vision_service', return_value=mock_detector):
+                with patch('src.rules._get_camera_component', return_value=mock_camera):
+                    first = await eval_rule(rule, {"_deps": {}})
+                    second = await eval_rule(rule, {"_deps": {}})
+
+        assert first["triggered"]
+        # previous result is reused while the scene is unchanged
+        assert second["triggered"]
+        assert second["value"] == "person"
+        mock_detector.get_detections.assert_called_once()
+        assert mock_camera.get_image.call_count == 2
+
+    async def test_skipped_result_shows_current_frame(self):
+        rule = RuleDetector(camera="cam1", detector="person_detector", class_regex="person",
+                            confidence_pct=0.5, motion_threshold=5)
+
+        mock_detection = MagicMock()
+        mock_detection.class_name = "person"
+        mock_detection.confidence = 0.9
+
+        first_frame, second_frame = _jpeg('red'), _jpeg('red')
+        mock_camera = AsyncMock()
+        mock_camera.get_image.side_effect = [first_frame, second_frame]
+        mock_detector = AsyncMock()
+        mock_detector.get_detections.return_value = [mock_detection]
+
+        with patch('src.rules.getParam', return_value=MagicMock()):
+            with patch('src.rules._get_vision_service', return_value=mock_detector):
+                with patch('src.rules._get_camera_component', return_value=mock_camera):
+                    await eval_rule(rule, {"_deps": {}})
+                    second = await eval_rule(rule, {"_deps": {}})
+
+        # the gate does not hold on to the evaluated frame
+        assert "image" not in rule.__dict__['_motion_gate'].last_response
+        assert second["triggered"]
+        assert second["image"].image is second_frame
+
+    async def test_no_gate_without_threshold(self):
+        rule = RuleDetector(camera="cam1", detector="person_detector", class_regex="person", confidence_pct=0.5)
+
+        mock_camera = AsyncMock()
+        mock_camera.get_image.return_value = _jpeg('red')
+        mock_detector = AsyncMock()
+        mock_detector.get_detections.return_value = []
+
+        with patch('src.rules.getParam', return_value=MagicMock()):
+            with patch('src.rules._get_vision_service', return_value=mock_detector):
+                with patch('src.rules._get_camera_component', return_value=mock_camera):
+                    await eval_rule(rule, {"_deps": {}})
+                    await eval_rule(rule, {"_deps": {}})
+
+        assert mock_detector.get_detections.call_count == 2
+        assert '_motion_gate' not in rule.__dict__
+
+    async def test_failing_detector_is_not_skipped(self):
+        rule = RuleDetector(camera="cam1", detector="person_detector", class_regex="person",
+                            confidence_pct=0.5, motion_threshold=5, fail_eval=True)
+
+        mock_camera = AsyncMock()
+        mock_camera.get_image.return_value = _jpeg('red')
+        mock_detector = AsyncMock()
+        mock_detector.get_detections.side_effect = RuntimeError("detector down")
+
+        with patch('src.rules.getParam', return_value=MagicMock()):
+            with patch('src.rules._get_vision_service', return_value=mock_detector):
+                with patch('src.rules._get_camera_component', return_value=mock_camera):
+                    results = [await eval_rule(rule, {"_deps": {}}) for _ in range(3)]
+
+        # every tick retries the detector and falls back to fail_eval
+        assert [r["triggered"] for r in results] == [True, True, True]
+        assert mock_detector.get_detections.call_count == 3
@@ -15,6 +15,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 from src.notifications import notify, check_sms_response
 from src.notificationClass import NotificationEmail, NotificationSMS, NotificationWebhookGET, NotificationPush
 from src.events import Event
+from src.resourceGuard import ResourceGuards
 
 @pytest.fixture
 def mock_image():
@@ -388,8 +389,25 @@ class TestNotify:
             # Call notify
             await notify(mock_event, notification, mock_resources)
             
-            # Verify error was logged
-            mock_logger.error.assert_called_once()
+            # Verify the dropped notification was logged
+            mock_logger.warning.assert_called_once()
+
+    async def test_notify_is_not_stopped_by_circuit_breaker(self, mock_event, mock_resources):
+        """Failing notification calls never open a breaker that would drop later alerts"""
+        notification = NotificationSMS(to="+1234567890", preset="Alert")
+        guards = ResourceGuards()
+        guards.configure({}, breaker_failures=1)
+        mock_resources["_guards"] = guards
+        mock_resources["sms_module"].do_command.side_effect = Exception("sms down")
+
+        mock_logger = MagicMock()
+        with patch('src.notifications.getParam', return_value=mock_logger):
+            for _ in range(3):
+                await notify(mock_event, notification, mock_resources)
+
+        assert mock_resources["sms_module"].do_command.call_count == 3
+        assert mock_logger.warning.call_count == 3
+        assert guards.get("sms").breaker.state == "closed"
 
     async def test_notify_missing_push_module(self, mock_event, mock_resources):
         """Test handling when push module is missing."""
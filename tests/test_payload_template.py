@@ -0,0 +1,72 @@
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+# Add the source directory to the path so we can import the modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from viam.components.generic import Generic as GenericComponent
+
+from src.payloadTemplate import PayloadTemplate, payload_template
+from src.resourceUtils import call_method
+
+
+class _Event():
+    name = "front door"
+    triggered_label = "Person"
+    triggered_camera = "cam1"
+
+
+class TestPayloadTemplate:
+    def test_payload_without_slots_is_parsed_once(self):
+        template = PayloadTemplate("{'action': 'toggle_on', 'level': [1, 2]}")
+        first = template.render(_Event())
+        assert first == {"action": "toggle_on", "level": [1, 2]}
+        assert template.render(None) is first
+        assert template.key(_Event()) == template.payload
+
+    def test_fills_slots_in_keys_and_values(self):
+        template = PayloadTemplate("{'relabel': {'<<triggered_label>>': 'seen by <<triggered_camera>> for <<event_name>>'}, 'n': 3}")
+        assert template.render(_Event()) == {"relabel": {"Person": "seen by cam1 for front door"}, "n": 3}
+
+    def test_values_are_not_quote_swapped(self):
+        event = _Event()
+        event.triggered_label = "O'Neil"
+        assert PayloadTemplate("{'label': '<<triggered_label>>'}").render(event) == {"label": "O'Neil"}
+
+    def test_without_event_slots_are_left_as_written(self):
+        template = PayloadTemplate("{'label': '<<triggered_label>>'}")
+        assert template.render(None) == {"label": "<<triggered_label>>"}
+        assert template.key(None) == template.payload
+
+    def test_slot_outside_string(self):
+        event = _Event()
+        event.triggered_label = "5"
+        assert PayloadTemplate("{'count': <<triggered_label>>}").render(event) == {"count": 5}
+
+    def test_key_depends_on_slot_values(self):
+        template = PayloadTemplate("{'label': '<<triggered_label>>'}")
+        other = _Event()
+        other.triggered_label = "Dog"
+        assert template.key(_Event()) != template.key(other)
+        assert template.key(_Event()) == template.key(_Event())
+
+    def test_invalid_payload_raises(self):
+        with pytest.raises(ValueError):
+            PayloadTemplate("{not json")
+
+    def test_templates_are_shared(self):
+        assert payload_template("{'a': 1}") is payload_template("{'a': 1}")
+
+
+@pytest.mark.asyncio
+async def test_call_method_renders_template():
+    resource = MagicMock()
+    resource.do_command = AsyncMock(return_value={"ok": True})
+    resources = {
+        "resources": {"plug": {"type": "component", "subtype": "generic"}},
+        "_deps": {GenericComponent.get_resource_name("plug"): resource}
+    }
+    await call_method(resources, "plug", "do_command", "{'label': '<<triggered_label>>', 'event': '<<event_name>>'}", _Event())
+    resource.do_command.assert_called_once_with({"label": "Person", "event": "front door"})
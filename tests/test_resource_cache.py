@@ -0,0 +1,261 @@
+import pytest
+import sys
+import asyncio
+from pathlib import Path
+from unittest.mock import MagicMock, AsyncMock, patch
+
+# Add the source directory to the path so we can import the modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from viam.media.video import ViamImage, CameraMimeType
+from src.resourceCache import SharedResultCache, ContentHashLRU, extra_key, frame_digest
+from src.resourceGuard import ResourceTimeout
+from src.rules import RuleDetector, eval_rule
+
+
+class TestExtraKey:
+    def test_empty_extra(self):
+        assert extra_key(None) == ""
+        assert extra_key({}) == ""
+
+    def test_key_order_does_not_matter(self):
+        assert extra_key({"a": 1, "b": 2}) == extra_key({"b": 2, "a": 1})
+
+
+@pytest.mark.asyncio
+class TestSharedResultCache:
+    async def test_reuses_fresh_result(self):
+        cache = SharedResultCache("frames", 1000)
+        fetch = AsyncMock(return_value="frame")
+
+        assert await cache.get("cam1", fetch) == "frame"
+        assert await cache.get("cam1", fetch) == "frame"
+
+        fetch.assert_called_once()
+        assert cache.stats() == {"hits": 1, "misses": 1, "max_age_ms": 1000}
+
+    async def test_expired_result_is_fetched_again(self):
+        cache = SharedResultCache("frames", 0)
+        fetch = AsyncMock(return_value="frame")
+
+        await cache.get("cam1", fetch)
+        await cache.get("cam1", fetch)
+
+        assert fetch.call_count == 2
+        assert cache.misses == 2
+
+    async def test_in_flight_call_is_shared(self):
+        cache = SharedResultCache("frames", 0)
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(*[cache.get("cam1", fetch) for _ in range(5)])
+
+        assert results == [1, 1, 1, 1, 1]
+        assert calls == 1
+        assert cache.hits == 4
+
+    async def test_failures_are_not_cached(self):
+        cache = SharedResultCache("frames", 1000)
+        fetch = AsyncMock(side_effect=[Exception("camera down"), "frame"])
+
+        with pytest.raises(Exception):
+            await cache.get("cam1", fetch)
+        assert await cache.get("cam1", fetch) == "frame"
+        assert fetch.call_count == 2
+
+    async def test_keys_are_independent(self):
+        cache = SharedResultCache("frames", 1000)
+        fetch = AsyncMock(return_value="frame")
+
+        await cache.get(("cam1", ""), fetch)
+        await cache.get(("cam2", ""), fetch)
+
+        assert fetch.call_count == 2
+
+    async def test_each_caller_waits_within_its_own_timeout(self):
+        cache = SharedResultCache("frames", 1000)
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "frame"
+
+        # started by a caller without a timeout
+        owner = asyncio.ensure_future(cache.get("cam1", fetch))
+        await asyncio.sleep(0)
+        with pytest.raises(ResourceTimeout) as exc_info:
+            await cache.get("cam1", fetch, timeout_ms=10, name="cam1")
+        assert "cam1" in str(exc_info.value)
+
+        # the shared call carries on for the caller that is still waiting
+        release.set()
+        assert await owner == "frame"
+
+
+class TestContentHashLRU:
+    def test_hit_on_identical_digest(self):
+        lru = ContentHashLRU("frame_hash", 2)
+        digest = frame_digest(b"frame-bytes")
+        assert lru.get("cam1", "detector", digest) is None
+        lru.put("cam1", "detector", digest, ["person"])
+        assert lru.get("cam1", "detector", frame_digest(b"frame-bytes")) == ["person"]
+        assert lru.get("cam2", "detector", digest) is None
+        assert lru.stats() == {"hits": 1, "misses": 2, "size_per_camera": 2}
+
+    def test_evicts_least_recently_used(self):
+        lru = ContentHashLRU("frame_hash", 2)
+        lru.put("cam1", "detector", b"a", 1)
+        lru.put("cam1", "detector", b"b", 2)
+        lru.get("cam1", "detector", b"a")
+        lru.put("cam1", "detector", b"c", 3)
+        assert lru.get("cam1", "detector", b"b") is None
+        assert lru.get("cam1", "detector", b"a") == 1
+
+    def test_disabled(self):
+        lru = ContentHashLRU("frame_hash", 0)
+        lru.put("cam1", "detector", b"a", 1)
+        assert lru.get("cam1", "detector", b"a") is None
+
+
+@pytest.mark.asyncio
+class TestRulesShareFrames:
+    async def test_detector_rules_share_one_image(self):
+        """Two detection rules on the same camera should only fetch one frame"""
+        rule_a = RuleDetector(camera="cam1", detector="person_detector", class_regex="person", confidence_pct=0.5)
+        rule_b = RuleDetector(camera="cam1", detector="car_detector", class_regex="car", confidence_pct=0.5)
+
+        mock_camera = AsyncMock()
+        mock_camera.get_image.return_value = MagicMock()
+        mock_detector = AsyncMock()
+        mock_detector.get_detections.return_value = []
+
+        resources = {"_deps": {}, "_frame_cache": SharedResultCache("frames", 1000)}
+
+        with patch('src.rules.getParam', return_value=MagicMock()):
+            with patch('src.rules._get_vision_service', return_value=mock_detector):
+                with patch('src.rules._get_camera_component', return_value=mock_camera):
+                    await eval_rule(rule_a, resources)
+                    await eval_rule(rule_b, resources)
+
+        mock_camera.get_image.assert_called_once()
+        assert mock_detector.get_detections.call_count == 2
+
+    async def test_detector_rules_share_one_inference(self):
+        """Rules with different thresholds on the same camera and detector should share one get_detections() call"""
+        rule_a = RuleDetector(camera="cam1", detector="person_detector", class_regex="person", confidence_pct=0.9)
+        rule_b = RuleDetector(camera="cam1", detector="person_detector", class_regex="person", confidence_pct=0.5)
+
+        mock_detection = MagicMock()
+        mock_detection.class_name = "person"
+        mock_detection.confidence = 0.7
+
+        mock_camera = AsyncMock()
+        mock_camera.get_image.return_value = MagicMock()
+        mock_detector = AsyncMock()
+        mock_detector.get_detections.return_value = [mock_detection]
+
+        inference_cache = SharedResultCache("inference", 1000)
+        resources = {
+            "_deps": {},
+            "_frame_cache": SharedResultCache("frames", 1000),
+            "_inference_cache": inference_cache
+        }
+
+        with patch('src.rules.getParam', return_value=MagicMock()):
+            with patch('src.rules._get_vision_service', return_value=mock_detector):
+                with patch('src.rules._get_camera_component', return_value=mock_camera):
+                    with patch('src.imageHandle.viam_to_pil_image', return_value=MagicMock()):
+                        result_a = await eval_rule(rule_a, resources)
+                        result_b = await eval_rule(rule_b, resources)
+
+        assert result_a["triggered"] == False
+        assert result_b["triggered"] == True
+        mock_detector.get_detections.assert_called_once()
+        assert inference_cache.hits == 1
+
+    async def test_different_detectors_do_not_share(self):
+        rule_a = RuleDetector(camera="cam1", detector="person_detector", class_regex="person", confidence_pct=0.5)
+        rule_b = RuleDetector(camera="cam1", detector="car_detector", class_regex="car", confidence_pct=0.5)
+
+        mock_camera = AsyncMock()
+        mock_camera.get_image.return_value = MagicMock()
+        mock_detector = AsyncMock()
+        mock_detector.get_detections.return_value = []
+
+        resources = {
+            "_deps": {},
+            "_frame_cache": SharedResultCache("frames", 1000),
+            "_inference_cache": SharedResultCache("inference", 1000)
+        }
+
+        with patch('src.rules.getParam', return_value=MagicMock()):
+            with patch('src.rules._get_vision_service', return_value=mock_detector):
+                with patch('src.rules._get_camera_component', return_value=mock_camera):
+                    await eval_rule(rule_a, resources)
+                    await eval_rule(rule_b, resources)
+
+        mock_camera.get_image.assert_called_once()
+        assert mock_detector.get_detections.call_count == 2
+
+    async def test_identical_frames_reuse_detections(self):
+        """Byte-identical frames from the camera should not be sent to the detector twice"""
+        rule = RuleDetector(camera="cam1", detector="person_detector", class_regex="person", confidence_pct=0.5)
+
+        mock_camera = AsyncMock()
+        mock_camera.get_image.side_effect = [
+            ViamImage(b"same", CameraMimeType.JPEG),
+            ViamImage(b"same", CameraMimeType.JPEG),
+            ViamImage(b"different", CameraMimeType.JPEG)
+        ]
+        mock_detector = AsyncMock()
+        mock_detector.get_detections.return_value = []
+
+        frame_results = ContentHashLRU("frame_hash", 8)
+        resources = {"_deps": {}, "_frame_results": frame_results}
+
+        with patch('src.rules.getParam', return_value=MagicMock()):
+            with patch('src.rules._get_vision_service', return_value=mock_detector):
+                with patch('src.rules._get_camera_component', return_value=mock_camera):
+                    for _ in range(3):
+                        await eval_rule(rule, resources)
+
+        assert mock_camera.get_image.call_count == 3
+        assert mock_detector.get_detections.call_count == 2
+        assert frame_results.hits == 1
+
+    async def test_rule_joining_hung_frame_fetch_times_out(self):
+        """A rule joining another rule's frame fetch stops waiting after its own timeout_ms"""
+        patient = RuleDetector(camera="cam1", detector="person_detector", class_regex="person", confidence_pct=0.5)
+        impatient = RuleDetector(camera="cam1", detector="car_detector", class_regex="car", confidence_pct=0.5,
+                                 timeout_ms=20, fail_eval=True)
+        release = asyncio.Event()
+
+        async def get_image(extra=None):
+            await release.wait()
+            return MagicMock()
+
+        mock_camera = AsyncMock()
+        mock_camera.get_image.side_effect = get_image
+        mock_detector = AsyncMock()
+        mock_detector.get_detections.return_value = []
+
+        resources = {"_deps": {}, "_frame_cache": SharedResultCache("frames", 1000)}
+
+        with patch('src.rules.getParam', return_value=MagicMock()):
+            with patch('src.rules._get_vision_service', return_value=mock_detector):
+                with patch('src.rules._get_camera_component', return_value=mock_camera):
+                    first = asyncio.ensure_future(eval_rule(patient, resources))
+                    await asyncio.sleep(0)
+                    result = await asyncio.wait_for(eval_rule(impatient, resources), 1)
+                    release.set()
+                    await first
+
+        assert result["triggered"] is True
+        assert result["value"] is None
+        mock_camera.get_image.assert_called_once()
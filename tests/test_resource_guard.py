@@ -0,0 +1,495 @@
+import asyncio
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Add the source directory to the path so we can import the modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.resourceGuard import CircuitBreaker, CircuitOpen, LoadShedder, ResourceGuard, ResourceGuards, ResourceTimeout, check_breaker, current_priority, guarded
+
+
+@pytest.mark.asyncio
+class TestResourceGuard:
+    async def test_concurrency_limit(self):
+        guard = ResourceGuard("vision", max_concurrent=2)
+        running = []
+        peak = []
+
+        async def call():
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.pop()
+            return True
+
+        results = await asyncio.gather(*[guard.run(call) for _ in range(6)])
+
+        assert all(results)
+        assert max(peak) == 2
+        stats = guard.stats()
+        assert stats["calls"] == 6
+        assert stats["max_wait_ms"] > 0
+        assert stats["active"] == 0 and stats["queued"] == 0
+
+    async def test_unlimited(self):
+        guard = ResourceGuard("vision")
+        peak = []
+        running = []
+
+        async def call():
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.pop()
+
+        await asyncio.gather(*[guard.run(call) for _ in range(4)])
+        assert max(peak) == 4
+        assert guard.stats()["max_wait_ms"] == 0
+
+    async def test_single_flight(self):
+        guard = ResourceGuard("camera")
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "frame"
+
+        results = await asyncio.gather(*[guard.run(call, key="get_image") for _ in range(3)])
+
+        assert results == ["frame"] * 3
+        assert len(calls) == 1
+        assert guard.stats()["merged"] == 2
+
+        # once finished, the next call is made again
+        await guard.run(call, key="get_image")
+        assert len(calls) == 2
+
+    async def test_calls_without_key_are_not_merged(self):
+        guard = ResourceGuard("plug")
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+
+        await asyncio.gather(guard.run(call), guard.run(call))
+        assert len(calls) == 2
+
+    async def test_failure_reaches_every_caller(self):
+        guard = ResourceGuard("camera")
+
+        async def call():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("camera down")
+
+        results = await asyncio.gather(guard.run(call, key="k"), guard.run(call, key="k"), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+class TestResourceGuards:
+    async def test_configure(self):
+        guards = ResourceGuards()
+        guards.configure({"vision1": {"type": "service", "subtype": "vision", "max_concurrent": 3.0},
+                          "cam1": {"type": "component", "subtype": "camera"}})
+        assert guards.get("vision1").max_concurrent == 3
+        assert guards.get("cam1").max_concurrent == 0
+        assert guards.get("unknown").max_concurrent == 0
+
+    async def test_guarded_without_guards(self):
+        async def call():
+            return 1
+        assert await guarded({}, "cam1", call) == 1
+
+    async def test_stats_only_for_used_resources(self):
+        guards = ResourceGuards()
+        guards.configure({"vision1": {"max_concurrent": 1}, "cam1": {}})
+
+        async def call():
+            return 1
+
+        await guarded({"_guards": guards}, "vision1", call)
+        assert list(guards.stats().keys()) == ["vision1"]
+
+
+@pytest.mark.asyncio
+class TestPriority:
+    async def test_higher_priority_is_served_first(self):
+        guard = ResourceGuard("vision", max_concurrent=1)
+        order = []
+        release = asyncio.Event()
+
+        async def blocking():
+            await release.wait()
+
+        async def call(name):
+            order.append(name)
+
+        async def run_at(priority, name):
+            current_priority.set(priority)
+            await guard.run(lambda: call(name))
+
+        holder = asyncio.ensure_future(guard.run(blocking))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(run_at(p, n)) for p, n in [(0, "low"), (5, "high"), (0, "low2")]]
+        await asyncio.sleep(0)
+        assert guard.queued == 3
+
+        release.set()
+        await asyncio.gather(holder, *waiters)
+        assert order == ["high", "low", "low2"]
+        assert guard.stats()["active"] == 0
+
+    async def test_cancelled_waiter_does_not_hold_a_slot(self):
+        guard = ResourceGuard("vision", max_concurrent=1)
+        release = asyncio.Event()
+
+        async def blocking():
+            await release.wait()
+
+        async def quick():
+            return "done"
+
+        holder = asyncio.ensure_future(guard.run(blocking))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(guard.run(quick))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        await holder
+
+        assert guard.queued == 0
+        assert await guard.run(quick) == "done"
+
+
+class TestLoadShedder:
+    def _shedder(self, overloaded: bool) -> LoadShedder:
+        guards = ResourceGuards()
+        guard = guards.get("vision")
+        guard.wait_ewma_ms = 500 if overloaded else 0
+        if overloaded:
+            guard._waiters.append((0, 0, None))
+        shedder = LoadShedder(guards)
+        shedder.latency_budget_ms = 100
+        shedder.protected_priority = 5
+        shedder.interval_secs = 0
+        return shedder
+
+    def test_disabled_without_budget(self):
+        shedder = self._shedder(True)
+        shedder.latency_budget_ms = 0
+        assert shedder.rate_factor(0) == 1
+
+    def test_protected_priority_is_never_slowed(self):
+        assert self._shedder(True).rate_factor(5) == 1
+
+    def test_sheds_and_recovers(self):
+        shedder = self._shedder(True)
+        assert shedder.rate_factor(0) == 0.5
+        assert shedder.rate_factor(0) == 0.25
+        for _ in range(5):
+            shedder.rate_factor(0)
+        assert shedder.factor == shedder.min_factor
+
+        shedder.guards.get("vision")._waiters.clear()
+        shedder.rate_factor(0)
+        shedder.rate_factor(0)
+        assert shedder.factor == 0.5
+        shedder.rate_factor(0)
+        assert shedder.factor == 1
+
+    def test_slow_calls_without_queue_shed(self):
+        # no max_concurrent, so nothing queues; the calls themselves are slow
+        shedder = self._shedder(False)
+        guard = shedder.guards.get("vision")
+        guard.call_ewma_ms = 500
+        guard.last_call_at = time.monotonic()
+        assert shedder.rate_factor(0) == 0.5
+
+        # latency measured long ago says nothing about the current load
+        guard.last_call_at = time.monotonic() - 60
+        assert shedder.rate_factor(0) == 1
+
+
+@pytest.mark.asyncio
+class TestCallLatency:
+    async def test_call_latency_is_tracked(self):
+        guard = ResourceGuard("vision")
+
+        async def slow():
+            await asyncio.sleep(0.02)
+
+        await guard.run(slow)
+        assert guard.call_ewma_ms > 0
+        assert guard.stats()["recent_call_ms"] > 0
+
+    async def test_timed_out_calls_count(self):
+        guard = ResourceGuard("vision")
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        with pytest.raises(ResourceTimeout):
+            await guard.run(hang, timeout_ms=20)
+        assert guard.call_ewma_ms >= 20 * guard.wait_alpha
+
+
+@pytest.mark.asyncio
+class TestTimeouts:
+    async def test_timeout_is_counted(self):
+        guard = ResourceGuard("camera")
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        with pytest.raises(ResourceTimeout) as exc_info:
+            await guard.run(hang, timeout_ms=10)
+        assert "camera" in str(exc_info.value)
+        assert guard.stats()["timeouts"] == 1
+
+    async def test_queue_time_counts_towards_timeout(self):
+        guard = ResourceGuard("vision", max_concurrent=1)
+        release = asyncio.Event()
+
+        async def blocking():
+            await release.wait()
+
+        async def quick():
+            return 1
+
+        holder = asyncio.ensure_future(guard.run(blocking))
+        await asyncio.sleep(0)
+        with pytest.raises(ResourceTimeout):
+            await guard.run(quick, timeout_ms=10)
+        release.set()
+        await holder
+        assert guard.queued == 0
+
+    async def test_default_timeout_from_resources(self):
+        guards = ResourceGuards()
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        with pytest.raises(ResourceTimeout):
+            await guarded({"_guards": guards, "_default_timeout_ms": 10}, "camera", hang)
+        # an explicit 0 disables the default
+        async def quick():
+            return 1
+        assert await guarded({"_guards": guards, "_default_timeout_ms": 10}, "camera", quick, timeout_ms=0) == 1
+        assert guards.stats()["camera"]["timeouts"] == 1
+
+    async def test_hung_shared_call_does_not_wedge_the_resource(self):
+        guard = ResourceGuard("camera", max_concurrent=1)
+        hung = True
+        calls = []
+
+        async def get_image():
+            calls.append(1)
+            if hung:
+                await asyncio.sleep(10)
+            return "frame"
+
+        for _ in range(3):
+            with pytest.raises(ResourceTimeout):
+                await guard.run(get_image, key="get_image", timeout_ms=10)
+        # each timed-out call is cancelled, so every tick tries the camera again
+        assert len(calls) == 3
+        await asyncio.sleep(0)
+        assert guard.active == 0
+
+        hung = False
+        assert await guard.run(get_image, key="get_image", timeout_ms=10) == "frame"
+        assert guard.stats()["timeouts"] == 3
+
+    async def test_timed_out_call_continues_for_other_waiters(self):
+        guard = ResourceGuard("camera")
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "frame"
+
+        owner = asyncio.ensure_future(guard.run(slow, key="get_image"))
+        await asyncio.sleep(0)
+        with pytest.raises(ResourceTimeout):
+            await guard.run(slow, key="get_image", timeout_ms=10)
+        release.set()
+        assert await owner == "frame"
+
+    async def test_timeout_without_guards(self):
+        async def hang():
+            await asyncio.sleep(10)
+
+        with pytest.raises(ResourceTimeout):
+            await guarded({}, "camera", hang, timeout_ms=10)
+
+
+@pytest.mark.asyncio
+class TestCircuitBreaker:
+    def _guard(self, failures=2, cooloff=30) -> ResourceGuard:
+        return ResourceGuard("camera", 0, CircuitBreaker("camera", failures, cooloff))
+
+    async def _fail(self):
+        raise RuntimeError("camera down")
+
+    async def _ok(self):
+        return "frame"
+
+    async def test_opens_after_consecutive_failures(self):
+        guard = self._guard()
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await guard.run(self._fail)
+        assert guard.breaker.state == "open"
+
+        calls = []
+        async def call():
+            calls.append(1)
+        with pytest.raises(CircuitOpen):
+            await guard.run(call)
+        assert calls == []
+        assert guard.stats()["breaker"]["rejected"] == 1
+        assert guard.stats()["breaker"]["opened"] == 1
+
+    async def test_success_resets_count(self):
+        guard = self._guard()
+        with pytest.raises(RuntimeError):
+            await guard.run(self._fail)
+        await guard.run(self._ok)
+        with pytest.raises(RuntimeError):
+            await guard.run(self._fail)
+        assert guard.breaker.state == "closed"
+
+    async def test_half_open_probe(self):
+        guard = self._guard(failures=1, cooloff=0)
+        with pytest.raises(RuntimeError):
+            await guard.run(self._fail)
+        assert guard.breaker.state == "open"
+
+        # after the cool-off a failing probe re-opens the breaker
+        with pytest.raises(RuntimeError):
+            await guard.run(self._fail)
+        assert guard.breaker.state == "open"
+
+        # and a successful one closes it
+        assert await guard.run(self._ok) == "frame"
+        assert guard.breaker.state == "closed"
+
+    async def test_only_one_probe_at_a_time(self):
+        guard = self._guard(failures=1, cooloff=0)
+        with pytest.raises(RuntimeError):
+            await guard.run(self._fail)
+
+        release = asyncio.Event()
+        async def slow():
+            await release.wait()
+            return "frame"
+
+        probe = asyncio.ensure_future(guard.run(slow))
+        await asyncio.sleep(0)
+        assert guard.breaker.state == "half_open"
+        with pytest.raises(CircuitOpen):
+            await guard.run(self._ok)
+        release.set()
+        assert await probe == "frame"
+        assert guard.breaker.state == "closed"
+
+    async def test_timeouts_count_as_failures(self):
+        guard = self._guard(failures=1)
+        async def hang():
+            await asyncio.sleep(10)
+        with pytest.raises(ResourceTimeout):
+            await guard.run(hang, timeout_ms=10)
+        assert guard.breaker.state == "open"
+
+    async def test_check_breaker(self):
+        guards = ResourceGuards()
+        guards.configure({"cam1": {"breaker_failures": 1}})
+        resources = {"_guards": guards}
+        check_breaker(resources, "cam1")
+        with pytest.raises(RuntimeError):
+            await guarded(resources, "cam1", self._fail)
+        with pytest.raises(CircuitOpen):
+            check_breaker(resources, "cam1")
+        # no guards, nothing to check
+        check_breaker({}, "cam1")
+
+    async def test_disabled_breaker(self):
+        guard = self._guard(failures=0)
+        for _ in range(10):
+            with pytest.raises(RuntimeError):
+                await guard.run(self._fail)
+        assert guard.breaker.state == "closed"
+
+    async def test_merged_failure_counts_once(self):
+        guard = self._guard(failures=2)
+        async def fail_later():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("camera down")
+
+        results = await asyncio.gather(*[guard.run(fail_later, key="get_image") for _ in range(5)], return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert guard.stats()["merged"] == 4
+        # one real call failed, not five
+        assert guard.breaker.consecutive_failures == 1
+        assert guard.breaker.state == "closed"
+
+    async def test_merged_callers_timing_out_do_not_count(self):
+        guard = self._guard(failures=1)
+        release = asyncio.Event()
+        async def slow():
+            await release.wait()
+            return "frame"
+
+        owner = asyncio.ensure_future(guard.run(slow, key="get_image"))
+        await asyncio.sleep(0)
+        with pytest.raises(ResourceTimeout):
+            await guard.run(slow, key="get_image", timeout_ms=10)
+        assert guard.breaker.state == "closed"
+        release.set()
+        assert await owner == "frame"
+
+    async def test_exempt_calls_bypass_breaker(self):
+        guard = self._guard(failures=1)
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                await guard.run(self._fail, breaker=False)
+        assert guard.breaker.state == "closed"
+
+        with pytest.raises(RuntimeError):
+            await guard.run(self._fail)
+        # an open breaker still lets exempt calls through
+        assert await guard.run(self._ok, breaker=False) == "frame"
+        assert guard.breaker.state == "open"
+
+    async def test_timed_out_keyed_calls_open_breaker(self):
+        guard = self._guard(failures=3)
+        async def hang():
+            await asyncio.sleep(10)
+
+        for _ in range(3):
+            with pytest.raises(ResourceTimeout):
+                await guard.run(hang, key="get_image", timeout_ms=10)
+            # let the cancelled call record its outcome
+            await asyncio.sleep(0)
+        assert guard.breaker.state == "open"
+        with pytest.raises(CircuitOpen):
+            await guard.run(self._ok, key="get_image")
+
+    async def test_cancelled_keyed_call_is_not_a_failure(self):
+        guard = self._guard(failures=1)
+        async def hang():
+            await asyncio.sleep(10)
+
+        caller = asyncio.ensure_future(guard.run(hang, key="get_image"))
+        await asyncio.sleep(0)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0)
+        assert guard.breaker.state == "closed"
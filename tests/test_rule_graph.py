@@ -0,0 +1,109 @@
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the source directory to the path so we can import the modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.events import Event
+from src.ruleGraph import RuleGraph, rule_key
+from src.rules import RuleCall, RuleTime
+
+
+def _call_rule(**kwargs) -> dict:
+    rule = {"type": "call", "resource": "stuff_sensor", "method": "get_readings",
+            "result_path": "stuff", "result_operator": "eq", "result_value": 1}
+    rule.update(kwargs)
+    return rule
+
+
+def _events() -> list:
+    return [
+        Event(name="a", rules=[_call_rule()]),
+        Event(name="b", rules=[_call_rule(inverse_pause_secs=30)]),
+        Event(name="c", rules=[_call_rule(result_value=2)]),
+    ]
+
+
+class TestRuleKey:
+    def test_event_side_settings_are_ignored(self):
+        assert rule_key(RuleCall(**_call_rule())) == rule_key(RuleCall(**_call_rule(inverse_pause_secs=30)))
+
+    def test_config_differences_matter(self):
+        assert rule_key(RuleCall(**_call_rule())) != rule_key(RuleCall(**_call_rule(result_value=2)))
+
+    def test_explicit_default_matches_omitted(self):
+        assert rule_key(RuleCall(**_call_rule())) == rule_key(RuleCall(**_call_rule(payload="")))
+
+    def test_nested_config(self):
+        first = RuleTime(ranges=[{"start_hour": 8, "end_hour": 17}])
+        second = RuleTime(ranges=[{"start_hour": 8, "end_hour": 17}])
+        other = RuleTime(ranges=[{"start_hour": 9, "end_hour": 17}])
+        assert rule_key(first) == rule_key(second)
+        assert rule_key(first) != rule_key(other)
+
+
+@pytest.mark.asyncio
+class TestRuleGraph:
+    async def test_compile_counts(self):
+        graph = RuleGraph(100)
+        graph.compile(_events())
+        stats = graph.stats()
+        assert stats["total"] == 3
+        assert stats["unique"] == 2
+        assert stats["shared"] == 1
+
+    async def test_shared_rule_evaluated_once(self):
+        graph = RuleGraph(100)
+        event_list = _events()
+        graph.compile(event_list)
+        calls = []
+
+        async def fake_eval(rule, resources):
+            calls.append(rule)
+            await asyncio.sleep(0.01)
+            return {"triggered": True, "value": 1}
+
+        with patch('src.ruleGraph.rules.eval_rule', side_effect=fake_eval):
+            results = await asyncio.gather(*[graph.evaluate(e.rules[0], {}) for e in event_list])
+
+        # a and b share one evaluation, c has its own
+        assert len(calls) == 2
+        assert all(r["triggered"] for r in results)
+        # each event gets a copy it can modify
+        results[0]["triggered"] = False
+        assert results[1]["triggered"] is True
+        assert graph.stats()["shared_hits"] == 1
+
+    async def test_unshared_rule_is_evaluated_directly(self):
+        graph = RuleGraph(100)
+        event_list = _events()
+        graph.compile(event_list)
+
+        with patch('src.ruleGraph.rules.eval_rule', return_value={"triggered": False}) as mock_eval:
+            await graph.evaluate(event_list[2].rules[0], {})
+            await graph.evaluate(event_list[2].rules[0], {})
+
+        assert mock_eval.call_count == 2
+        assert graph.stats()["shared_misses"] == 0
+
+    async def test_shared_evaluation_is_bounded_by_rule_timeout(self):
+        graph = RuleGraph(100)
+        event_list = [Event(name=name, rules=[_call_rule(timeout_ms=20, fail_eval=True)]) for name in ("a", "b")]
+        graph.compile(event_list)
+        release = asyncio.Event()
+
+        async def hung_eval(rule, resources):
+            await release.wait()
+            return {"triggered": False}
+
+        with patch('src.ruleGraph.rules.eval_rule', side_effect=hung_eval):
+            with patch('src.rules.getParam'):
+                results = await asyncio.wait_for(asyncio.gather(*[graph.evaluate(e.rules[0], {}) for e in event_list]), 1)
+        release.set()
+
+        # neither event waits on the hung evaluation past its rule's timeout, both fall back to fail_eval
+        assert results == [{"triggered": True, "value": None, "resource": "stuff_sensor"}] * 2
+        assert graph.stats()["shared_hits"] == 1
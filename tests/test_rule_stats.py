@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+
+# Add the source directory to the path so we can import the modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.ruleStats import RuleStats, cost_order, get_rule_stats
+from src.rules import RuleDetector, RuleTime
+
+
+class TestRuleStats:
+    def test_record(self):
+        stats = RuleStats()
+        stats.record(100, True)
+        stats.record(200, False)
+        assert stats.evaluations == 2
+        assert stats.true_rate == 0.5
+        # moving average starts at the first measurement
+        assert stats.latency_ms == 120
+
+    def test_unmeasured_rule_ranks_first(self):
+        stats = RuleStats()
+        assert stats.rank(False) == 0
+        stats.record(10, False)
+        assert stats.rank(False) > 0
+
+    def test_rank_prefers_decisive_rules(self):
+        selective = RuleStats()
+        selective.record(50, False)
+        unselective = RuleStats()
+        unselective.record(50, True)
+        # under AND a rule that is usually false decides the outcome
+        assert selective.rank(False) < unselective.rank(False)
+        # under OR a rule that is usually true does
+        assert unselective.rank(True) < selective.rank(True)
+
+
+class TestCostOrder:
+    def _rules(self):
+        detector = RuleDetector(camera="cam1", detector="det", class_regex="person")
+        time_rule = RuleTime(ranges=[])
+        get_rule_stats(detector).record(300, False)
+        get_rule_stats(time_rule).record(0.1, False)
+        return [detector, time_rule]
+
+    def test_cheap_rule_first_under_and(self):
+        assert cost_order(self._rules(), False) == [1, 0]
+
+    def test_configured_order_without_short_circuit(self):
+        assert cost_order(self._rules(), None) == [0, 1]
+
+    def test_stats_are_kept_on_the_rule(self):
+        rule = RuleDetector(camera="cam1", detector="det", class_regex="person")
+        assert get_rule_stats(rule) is get_rule_stats(rule)
@@ -191,7 +191,7 @@ class TestRuleEvaluation(unittest.IsolatedAsyncioTestCase):
         with patch('src.rules.getParam', return_value=mock_logger):
             with patch('src.rules._get_vision_service', return_value=mock_detector):
                 with patch('src.rules._get_camera_component', return_value=mock_camera):
-                    with patch('src.rules.viam_to_pil_image', return_value=mock_pil_image):
+                    with patch('src.imageHandle.viam_to_pil_image', return_value=mock_pil_image):
                         result = await eval_rule(rule, mock_resources)
                         
                         self.assertTrue(result["triggered"])
@@ -278,7 +278,7 @@ class TestRuleEvaluation(unittest.IsolatedAsyncioTestCase):
         
         with patch('src.rules.getParam', return_value=mock_logger):
             with patch('src.rules._get_vision_service', return_value=mock_tracker):
-                with patch('src.rules.viam_to_pil_image', return_value=mock_image):
+                with patch('src.imageHandle.viam_to_pil_image', return_value=mock_image):
                     with patch('src.rules.re.sub', return_value="person_123"):
                         with patch('src.rules.logic.NOR', return_value=True):
                             result = await eval_rule(rule, mock_resources)
@@ -286,6 +286,9 @@ class TestRuleEvaluation(unittest.IsolatedAsyncioTestCase):
                             self.assertTrue(result["triggered"])
                             self.assertEqual(result["resource"], "test_camera")
                             self.assertEqual(result["value"], "person_123")
+                            # the crop is deferred until the image is used
+                            mock_image.crop.assert_not_called()
+                            self.assertEqual(result["image"].pil(), mock_cropped_image)
                             mock_image.crop.assert_called_once_with((10, 10, 50, 50))
     
     async def test_tracker_rule_evaluation_authorized_person(self):
@@ -0,0 +1,135 @@
+import asyncio
+import math
+import pytest
+import sys
+from pathlib import Path
+
+# Add the source directory to the path so we can import the modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.scheduler import EventScheduler, ScheduledEvent
+
+
+def _entry(name: str) -> ScheduledEvent:
+    return ScheduledEvent(name, asyncio.Event(), {}, 0)
+
+
+@pytest.mark.asyncio
+class TestEventScheduler:
+    async def test_runs_entries_in_due_order(self):
+        order = []
+
+        async def tick(entry):
+            order.append(entry.event)
+            entry.stop_event.set()
+            return 0
+
+        scheduler = EventScheduler(tick, lambda entries: None)
+        scheduler.start()
+        scheduler.add(_entry("late"), delay=0.05)
+        scheduler.add(_entry("early"), delay=0.01)
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+
+        assert order == ["early", "late"]
+
+    async def test_requeues_with_returned_delay(self):
+        calls = []
+
+        async def tick(entry):
+            calls.append(entry.event)
+            return 0.02
+
+        scheduler = EventScheduler(tick, lambda entries: None)
+        scheduler.start()
+        scheduler.add(_entry("a"))
+        await asyncio.sleep(0.09)
+        await scheduler.stop()
+
+        assert 3 <= len(calls) <= 6
+        stats = scheduler.stats()
+        assert stats["queue_depth"] == 1
+        assert stats["ticks"] == len(calls)
+        assert stats["max_lag_ms"] >= stats["avg_lag_ms"] >= 0
+
+    async def test_exception_in_tick_is_retried(self):
+        calls = []
+
+        async def tick(entry):
+            calls.append(entry.event)
+            raise RuntimeError("boom")
+
+        scheduler = EventScheduler(tick, lambda entries: None)
+        scheduler.start()
+        scheduler.add(_entry("a"))
+        await asyncio.sleep(0.05)
+        await scheduler.stop()
+
+        assert calls == ["a"]
+        assert scheduler.stats()["queue_depth"] == 1
+
+    async def test_discard_stopped(self):
+        stopped = []
+
+        async def tick(entry):
+            return 0
+
+        scheduler = EventScheduler(tick, stopped.extend)
+        keep = _entry("keep")
+        drop = _entry("drop")
+        scheduler.add(keep, delay=10)
+        scheduler.add(drop, delay=10)
+        drop.stop_event.set()
+        scheduler.discard_stopped()
+
+        assert stopped == [drop]
+        assert scheduler.stats()["queue_depth"] == 1
+
+    async def test_wake(self):
+        calls = []
+
+        async def tick(entry):
+            calls.append(entry.event)
+            return 10
+
+        scheduler = EventScheduler(tick, lambda entries: None)
+        scheduler.start()
+        a = _entry("a")
+        scheduler.add(a, delay=10)
+        scheduler.add(_entry("b"), delay=10)
+        await asyncio.sleep(0.01)
+        assert calls == []
+
+        scheduler.wake(lambda entry: entry is a)
+        await asyncio.sleep(0.01)
+        await scheduler.stop()
+
+        assert calls == ["a"]
+
+    async def test_park_until_woken(self):
+        calls = []
+
+        async def tick(entry):
+            calls.append(entry.event)
+            return math.inf
+
+        scheduler = EventScheduler(tick, lambda entries: None)
+        scheduler.start()
+        a = _entry("a")
+        scheduler.add(a)
+        await asyncio.sleep(0.01)
+        assert calls == ["a"]
+        assert scheduler.stats()["parked"] == 1
+        assert scheduler.stats()["queue_depth"] == 0
+
+        scheduler.wake(lambda entry: entry is a)
+        await asyncio.sleep(0.01)
+        assert calls == ["a", "a"]
+
+        stopped = []
+        scheduler.on_stop = stopped.extend
+        a.stop_event.set()
+        scheduler.discard_stopped()
+        await scheduler.stop()
+        assert stopped == [a]
+        assert scheduler.stats()["parked"] == 0
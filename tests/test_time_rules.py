@@ -9,7 +9,7 @@ from datetime import datetime
 # Add the source directory to the path so we can import the modules
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.rules import RuleTime, TimeRange, eval_rule
+from src.rules import RuleTime, TimeRange, eval_rule, time_windows, in_time_window, next_time_transition
 
 class TestTimeRuleInitialization:
     def test_time_range_initialization(self):
@@ -217,4 +217,42 @@ class TestTimeRuleEvaluation:
                     result = await eval_rule(rule, {})
                     
                     assert result["triggered"] == True
-                    mock_logger.debug.assert_called_once_with("Time triggered") 
\ No newline at end of file
+                    mock_logger.debug.assert_called_once_with("Time triggered") 
+
+class TestTimeWindows:
+    def test_ranges_are_sorted_and_merged(self):
+        rule = RuleTime(ranges=[
+            {"start_hour": 13, "end_hour": 17},
+            {"start_hour": 8, "end_hour": 12},
+            {"start_hour": 11, "end_hour": 13},
+            {"start_hour": 20, "end_hour": 19}
+        ])
+        assert time_windows(rule) == [(8, 17)]
+
+    def test_windows_follow_reassigned_ranges(self):
+        rule = RuleTime(ranges=[{"start_hour": 8, "end_hour": 12}])
+        assert time_windows(rule) == [(8, 12)]
+        rule.ranges = [TimeRange(start_hour=1, end_hour=2)]
+        assert time_windows(rule) == [(1, 2)]
+
+    def test_in_time_window(self):
+        rule = RuleTime(ranges=[{"start_hour": 8, "end_hour": 12}])
+        assert in_time_window(rule, datetime(2024, 1, 1, 8, 0))
+        assert not in_time_window(rule, datetime(2024, 1, 1, 12, 0))
+
+    def test_next_transition_before_window(self):
+        rule = RuleTime(ranges=[{"start_hour": 8, "end_hour": 12}, {"start_hour": 20, "end_hour": 22}])
+        assert next_time_transition(rule, datetime(2024, 1, 1, 6, 30)) == datetime(2024, 1, 1, 8)
+        assert next_time_transition(rule, datetime(2024, 1, 1, 13, 5)) == datetime(2024, 1, 1, 20)
+
+    def test_next_transition_inside_window(self):
+        rule = RuleTime(ranges=[{"start_hour": 8, "end_hour": 12}])
+        assert next_time_transition(rule, datetime(2024, 1, 1, 9, 15)) == datetime(2024, 1, 1, 12)
+
+    def test_next_transition_after_last_window(self):
+        rule = RuleTime(ranges=[{"start_hour": 8, "end_hour": 12}])
+        assert next_time_transition(rule, datetime(2024, 1, 1, 23, 59)) == datetime(2024, 1, 2, 8)
+
+    def test_no_transition(self):
+        assert next_time_transition(RuleTime(ranges=[]), datetime(2024, 1, 1, 9)) is None
+        assert next_time_transition(RuleTime(ranges=[{"start_hour": 0, "end_hour": 24}]), datetime(2024, 1, 1, 9)) is None
@@ -9,7 +9,7 @@ import re
 # Add the source directory to the path so we can import the modules
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.rules import RuleTracker, eval_rule
+from src.rules import TRACKER_LABEL_SUFFIX, RuleTracker, eval_rule
 
 # Remove the global pytestmark that's causing the warning
 # pytestmark = pytest.mark.asyncio
@@ -32,10 +32,14 @@ class TestTrackerRuleInitialization:
         assert rule.pause_on_known_secs == 300
         assert rule.type == "tracker"
 
+    def test_tracker_label_suffix(self):
+        assert TRACKER_LABEL_SUFFIX.sub('', "person_123 (label: John Doe)") == "person_123"
+        assert TRACKER_LABEL_SUFFIX.sub('', "person_123") == "person_123"
+
 # Add class-specific marker for async test class
 @pytest.mark.asyncio
 class TestTrackerRuleEvaluation:
-    async def test_tracker_rule_unauthorized_person(self, mock_logger, mock_resources, mock_image, mock_regex_sub):
+    async def test_tracker_rule_unauthorized_person(self, mock_logger, mock_resources, mock_image):
         """Test tracker rule evaluation when an unauthorized person is detected"""
         rule = RuleTracker()
         rule.type = "tracker"
@@ -77,26 +81,25 @@ class TestTrackerRuleEvaluation:
         # Set up patches
         with patch('src.rules.getParam', return_value=mock_logger):
             with patch('src.rules._get_vision_service', return_value=mock_tracker):
-                with patch('src.rules.viam_to_pil_image', return_value=mock_image):
-                    with patch('src.rules.re.sub', side_effect=mock_regex_sub):
-                        # Test evaluation
-                        result = await eval_rule(rule, mock_resources)
+                with patch('src.imageHandle.viam_to_pil_image', return_value=mock_image):
+                    # Test evaluation
+                    result = await eval_rule(rule, mock_resources)
                         
-                        # The NOR function should trigger for unauthorized persons
-                        assert result["triggered"] == True
-                        assert result["value"] == "person_123"
-                        assert result["resource"] == "cam1"
-                        assert result["image"] == mock_cropped_image
+                    # The NOR function should trigger for unauthorized persons
+                    assert result["triggered"] == True
+                    assert result["value"] == "person_123"
+                    assert result["resource"] == "cam1"
+                    assert result["image"].pil() == mock_cropped_image
                         
-                        # Check that correct methods were called
-                        mock_tracker.capture_all_from_camera.assert_called_once_with(
-                            "cam1", return_classifications=False, return_detections=True, return_image=True, extra={}
-                        )
-                        mock_tracker.do_command.assert_called_once_with({"list_current": True})
-                        mock_image.crop.assert_called_once_with((10, 20, 110, 220))
-                        mock_logger.info.assert_called()
+                    # Check that correct methods were called
+                    mock_tracker.capture_all_from_camera.assert_called_once_with(
+                        "cam1", return_classifications=False, return_detections=True, return_image=True, extra={}
+                    )
+                    mock_tracker.do_command.assert_called_once_with({"list_current": True})
+                    mock_image.crop.assert_called_once_with((10, 20, 110, 220))
+                    mock_logger.info.assert_called()
     
-    async def test_tracker_rule_authorized_person(self, mock_logger, mock_resources, mock_regex_sub):
+    async def test_tracker_rule_authorized_person(self, mock_logger, mock_resources):
         """Test tracker rule evaluation when only an authorized/known person is detected"""
         rule = RuleTracker()
         rule.type = "tracker"
@@ -130,22 +133,21 @@ class TestTrackerRuleEvaluation:
         # Set up patches
         with patch('src.rules.getParam', return_value=mock_logger):
             with patch('src.rules._get_vision_service', return_value=mock_tracker):
-                with patch('src.rules.re.sub', side_effect=mock_regex_sub):
-                    # Test evaluation
-                    result = await eval_rule(rule, mock_resources)
+                # Test evaluation
+                result = await eval_rule(rule, mock_resources)
                     
-                    # Should not trigger for authorized persons
-                    assert result["triggered"] == False
-                    assert "known_person_seen" in result
-                    assert result["known_person_seen"] == True
+                # Should not trigger for authorized persons
+                assert result["triggered"] == False
+                assert "known_person_seen" in result
+                assert result["known_person_seen"] == True
                     
-                    # Check that correct methods were called
-                    mock_tracker.capture_all_from_camera.assert_called_once_with(
-                        "cam1", return_classifications=False, return_detections=True, return_image=True, extra={}
-                    )
-                    mock_tracker.do_command.assert_called_once_with({"list_current": True})
+                # Check that correct methods were called
+                mock_tracker.capture_all_from_camera.assert_called_once_with(
+                    "cam1", return_classifications=False, return_detections=True, return_image=True, extra={}
+                )
+                mock_tracker.do_command.assert_called_once_with({"list_current": True})
     
-    async def test_tracker_rule_mixed_detections(self, mock_logger, mock_resources, mock_image, mock_regex_sub):
+    async def test_tracker_rule_mixed_detections(self, mock_logger, mock_resources, mock_image):
         """Test tracker rule evaluation with both authorized and unauthorized persons"""
         rule = RuleTracker()
         rule.type = "tracker"
@@ -195,23 +197,23 @@ class TestTrackerRuleEvaluation:
         # Set up patches
         with patch('src.rules.getParam', return_value=mock_logger):
             with patch('src.rules._get_vision_service', return_value=mock_tracker):
-                with patch('src.rules.viam_to_pil_image', return_value=mock_image):
-                    with patch('src.rules.re.sub', side_effect=mock_regex_sub):
-                        # Test evaluation
-                        result = await eval_rule(rule, mock_resources)
+                with patch('src.imageHandle.viam_to_pil_image', return_value=mock_image):
+                    # Test evaluation
+                    result = await eval_rule(rule, mock_resources)
                         
-                        # The NOR function only triggers when ALL people are unauthorized.
-                        # Since there's a mix of authorized and unauthorized, it doesn't trigger.
-                        # This is due to NOR(approved_status) = NOR([False, True]) = False
-                        assert result["triggered"] == False
-                        assert "known_person_seen" in result
+                    # The NOR function only triggers when ALL people are unauthorized.
+                    # Since there's a mix of authorized and unauthorized, it doesn't trigger.
+                    # This is due to NOR(approved_status) = NOR([False, True]) = False
+                    assert result["triggered"] == False
+                    assert "known_person_seen" in result
                         
-                        # Check that correct methods were called
-                        mock_tracker.capture_all_from_camera.assert_called_once_with(
-                            "cam1", return_classifications=False, return_detections=True, return_image=True, extra={}
-                        )
-                        mock_tracker.do_command.assert_called_once_with({"list_current": True})
-                        mock_image.crop.assert_called_once_with((10, 20, 110, 220))
+                    # Check that correct methods were called
+                    mock_tracker.capture_all_from_camera.assert_called_once_with(
+                        "cam1", return_classifications=False, return_detections=True, return_image=True, extra={}
+                    )
+                    mock_tracker.do_command.assert_called_once_with({"list_current": True})
+                    # the event did not trigger, so the image is never decoded or cropped
+                    mock_image.crop.assert_not_called()
     
     async def test_tracker_rule_labeled_detection(self, mock_logger, mock_resources):
         """Test tracker rule with a detection that has a label appended to class name"""
@@ -251,14 +253,49 @@ class TestTrackerRuleEvaluation:
         # Set up patches
         with patch('src.rules.getParam', return_value=mock_logger):
             with patch('src.rules._get_vision_service', return_value=mock_tracker):
-                with patch('src.rules.re.sub', side_effect=lambda p, r, s: "person_123"):
-                    # Test evaluation
-                    result = await eval_rule(rule, mock_resources)
+                # Test evaluation
+                result = await eval_rule(rule, mock_resources)
                     
-                    # Should not trigger as this is a known person
-                    assert result["triggered"] == False
-                    assert "known_person_seen" in result
-                    assert result["known_person_seen"] == True
+                # Should not trigger as this is a known person
+                assert result["triggered"] == False
+                assert "known_person_seen" in result
+                assert result["known_person_seen"] == True
+
+    async def test_tracker_rule_labeled_unknown_detection(self, mock_logger, mock_resources, mock_image):
+        """Test that the label is stripped from the class name reported for an unknown person"""
+        rule = RuleTracker()
+        rule.type = "tracker"
+        rule.camera = "cam1"
+        rule.tracker = "person_tracker"
+
+        mock_detection = MagicMock()
+        mock_detection.class_name = "person_789 (label: re-id 2)"
+        mock_detection.x_min = 10
+        mock_detection.y_min = 20
+        mock_detection.x_max = 110
+        mock_detection.y_max = 220
+
+        mock_all = MagicMock()
+        mock_all.detections = [mock_detection]
+
+        mock_tracker = AsyncMock()
+        mock_tracker.capture_all_from_camera.return_value = mock_all
+        mock_tracker.do_command.return_value = {
+            "list_current": {
+                "person_789": {
+                    "face_id_label": False,
+                    "manual_label": False,
+                    "re_id_label": False
+                }
+            }
+        }
+
+        with patch('src.rules.getParam', return_value=mock_logger):
+            with patch('src.rules._get_vision_service', return_value=mock_tracker):
+                result = await eval_rule(rule, mock_resources)
+
+        assert result["triggered"] == True
+        assert result["value"] == "person_789"
     
     async def test_tracker_rule_no_detections(self, mock_logger, mock_resources):
         """Test tracker rule evaluation when no persons are detected"""